@@ -0,0 +1,335 @@
+from array import array
+
+import strings
+
+# colors of a panel
+GREEN = 0  # the Wheel of Fortune logo, for panels without a letter
+WHITE = 1
+BLUE = 2
+
+
+class BoardState(object):
+    """
+    The letters and state of every panel of a puzzleboard, without any
+    widgets.
+
+    The board is a grid of `rows` by `cols` cells, without the four
+    corners. Panels are numbered from left to right, top to bottom, and
+    each has a letter (an empty string if it has none), a color, and
+    whether its letter is hidden. Reveal orders are arrays of panel
+    numbers, computed once, and the panels containing each letter are
+    mapped when needed, so finding matches does not check every panel.
+    """
+
+    __slots__ = (
+        'rows', 'cols', 'indices', 'letters', 'colors', 'hidden',
+        'order_left_to_right', 'order_right_to_left', 'order_bottom_right',
+        'rank_left_to_right', 'rank_right_to_left', '_letter_positions')
+
+    def __init__(self, rows, cols):
+        """
+        Create an empty board. No letters are hidden and every panel is
+        green.
+
+        :param rows: The number of rows of the grid
+        :type rows: int
+        :param cols: The number of columns of the grid
+        :type cols: int
+        """
+
+        self.rows = rows
+        self.cols = cols
+        corners = [(0, 0), (0, cols - 1), (rows - 1, 0), (rows - 1, cols - 1)]
+        cells = [
+            (i, j) for i in range(rows) for j in range(cols)
+            if (i, j) not in corners]
+        # {(row, column): panel number}
+        self.indices = {cell: index for index, cell in enumerate(cells)}
+
+        self.letters = [''] * len(cells)
+        self.colors = bytearray(len(cells))
+        self.hidden = bytearray(len(cells))
+
+        # top to bottom, left to right
+        self.order_left_to_right = self._column_order(
+            range(cols), range(rows))
+        # top to bottom, right to left
+        self.order_right_to_left = self._column_order(
+            range(cols - 1, -1, -1), range(rows))
+        # bottom to top, right to left
+        self.order_bottom_right = self._column_order(
+            range(cols - 1, -1, -1), range(rows - 1, -1, -1))
+        # the position of each panel in the orders above
+        self.rank_left_to_right = self._ranks(self.order_left_to_right)
+        self.rank_right_to_left = self._ranks(self.order_right_to_left)
+
+        # {lowercase letter: array of panel numbers}, built when needed
+        self._letter_positions = None
+
+    def __len__(self):
+        return len(self.letters)
+
+    def _column_order(self, columns, rows):
+        """
+        Get a reveal order which goes through each column in `columns`,
+        and through each row in `rows` within each column.
+
+        :param columns: Column numbers, in order
+        :type columns: range
+        :param rows: Row numbers, in order
+        :type rows: range
+        :return: An array of panel numbers
+        :rtype: array.array
+        """
+
+        return array('H', (
+            self.indices[(i, j)]
+            for j in columns for i in rows
+            if (i, j) in self.indices))
+
+    @staticmethod
+    def _ranks(order):
+        """
+        Get the position of each panel in a reveal order.
+
+        :param order: A reveal order, as an array of panel numbers
+        :type order: array.array
+        :return: An array where item *i* is the position of panel *i*
+                 in `order`
+        :rtype: array.array
+        """
+
+        ranks = array('H', [0]) * len(order)
+        for rank, i in enumerate(order):
+            ranks[i] = rank
+        return ranks
+
+    def load(self, puzzle_string):
+        """
+        Put the letters of a puzzle on the board, one character per
+        panel, with every panel green and hidden.
+
+        :param puzzle_string: The 'puzzle' of a puzzle dict
+        :type puzzle_string: str
+        :return: None
+        """
+
+        letters = [letter.strip() for letter in puzzle_string[:len(self)]]
+        self.letters = letters + [''] * (len(self) - len(letters))
+        self.colors = bytearray(len(self))
+        self.hidden = bytearray(b'\1') * len(self)
+        self._letter_positions = None
+
+    def load_compiled(self, compiled):
+        """
+        Put the letters of a puzzle laid out by
+        :func:`game_compiler.compile_puzzle` on the board, in the same
+        way as :meth:`load`, without parsing the puzzle again.
+
+        :param compiled: A puzzle compiled for a board of this size
+        :type compiled: game_compiler.CompiledPuzzle
+        :return: None
+        """
+
+        self.letters = list(compiled.letters)
+        self.colors = bytearray(len(self))
+        self.hidden = bytearray(b'\1') * len(self)
+        # never changed in place, so it can be shared
+        self._letter_positions = compiled.letter_positions
+
+    def set_letter(self, index, letter):
+        """
+        Change the letter of a panel.
+
+        :param index: The number of the panel
+        :type index: int
+        :param letter: A single-character string, or an empty string
+        :type letter: str
+        :return: None
+        """
+
+        if letter != self.letters[index]:
+            self.letters[index] = letter
+            self._letter_positions = None
+
+    def set_color(self, index, color):
+        """
+        Change the color of a panel.
+
+        :param index: The number of the panel
+        :type index: int
+        :param color: One of `GREEN`, `WHITE`, or `BLUE`
+        :type color: int
+        :return: None
+        """
+
+        self.colors[index] = color
+
+    def reveal(self, index):
+        """
+        Reveal the letter of a panel, turning it white.
+
+        :param index: The number of the panel
+        :type index: int
+        :return: None
+        """
+
+        self.colors[index] = WHITE
+        self.hidden[index] = False
+
+    def hide(self, index):
+        """
+        Hide the letter of a panel. Panels with a letter turn white, and
+        panels without one turn green. Punctuation is revealed instead.
+
+        :param index: The number of the panel
+        :type index: int
+        :return: None
+        """
+
+        letter = self.letters[index].lower()
+        if letter and letter not in strings.alphabet:
+            # don't hide punctuation
+            self.reveal(index)
+            return
+        self.colors[index] = WHITE if letter else GREEN
+        self.hidden[index] = True
+
+    def is_hidden_letter(self, index):
+        """
+        Check whether a panel has a letter which is hidden.
+
+        :param index: The number of the panel
+        :type index: int
+        :return: True if the panel has a hidden letter, otherwise False
+        :rtype: bool
+        """
+
+        return bool(self.hidden[index] and self.letters[index])
+
+    def letter_positions(self):
+        """
+        Get the panels containing each letter.
+
+        :return: A dict of {lowercase letter: array of panel numbers}
+        :rtype: dict
+        """
+
+        if self._letter_positions is None:
+            positions = {}
+            for i, letter in enumerate(self.letters):
+                if letter:
+                    positions.setdefault(letter.lower(), array('H')).append(i)
+            self._letter_positions = positions
+        return self._letter_positions
+
+    def matches(self, letters, ranks):
+        """
+        Get the hidden panels containing any of `letters`.
+
+        :param letters: A list of single-character strings
+        :type letters: list
+        :param ranks: The positions of the panels in a reveal order, such
+                      as `rank_left_to_right`
+        :type ranks: array.array
+        :return: A list of panel numbers, in the reveal order
+        :rtype: list
+        """
+
+        positions = self.letter_positions()
+        return sorted(
+            (i for letter in {letter.lower() for letter in letters}
+             for i in positions.get(letter, ()) if self.hidden[i]),
+            key=ranks.__getitem__)
+
+    def remaining_letters(self, excluded=()):
+        """
+        Get the letters which are still hidden somewhere on the board.
+
+        :param excluded: Letters to ignore, defaults to an empty tuple
+        :type excluded: iterable, optional
+        :return: A set of lowercase letters
+        :rtype: set
+        """
+
+        excluded = {letter.lower() for letter in excluded}
+        return {
+            letter for letter, positions in self.letter_positions().items()
+            if letter not in excluded
+            and any(self.hidden[i] for i in positions)}
+
+    def hidden_letters(self, order=None):
+        """
+        Get the panels which have a hidden letter.
+
+        :param order: A reveal order, defaults to None to use the order
+                      of the panel numbers
+        :type order: array.array, optional
+        :return: A list of panel numbers
+        :rtype: list
+        """
+
+        if order is None:
+            order = range(len(self))
+        return [i for i in order if self.hidden[i] and self.letters[i]]
+
+    def tossup_order(self, generator):
+        """
+        Choose the order in which the letters are revealed in a toss-up:
+        the bottom-rightmost letter first, then every other hidden
+        letter in a random order.
+
+        :param generator: The random number generator which shuffles
+                          the letters, such as a :class:`random.Random`
+        :type generator: random.Random
+        :return: A list of panel numbers, in the order of the reveals
+        :rtype: list
+        """
+
+        # look for the bottom-rightmost letter,
+        # in order from bottom to top, right to left
+        first = [i for i in self.order_bottom_right if self.letters[i]][:1]
+        rest = [i for i in self.hidden_letters() if i not in first]
+        generator.shuffle(rest)
+        return first + rest
+
+    def puzzle_string(self):
+        """
+        Get the letters on the board as a puzzle string, with a space
+        for each panel without a letter.
+
+        :return: A string with one character per panel
+        :rtype: str
+        """
+
+        return ''.join(letter or ' ' for letter in self.letters)
+
+    def pattern(self, hidden='_'):
+        """
+        Get the board as the contestants see it, for
+        :class:`puzzle_solver.PuzzleSolver`: the words of each row in
+        order, separated by single spaces, with `hidden` in place of
+        each hidden letter.
+
+        :param hidden: The character standing for a hidden letter,
+                       defaults to '_'
+        :type hidden: str, optional
+        :return: The board pattern
+        :rtype: str
+        """
+
+        words = []
+        for i in range(self.rows):
+            row = []
+            for j in range(self.cols):
+                index = self.indices.get((i, j))
+                letter = '' if index is None else self.letters[index]
+                if not letter:
+                    row.append(' ')
+                elif self.hidden[index] and letter.lower() in strings.alphabet:
+                    row.append(hidden)
+                else:
+                    # punctuation is never hidden
+                    row.append(letter.upper())
+            words.extend(''.join(row).split())
+        return ' '.join(words)
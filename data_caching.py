@@ -1,26 +1,121 @@
+import atexit
 import json
 import os
-from collections import OrderedDict
+import threading
 
-import prompts
+from kivy.clock import Clock
+
+import file_io
 import strings
 import values
 
+# prompts, puzzle_import, and the puzzle_* modules used by the puzzle
+# library are imported by the functions which use them, so that windows
+# which only read settings do not load them at startup
+
+_settings_lock = threading.RLock()
+_settings_cache = None
+_settings_stamp = None
+_pending_settings = {}
+_flush_timer = None
+# marks a pending setting that should be removed from the file
+_removed = object()
+
+_puzzle_store_lock = threading.Lock()
+_puzzle_store = None
+# search index of the puzzle store, built on first use
+_puzzle_index = None
+# metrics of the puzzles in the puzzle store, loaded on first use
+_puzzle_analysis = None
+# the version of the puzzle index when the analysis was last updated
+_puzzle_analysis_version = None
+
 
 def update_variables(new_values):
     """
     Update the dict stored in the file `values.file_settings` with the
     specified dict `new_values`.
 
+    The in-memory settings are updated immediately. The file itself is
+    written by :func:`flush_variables` after
+    `values.settings_flush_delay` seconds, so that several updates in
+    quick succession only result in a single write.
+
     :param new_values: A dict to add to settings
     :type new_values: dict
     :return: None
     """
 
-    variables = get_variables()
-    variables.update(new_values)
-    with open(values.file_settings, 'w') as f:
-        json.dump(variables, f)
+    with _settings_lock:
+        _cached_settings().update(new_values)
+        _pending_settings.update(new_values)
+        _schedule_flush()
+
+
+def remove_variables(names):
+    """
+    Remove the settings with keys in `names` from the file
+    `values.file_settings`.
+    Like :func:`update_variables`, the file is written after a delay.
+
+    :param names: A list of keys to remove
+    :type names: list
+    :return: None
+    """
+
+    with _settings_lock:
+        settings = _cached_settings()
+        for name in names:
+            settings.pop(name, None)
+            _pending_settings[name] = _removed
+        _schedule_flush()
+
+
+def _schedule_flush():
+    """
+    Schedule :func:`flush_variables` to run after
+    `values.settings_flush_delay` seconds, unless it is already
+    scheduled.
+
+    The caller must hold `_settings_lock`.
+
+    :return: None
+    """
+
+    global _flush_timer
+
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(
+            values.settings_flush_delay, flush_variables)
+        _flush_timer.start()
+
+
+def flush_variables():
+    """
+    Write any pending changes from :func:`update_variables` to the file
+    `values.file_settings`.
+
+    If the file was changed by another process since it was last read,
+    the pending changes are merged into the new contents of the file.
+    See :func:`file_io.atomic_write_json`.
+
+    :return: None
+    """
+
+    global _flush_timer, _settings_stamp
+
+    with _settings_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+
+        if not _pending_settings:
+            return
+
+        file_io.atomic_write_json(values.file_settings, _cached_settings())
+
+        _pending_settings.clear()
+        _settings_stamp = _settings_file_stamp(os.stat(values.file_settings))
 
 
 def get_variables():
@@ -28,42 +123,298 @@ def get_variables():
     Get the JSON dict stored in the file `values.file_settings`.
     Returns an empty dict if the file does not exist.
 
+    The settings are cached for the lifetime of the process, and are
+    only read again if the file has been modified. The returned dict is
+    a shallow copy of the cache, so nested values (such as the dict of
+    puzzles) must be copied before they are modified.
+
     :return: A dict containing the settings
     :rtype: dict
     """
 
+    with _settings_lock:
+        return dict(_cached_settings())
+
+
+def _cached_settings():
+    """
+    Get the cached settings dict, reloading it from the file
+    `values.file_settings` if the file has changed since it was last
+    read. Changes that have not yet been written by
+    :func:`flush_variables` are applied on top of the file's contents.
+
+    The caller must hold `_settings_lock`.
+
+    :return: The cached settings dict
+    :rtype: dict
+    """
+
+    global _settings_cache, _settings_stamp
+
     try:
-        with open(values.file_settings) as f:
-            return json.load(f)
+        stamp = _settings_file_stamp(os.stat(values.file_settings))
     except FileNotFoundError:
-        return {}
+        stamp = None
+
+    if _settings_cache is None or stamp != _settings_stamp:
+        try:
+            with open(values.file_settings) as f:
+                stamp = _settings_file_stamp(os.fstat(f.fileno()))
+                _settings_cache = json.load(f)
+        except FileNotFoundError:
+            stamp = None
+            _settings_cache = {}
+        for name, value in _pending_settings.items():
+            if value is _removed:
+                _settings_cache.pop(name, None)
+            else:
+                _settings_cache[name] = value
+        _settings_stamp = stamp
+
+    return _settings_cache
+
+
+def _settings_file_stamp(stat_result):
+    """
+    Get a tuple identifying a version of the settings file, used to
+    detect whether the file has changed.
+
+    :param stat_result: The result of `os.stat` on the settings file
+    :type stat_result: os.stat_result
+    :return: A tuple of the file's inode, size, and modification time
+    :rtype: tuple
+    """
+
+    return stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _reset_after_fork():
+    """
+    Forget the flush timer and settings lock inherited by a forked
+    child. The child does not inherit the timer's thread, so the settings
+    would otherwise never be flushed again, and the lock may have been
+    held by another thread of the parent.
+
+    :return: None
+    """
+
+    global _flush_timer, _settings_lock
+
+    _flush_timer = None
+    _settings_lock = threading.RLock()
+
+
+atexit.register(flush_variables)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_puzzle_store():
+    """
+    Get the :class:`puzzle_store.PuzzleStore` holding the puzzle
+    library, opening it on first use.
+
+    The backend is chosen by the 'puzzle_store' setting, which defaults
+    to `values.default_puzzle_store`. The first time a backend other
+    than 'json' is opened, any puzzles still stored under the 'puzzles'
+    key of the settings file are moved into it.
+
+    :return: The puzzle store
+    :rtype: puzzle_store.PuzzleStore
+    """
+
+    global _puzzle_store
+
+    import puzzle_store
+
+    with _puzzle_store_lock:
+        if _puzzle_store is None:
+            settings = get_variables()
+            backend = settings.get('puzzle_store', values.default_puzzle_store)
+            if backend == 'json':
+                _puzzle_store = puzzle_store.JsonPuzzleStore(
+                    get_variables, update_variables)
+            else:
+                _puzzle_store = puzzle_store.SqlitePuzzleStore(
+                    values.file_puzzles)
+                if 'puzzles' in settings:
+                    # one-time migration from the settings file
+                    _puzzle_store.put_many(
+                        settings['puzzles'].items(), overwrite=False)
+                    remove_variables(['puzzles'])
+                    flush_variables()
+        return _puzzle_store
 
 
 def read_puzzles():
     """
-    Load the puzzles from the settings file.
-    Returns an empty dict if the file does not exist.
+    Load all puzzles from the puzzle store.
+    Returns an empty dict if there are no puzzles.
     Each key in the returned dict is the name of the puzzle, and each
     value is the corresponding puzzle dict.
 
     See :func:`add_puzzle` for a description of puzzle dicts.
 
     :return: A dict containing puzzles
-    :rtype: dict
+    :rtype: collections.OrderedDict
+    """
+
+    return get_puzzle_store().read_all()
+
+
+def read_puzzle_names():
+    """
+    Get the names of all puzzles in the puzzle store, in the order in
+    which they were added.
+
+    :return: A list of puzzle names
+    :rtype: list
+    """
+
+    return get_puzzle_store().names()
+
+
+def read_puzzles_page(offset, limit):
+    """
+    Load at most `limit` puzzles from the puzzle store, skipping the
+    first `offset`.
+
+    :param offset: The number of puzzles to skip
+    :type offset: int
+    :param limit: The maximum number of puzzles to load
+    :type limit: int
+    :return: A dict containing puzzles
+    :rtype: collections.OrderedDict
+    """
+
+    return get_puzzle_store().read_page(offset, limit)
+
+
+def get_puzzles(names):
+    """
+    Load the puzzles with names in `names` from the puzzle store, in the
+    order given.
+
+    :param names: A list of puzzle names
+    :type names: list
+    :return: A dict containing puzzles
+    :rtype: collections.OrderedDict
+    """
+
+    return get_puzzle_store().get_many(names)
+
+
+def get_puzzle_index():
+    """
+    Get the :class:`puzzle_index.PuzzleIndex` of the puzzle store,
+    building it on first use.
+    Changes made through this module are applied to the index as they
+    happen; call :func:`refresh_puzzle_index` to pick up changes made by
+    other processes.
+
+    :return: The puzzle index
+    :rtype: puzzle_index.PuzzleIndex
+    """
+
+    global _puzzle_index
+
+    if _puzzle_index is None:
+        import puzzle_index
+
+        _puzzle_index = puzzle_index.PuzzleIndex(read_puzzles().items())
+    return _puzzle_index
+
+
+def refresh_puzzle_index():
+    """
+    Add puzzles to the puzzle index which were added to the puzzle store
+    by other processes, and remove those which were deleted.
+
+    :return: None
+    """
+
+    if _puzzle_index is None:
+        get_puzzle_index()
+    else:
+        _puzzle_index.update(read_puzzle_names(), get_puzzles)
+
+
+def search_puzzles(query):
+    """
+    Get the names of the puzzles matching a search query.
+    See :func:`puzzle_index.parse_query` for the format of queries.
+
+    :param query: The text of a search box
+    :type query: str
+    :return: A list of puzzle names, in the order in which they were
+             added unless the query sorts them
+    :rtype: list
+    """
+
+    import puzzle_index
+
+    filters = puzzle_index.parse_query(query)
+    metric_filters = filters.pop('metrics', [])
+    sort = filters.pop('sort', None)
+    names = get_puzzle_index().search(**filters)
+    if metric_filters or sort:
+        analysis = get_puzzle_analysis()
+        for metric, comparison, value in metric_filters:
+            names = analysis.filter(names, metric, comparison, value)
+        if sort:
+            names = analysis.sort(names, *sort)
+    return names
+
+
+def get_puzzle_analysis():
+    """
+    Get the :class:`puzzle_analysis.PuzzleAnalysis` of the puzzles in
+    the puzzle index, loading it from the file
+    `values.file_puzzle_analysis` on first use. The metrics of any
+    puzzles which have been added to the index since the analysis was
+    last updated are computed, and the file is written shortly after.
+
+    :return: The puzzle analysis
+    :rtype: puzzle_analysis.PuzzleAnalysis
+    """
+
+    global _puzzle_analysis, _puzzle_analysis_version
+
+    index = get_puzzle_index()
+    if _puzzle_analysis is None:
+        import puzzle_analysis
+
+        _puzzle_analysis = puzzle_analysis.PuzzleAnalysis(
+            values.file_puzzle_analysis, values.puzzle_analysis_save_delay)
+        atexit.register(_puzzle_analysis.flush)
+    if _puzzle_analysis_version != index.version:
+        _puzzle_analysis.update(index.names())
+        _puzzle_analysis_version = index.version
+    return _puzzle_analysis
+
+
+def _index_puzzles(puzzles):
+    """
+    Add puzzles to the puzzle index, if it has been built.
+
+    :param puzzles: An iterable of (name, puzzle dict) pairs
+    :type puzzles: iterable
+    :return: None
     """
 
-    return get_variables().get('puzzles', {})
+    if _puzzle_index is not None:
+        for name, puzzle in puzzles:
+            _puzzle_index.add(name, puzzle)
 
 
 def add_puzzle(name, puzzle_dict):
     """
-    Add a puzzle to the settings file.
+    Add a puzzle to the puzzle store.
     Creates a confirmation prompt if a puzzle with the given name
     already exists.
     A `puzzle_dict` is a dict with the keys 'puzzle', 'category', and
     'clue', all of which are strings.
-    This is stored in the settings file as a dict where `name` is a
-    key and `puzzle_dict` is its value.
+    This is stored under the name `name`.
 
     :param name: A name for the puzzle
     :type name: str
@@ -72,20 +423,21 @@ def add_puzzle(name, puzzle_dict):
     :return: None
     """
 
-    puzzles = read_puzzles()
+    import prompts
+
+    store = get_puzzle_store()
 
     def write_puzzle():
         """
-        Add `puzzle_dict` to `puzzles` and write `puzzles` to the
-        settings file.
+        Write `puzzle_dict` to the puzzle store.
 
         :return: None
         """
 
-        puzzles[name] = puzzle_dict
-        update_variables({'puzzles': puzzles})
+        store.put(name, puzzle_dict)
+        _index_puzzles([(name, puzzle_dict)])
 
-    if name in puzzles.keys():
+    if store.get(name) is not None:
         prompts.YesNoPrompt(
             strings.label_name_exists.format(name),
             yes_callback=write_puzzle,
@@ -97,7 +449,7 @@ def add_puzzle(name, puzzle_dict):
 
 def add_puzzles(puzzles):
     """
-    Add puzzles to the settings file.
+    Add puzzles to the puzzle store.
     Creates a confirmation prompt if any duplicates are detected.
 
     `puzzles` is a dict of {name: puzzle dict} pairs.
@@ -108,11 +460,14 @@ def add_puzzles(puzzles):
     :return: None
     """
 
-    existing_puzzles = read_puzzles()
+    import prompts
+
+    store = get_puzzle_store()
+    existing_names = store.existing_names(puzzles)
     duplicates = {}
     not_duplicates = {}
     for name, puzzle in puzzles.items():
-        if name in existing_puzzles:
+        if name in existing_names:
             duplicates.update({name: puzzle})
         else:
             not_duplicates.update({name: puzzle})
@@ -124,8 +479,8 @@ def add_puzzles(puzzles):
         :return: None
         """
 
-        existing_puzzles.update(puzzles)
-        update_variables({'puzzles': existing_puzzles})
+        store.put_many(puzzles.items())
+        _index_puzzles(puzzles.items())
 
     def no_overwrite():
         """
@@ -134,8 +489,8 @@ def add_puzzles(puzzles):
         :return: None
         """
 
-        existing_puzzles.update(not_duplicates)
-        update_variables({'puzzles': existing_puzzles})
+        store.put_many(not_duplicates.items(), overwrite=False)
+        _index_puzzles(not_duplicates.items())
 
     if duplicates:
         prompts.YesNoPrompt(
@@ -148,68 +503,150 @@ def add_puzzles(puzzles):
         no_overwrite()
 
 
-def import_puzzles(file_list):
+def import_puzzles(file_list, callback=None):
     """
     Import puzzles from the files in `file_list`, adding the puzzles to
-    the settings file.
+    the puzzle store.
     Files must consist of tab-separated values, of the form:
     {puzzle} {category} ({clue})
 
+    The files are read in a background thread. Progress, and any files
+    which could not be imported, are shown in an
+    :class:`prompts.InfoPrompt` as the import runs. When the import has
+    finished, `callback` is called with no arguments.
+
     :param file_list: a list of filename strings
     :type file_list: list
+    :param callback: A function with no arguments, defaults to None
+    :type callback: function, optional
     :return: None
     """
 
-    unable_to_import = []
-    all_found_puzzles = {}
-    all_duplicate_names = []
-    for puzzle_file in file_list:
-        try:
-            with open(puzzle_file) as f:
-                found_puzzles = {}
-                duplicate_names = []
-                for line in f.readlines():
-                    if line.strip():
-                        fields = line.split('\t')
-                        puzzle = fields[0].ljust(52)[:52].upper()
-                        category = fields[1].strip()
-                        try:
-                            clue = fields[2].strip()
-                        except IndexError:
-                            clue = ''
-
-                        name = ' '.join(puzzle.split())
-                        if (
-                                name not in all_found_puzzles
-                                and name not in found_puzzles):
-                            found_puzzles.update({
-                                name: {
-                                    'puzzle': puzzle,
-                                    'category': category,
-                                    'clue': clue}
-                            })
-                        else:
-                            if name not in duplicate_names:
-                                duplicate_names.append(name)
-
-                # only add any puzzles if no errors encountered above
-                all_found_puzzles.update(found_puzzles)
-                all_duplicate_names += duplicate_names
-        except (EnvironmentError, UnicodeDecodeError, IndexError):
-            unable_to_import.append(puzzle_file)
-    add_puzzles(all_found_puzzles)
-    if unable_to_import:
-        prompts.InfoPrompt(
-            title=strings.title_import_error,
-            text=strings.label_import_puzzle_error.format(
-                '\r\n'.join(unable_to_import))
-        ).open()
-    if all_duplicate_names:
-        prompts.InfoPrompt(
-            title=strings.title_duplicates,
-            text=strings.label_import_duplicates.format(
-                '\r\n'.join(all_duplicate_names))
-        ).open()
+    import prompts
+    import puzzle_import
+
+    progress_prompt = prompts.InfoPrompt(
+        title=strings.title_importing, text='')
+    progress_prompt.open()
+
+    def show_progress(importer, filename, number):
+        """
+        Show the progress of `importer` in `progress_prompt`.
+        This is called from the background thread.
+
+        :param importer: The running importer
+        :type importer: puzzle_import.PuzzleImporter
+        :param filename: The name of the file being imported
+        :type filename: str
+        :param number: The number of the file being imported
+        :type number: int
+        :return: None
+        """
+
+        text = strings.label_import_progress.format(
+            number=number,
+            total=len(importer.file_list),
+            filename=filename,
+            count=importer.imported)
+        text += _import_errors_text(importer)
+        Clock.schedule_once(
+            lambda _dt: setattr(progress_prompt, 'label_text', text))
+
+    def run_in_background(task, finished):
+        """
+        Run `task` in a background thread, then schedule `finished` to
+        be called on the main thread.
+
+        :param task: A function with no arguments
+        :type task: function
+        :param finished: A function with no arguments
+        :type finished: function
+        :return: None
+        """
+
+        def run():
+            """
+            Run `task`, then schedule `finished`.
+
+            :return: None
+            """
+
+            try:
+                task()
+            finally:
+                Clock.schedule_once(lambda _dt: finished())
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def import_finished():
+        """
+        Show the results of the import, and prompt the user to overwrite
+        any puzzles which already exist.
+
+        :return: None
+        """
+
+        progress_prompt.label_text = strings.label_import_finished.format(
+            count=importer.imported) + _import_errors_text(importer)
+        if _puzzle_index is not None:
+            _puzzle_index.update(read_puzzle_names(), get_puzzles)
+
+        if importer.existing_names:
+            overwritten = list(importer.existing_names)
+            prompts.YesNoPrompt(
+                strings.label_names_exist.format(
+                    '\n'.join(importer.existing_names)),
+                yes_callback=lambda: run_in_background(
+                    importer.overwrite_existing,
+                    lambda: overwrite_finished(overwritten)),
+                title=strings.title_names_exist
+            ).open()
+        if importer.duplicate_names:
+            prompts.InfoPrompt(
+                title=strings.title_duplicates,
+                text=strings.label_import_duplicates.format(
+                    '\r\n'.join(importer.duplicate_names))
+            ).open()
+        if callback:
+            callback()
+
+    def overwrite_finished(overwritten):
+        """
+        Show any files which could not be read while overwriting
+        puzzles.
+
+        :param overwritten: The names of the overwritten puzzles
+        :type overwritten: list
+        :return: None
+        """
+
+        _index_puzzles(get_puzzles(overwritten).items())
+        progress_prompt.label_text = strings.label_import_finished.format(
+            count=importer.imported) + _import_errors_text(importer)
+        if callback:
+            callback()
+
+    importer = puzzle_import.PuzzleImporter(
+        file_list, get_puzzle_store(), values.import_batch_size,
+        values.import_chunk_size, processes=values.import_processes,
+        progress_callback=show_progress)
+    run_in_background(importer.run, import_finished)
+
+
+def _import_errors_text(importer):
+    """
+    Get text listing the files which `importer` was unable to import.
+
+    :param importer: A puzzle importer
+    :type importer: puzzle_import.PuzzleImporter
+    :return: The text, or an empty string if there were no errors
+    :rtype: str
+    """
+
+    if not importer.unable_to_import:
+        return ''
+    return '\n\n' + strings.label_import_puzzle_error.format(
+        '\r\n'.join(importer.unable_to_import))
 
 
 def export_puzzles_by_name(filename, puzzle_names):
@@ -225,6 +662,8 @@ def export_puzzles_by_name(filename, puzzle_names):
     :return: None
     """
 
+    import prompts
+
     if not puzzle_names:
         prompts.YesNoPrompt(
             strings.label_no_export_selected,
@@ -232,10 +671,7 @@ def export_puzzles_by_name(filename, puzzle_names):
             title=strings.title_no_export_selected
         ).open()
     else:
-        puzzles = read_puzzles()
-        export_puzzles(
-            filename,
-            OrderedDict((name, puzzles[name]) for name in puzzle_names))
+        export_puzzles(filename, get_puzzles(puzzle_names))
 
 
 def export_puzzles(filename, puzzles):
@@ -252,6 +688,8 @@ def export_puzzles(filename, puzzles):
     :return: None
     """
 
+    import prompts
+
     if '.' not in filename:
         filename += '.txt'
 
@@ -296,6 +734,8 @@ def import_game(filename):
     :rtype: list
     """
 
+    import prompts
+
     game = []
 
     try:
@@ -346,6 +786,8 @@ def export_game(filename, game):
     :return: None
     """
 
+    import prompts
+
     if '.' not in filename:
         filename += '.txt'
 
@@ -382,9 +824,9 @@ def delete_puzzle(name):
     :return: None
     """
 
-    puzzles = read_puzzles()
-    puzzles.pop(name, None)
-    update_variables({'puzzles': puzzles})
+    get_puzzle_store().delete(name)
+    if _puzzle_index is not None:
+        _puzzle_index.remove(name)
 
 
 def delete_all_puzzles():
@@ -394,7 +836,9 @@ def delete_all_puzzles():
     :return: None
     """
 
-    update_variables({'puzzles': {}})
+    get_puzzle_store().delete_all()
+    if _puzzle_index is not None:
+        _puzzle_index.clear()
 
 
 def get_hotkeys():
@@ -409,7 +853,36 @@ def get_hotkeys():
     :rtype: dict
     """
 
-    return get_variables().get('hotkeys', {})
+    return dict(get_variables().get('hotkeys', {}))
+
+
+def get_queue_budget():
+    """
+    Load the limits on how many queued commands each window handles in
+    a single frame from the settings file.
+
+    The 'queue_max_commands' setting is the maximum number of commands,
+    and 'queue_time_budget' is the maximum number of seconds. They
+    default to `values.default_queue_max_commands` and
+    `values.default_queue_time_budget`.
+
+    :return: A tuple of (maximum commands, maximum seconds)
+    :rtype: tuple
+    """
+
+    settings = get_variables()
+
+    try:
+        max_commands = max(1, int(settings.get('queue_max_commands')))
+    except (ValueError, TypeError):
+        max_commands = values.default_queue_max_commands
+
+    try:
+        time_budget = float(settings.get('queue_time_budget'))
+    except (ValueError, TypeError):
+        time_budget = values.default_queue_time_budget
+
+    return max_commands, time_budget
 
 
 def write_hotkeys(hotkeys):
@@ -0,0 +1,31 @@
+import json
+import os
+import tempfile
+
+
+def atomic_write_json(filename, data):
+    """
+    Write `data` to the file `filename` as JSON. The data is written to
+    a temporary file in the same directory, which then replaces
+    `filename`, so other processes will never read a partially written
+    file.
+
+    :param filename: The name of the file
+    :type filename: str
+    :param data: An object which can be serialized as JSON
+    :type data: object
+    :return: None
+    """
+
+    directory, basename = os.path.split(os.path.abspath(filename))
+    fd, temp_filename = tempfile.mkstemp(
+        dir=directory, prefix='.' + basename, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_filename, filename)
+    except BaseException:
+        os.remove(temp_filename)
+        raise
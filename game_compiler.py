@@ -0,0 +1,114 @@
+from array import array
+
+import board_state
+import strings
+
+
+class CompiledPuzzle(object):
+    """
+    A puzzle laid out on a puzzleboard ahead of time, so that it can be
+    shown without any parsing. See :meth:`board_state.BoardState.load`
+    for the layout of the letters.
+    """
+
+    __slots__ = ('puzzle', 'letters', 'letter_positions', 'load_order')
+
+    def __init__(self, puzzle, letters, letter_positions, load_order):
+        """
+        Create the compiled puzzle.
+
+        :param puzzle: The puzzle dict which was compiled
+        :type puzzle: dict
+        :param letters: The letter of each panel, or an empty string for
+                        panels without one
+        :type letters: list
+        :param letter_positions: The panels containing each letter, as
+                                 a dict of {lowercase letter: array of
+                                 panel numbers}
+        :type letter_positions: dict
+        :param load_order: The panels with a letter, in the order in
+                           which they turn white when the puzzle loads
+        :type load_order: array.array
+        """
+
+        self.puzzle = puzzle
+        self.letters = letters
+        self.letter_positions = letter_positions
+        self.load_order = load_order
+
+
+def validate_puzzle(puzzle, size):
+    """
+    Check that a puzzle can be shown on a puzzleboard.
+
+    :param puzzle: A puzzle dict
+    :type puzzle: dict
+    :param size: The number of panels of the puzzleboard
+    :type size: int
+    :return: A list of problems, empty if there are none
+    :rtype: list
+    """
+
+    problems = []
+    puzzle_string = puzzle['puzzle']
+    if len(puzzle_string.rstrip()) > size:
+        problems.append(strings.label_compile_too_long.format(size))
+    if not puzzle_string.strip():
+        problems.append(strings.label_compile_empty)
+    for c in sorted(set(puzzle_string) - {' '}):
+        if not c.isprintable():
+            problems.append(strings.label_compile_unprintable.format(ord(c)))
+        elif c.isalpha() and c.lower() not in strings.alphabet:
+            problems.append(strings.label_compile_unguessable.format(c))
+    return problems
+
+
+def compile_puzzle(puzzle, board):
+    """
+    Lay out a puzzle for a puzzleboard.
+
+    :param puzzle: A puzzle dict
+    :type puzzle: dict
+    :param board: A board of the same size as the puzzleboard, which is
+                  used to lay out the puzzle
+    :type board: board_state.BoardState
+    :return: The compiled puzzle
+    :rtype: CompiledPuzzle
+    """
+
+    board.load(puzzle['puzzle'])
+    return CompiledPuzzle(
+        puzzle, board.letters, board.letter_positions(),
+        array('H', (i for i in board.order_left_to_right
+                    if board.letters[i])))
+
+
+def compile_game(game, rows, cols):
+    """
+    Validate and lay out every puzzle of a game, so that the
+    puzzleboard never has to parse a puzzle during the game.
+    See :func:`data_caching.export_game` for a description of game
+    lists.
+
+    :param game: A game list
+    :type game: list
+    :param rows: The number of rows of the puzzleboard
+    :type rows: int
+    :param cols: The number of columns of the puzzleboard
+    :type cols: int
+    :return: A dict of {puzzle string: compiled puzzle}, and a list of
+             the problems found in each round
+    :rtype: tuple
+    """
+
+    board = board_state.BoardState(rows, cols)
+    compiled = {}
+    problems = []
+    for number, game_round in enumerate(game, 1):
+        puzzle = game_round['puzzle']
+        problems.extend(
+            strings.label_compile_problem.format(number=number, problem=p)
+            for p in validate_puzzle(puzzle, len(board)))
+        if puzzle['puzzle'] not in compiled:
+            compiled[puzzle['puzzle']] = compile_puzzle(puzzle, board)
+    return compiled, problems
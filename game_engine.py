@@ -0,0 +1,823 @@
+import strings
+import values
+
+# the number of players in a game
+players = 3
+
+# round types in which the puzzle is revealed as a toss-up
+tossup_round_types = [
+    strings.round_type_tossup,
+    strings.round_type_triple_tossup,
+    strings.round_type_triple_tossup_final]
+
+
+class GameEngine(object):
+    """
+    The rules of a game, without any widgets, windows, or sounds.
+
+    The engine keeps the players' scores, the list of rounds, and the
+    state of the current round, and changes them as the host runs the
+    game. It does not draw or play anything itself. Instead, every
+    change which should be shown or heard is sent to each subscriber as
+    an event, in the order in which it happens. See :meth:`subscribe`
+    for the events.
+
+    Players are numbered 1, 2, and 3, and player 0 means no player.
+    Methods which change a score or total apply to the selected player.
+    """
+
+    def __init__(
+            self, vowel_price=values.default_vowel_price,
+            min_win=values.default_min_win,
+            clue_solve_reward=values.default_clue_solve_reward):
+        """
+        Create an engine with no game loaded.
+
+        :param vowel_price: The cost of buying a vowel, defaults to
+                            `values.default_vowel_price`
+        :type vowel_price: int, optional
+        :param min_win: The least a player wins for solving a puzzle,
+                        defaults to `values.default_min_win`
+        :type min_win: int, optional
+        :param clue_solve_reward: The reward for solving a clue, defaults
+                                  to `values.default_clue_solve_reward`
+        :type clue_solve_reward: int, optional
+        """
+
+        self.vowel_price = vowel_price
+        self.min_win = min_win
+        self.clue_solve_reward = clue_solve_reward
+
+        self.scores = [0] * players
+        self.totals = [0] * players
+        self.names = [''] * players
+        self.selected_player = 0
+
+        self.game = []
+        self.puzzle_string = ''
+        self.puzzle_clue = ''
+        self.revealed = True
+        self.matches = 0
+        self.unavailable_letters = []
+        self.consonants_remaining = True
+        self.vowels_remaining = True
+        self.speedup_consonants_remaining = True
+        self.final_spin_started = False
+
+        self.tossup_running = False
+        self.tossup_players_done = []
+        self.tossup_available = True
+        # seed for the order in which toss-up letters are revealed, so
+        # that a toss-up can be replayed, or None for a random order
+        self.tossup_seed = None
+        self.tiebreaker_started = False
+        self.tie_resolved = False
+
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """
+        Call `callback` with each event from now on.
+
+        `callback` is called with the name of the event and its
+        arguments, like a command from a queue:
+
+        'sound':
+            Play a sound.
+            *args* is the filename of the sound.
+        'score', 'total', 'name':
+            A player's score, game total, or name changed.
+            *args* is a tuple of the player number and the new value.
+        'selected_player':
+            A player was selected, or 0 if all players were deselected.
+            *args* is the player number.
+        'flash':
+            Make a player's scoreboard flash.
+            *args* is the player number.
+        'stop_flashing':
+            Make all of the scoreboards stop flashing.
+            *args* is None.
+        'puzzleboard':
+            Send a command to the puzzleboard.
+            *args* is the command tuple; see
+            :meth:`puzzleboard.PuzzleLayout.handle_command`.
+        'used_letters':
+            The letters which have been called or are otherwise
+            unavailable changed.
+            *args* is a list of single-character strings.
+        'tossup_music':
+            Start the toss-up music if *args* is True, otherwise stop it.
+        'tossup_available':
+            Whether a toss-up can be started or resumed.
+            *args* is a bool.
+        'tie':
+            More than one player has the highest total before the bonus
+            round. Call :meth:`load_tiebreaker` or :meth:`winner_chosen`
+            to continue.
+            *args* is a list of the tied player numbers.
+        'game', 'puzzle_string', 'revealed', 'matches',
+        'tossup_players_done', 'final_spin_started':
+            The attribute of the same name changed.
+            *args* is its new value.
+
+        :param callback: A function accepting a str and an object
+        :type callback: function
+        :return: None
+        """
+
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        Stop calling `callback` with events.
+
+        :param callback: A function passed to :meth:`subscribe`
+        :type callback: function
+        :return: None
+        """
+
+        self._subscribers.remove(callback)
+
+    def _emit(self, event, args=None):
+        """
+        Send an event to every subscriber.
+
+        :param event: The name of the event
+        :type event: str
+        :param args: The arguments of the event, defaults to None
+        :type args: object, optional
+        :return: None
+        """
+
+        for callback in self._subscribers:
+            callback(event, args)
+
+    def _set(self, name, value):
+        """
+        Change an attribute, and send an event of the same name with its
+        new value.
+
+        :param name: The name of the attribute
+        :type name: str
+        :param value: The new value
+        :type value: object
+        :return: None
+        """
+
+        setattr(self, name, value)
+        self._emit(name, value)
+
+    @property
+    def round_type(self):
+        """
+        The type of the current round.
+
+        :return: One of the `strings.round_type_*` strings, or None if no
+                 game is loaded
+        :rtype: str
+        """
+
+        return self.game[0]['round_type'] if self.game else None
+
+    def select_player(self, player_number):
+        """
+        Select the player indicated by `player_number`.
+        If `player_number` is not 1, 2, or 3, deselect all players.
+        If the player is ineligible to take a turn, do nothing.
+
+        :param player_number: The number of the player
+        :type player_number: int
+        :return: None
+        """
+
+        if player_number not in range(1, players + 1):
+            # deselect
+            self._set('selected_player', 0)
+            self._emit('stop_flashing')
+            return
+
+        # True if the player already rang in on this toss-up
+        already_rang = (player_number in self.tossup_players_done)
+        # True if a tossup has been started but is currently paused.
+        # This means another player has already rung in.
+        not_my_turn = (self.tossup_players_done and not self.tossup_running)
+        if already_rang or not_my_turn:
+            # player is ineligible
+            return
+
+        self._set('selected_player', player_number)
+        self._emit('stop_flashing')
+        self._emit('flash', player_number)
+        if self.tossup_running:
+            self.tossup(player=self.selected_player)
+        if (
+                self.final_spin_started
+                and not self.speedup_consonants_remaining):
+            self.no_more_consonants()
+
+    def select_winner(self):
+        """
+        Select the player with the highest total to proceed to the bonus
+        round, and load the bonus round puzzle.
+        If there is a tie which has not been resolved, send a 'tie' event
+        instead.
+
+        :return: None
+        """
+
+        max_score = 0
+        winning_players = []
+        for player_index in range(1, players + 1):
+            total = self.totals[player_index - 1]
+            if total > max_score:
+                max_score = total
+                winning_players = [player_index]
+            elif total == max_score:
+                winning_players.append(player_index)
+
+        if len(winning_players) > 1:
+            if not self.tie_resolved:
+                self._emit('tie', winning_players)
+            else:
+                # proceed to bonus round with selected player
+                self.load_puzzle(self.game[0]['puzzle'])
+        else:
+            self.winner_chosen(winning_players[0])
+
+    def load_tiebreaker(self, puzzle, winning_players):
+        """
+        Load a puzzle dict as a tiebreaker toss-up, which only the tied
+        players can ring in on.
+
+        `puzzle` is a puzzle dict.
+        See :func:`data_caching.add_puzzle` for a description of
+        puzzle dicts.
+
+        :param puzzle: A puzzle dict
+        :type puzzle: dict
+        :param winning_players: The numbers of the tied players
+        :type winning_players: list
+        :return: None
+        """
+
+        self.tiebreaker_started = True
+        game_round = {
+            'round_type': strings.round_type_tossup,
+            'round_reward': 0,
+            'puzzle': puzzle}
+        self._set('game', [game_round] + self.game)
+        self.load_puzzle(puzzle)
+        self._set('tossup_players_done', [
+            i for i in range(1, players + 1) if i not in winning_players])
+
+    def winner_chosen(self, player_number):
+        """
+        Declare a player as the winner, and load the bonus round puzzle.
+
+        :param player_number: The player number
+        :type player_number: int
+        :return: None
+        """
+
+        self.select_player(player_number)
+        self.load_puzzle(self.game[0]['puzzle'])
+
+    def set_name(self, name):
+        """
+        Set the name of the selected player.
+
+        :param name: A name for the player
+        :type name: str
+        :return: None
+        """
+
+        if self.selected_player:
+            self.names[self.selected_player - 1] = name
+            self._emit('name', (self.selected_player, name))
+
+    def get_score(self):
+        """
+        Get the score of the selected player.
+        Returns 0 if no player is selected.
+
+        :return: The player's score
+        :rtype: int
+        """
+
+        if self.selected_player:
+            return self.scores[self.selected_player - 1]
+        return 0
+
+    def set_score(self, new_score):
+        """
+        Set the score of the selected player.
+
+        :param new_score: The new score
+        :type new_score: int
+        :return: None
+        """
+
+        if self.selected_player:
+            self._set_player_score(self.selected_player, new_score)
+
+    def _set_player_score(self, player_number, new_score):
+        """
+        Set the score of any player.
+
+        :param player_number: The player number
+        :type player_number: int
+        :param new_score: The new score
+        :type new_score: int
+        :return: None
+        """
+
+        self.scores[player_number - 1] = new_score
+        self._emit('score', (player_number, new_score))
+
+    def add_score(self, new_score):
+        """
+        Add `new_score` to the selected player's score.
+
+        :param new_score: The number to be added
+        :type new_score: int
+        :return: None
+        """
+
+        self.set_score(self.get_score() + new_score)
+
+    def get_total(self):
+        """
+        Get the game total of the selected player.
+        Returns 0 if no player is selected.
+
+        :return: The player's total
+        :rtype: int
+        """
+
+        if self.selected_player:
+            return self.totals[self.selected_player - 1]
+        return 0
+
+    def set_total(self, total):
+        """
+        Set the game total of the selected player.
+
+        :param total: The player's new total
+        :type total: int
+        :return: None
+        """
+
+        if self.selected_player:
+            self._set_player_total(self.selected_player, total)
+
+    def _set_player_total(self, player_number, total):
+        """
+        Set the game total of any player.
+
+        :param player_number: The player number
+        :type player_number: int
+        :param total: The player's new total
+        :type total: int
+        :return: None
+        """
+
+        self.totals[player_number - 1] = total
+        self._emit('total', (player_number, total))
+
+    def add_total(self, total):
+        """
+        Add `total` to the selected player's game total.
+
+        :param total: The number to be added
+        :type total: int
+        :return: None
+        """
+
+        self.set_total(self.get_total() + total)
+
+    def reset_scores(self):
+        """
+        Reset all players' scores and game totals, and deselect all
+        players.
+
+        :return: None
+        """
+
+        for i in range(1, players + 1):
+            self._set_player_score(i, 0)
+            self._set_player_total(i, 0)
+
+        self.select_player(0)
+
+    def load_game(self, game):
+        """
+        Load a game. See :func:`data_caching.export_game` for a
+        description of game lists.
+
+        :param game: A game list
+        :type game: list
+        :return: None
+        """
+
+        self.tie_resolved = False
+        self._set('game', list(game))
+        if game:
+            self.load_puzzle(self.game[0]['puzzle'])
+        self.reset_scores()
+
+    def load_puzzle(self, puzzle):
+        """
+        Load a puzzle dict.
+        See :func:`data_caching.add_puzzle` for a description of
+        puzzle dicts.
+
+        :param puzzle: A puzzle dict
+        :type puzzle: dict
+        :return: None
+        """
+
+        if puzzle['puzzle'].strip():
+            if self.round_type in tossup_round_types:
+                self._emit('sound', values.file_sound_reveal_tossup)
+            else:
+                self._emit('sound', values.file_sound_reveal_puzzle)
+
+        if self.tossup_running:
+            self.tossup()
+        self.unavailable_letters = []
+        self._emit('puzzleboard', ('load', puzzle))
+        self._emit('used_letters', list(self.unavailable_letters))
+        self._set('tossup_players_done', [])
+        self.consonants_remaining = True
+        self.vowels_remaining = True
+        self.speedup_consonants_remaining = True
+
+        # consider revealed if the puzzleboard is clear
+        self._set('revealed', not puzzle['puzzle'].split())
+
+    def puzzle_loaded(self, puzzle):
+        """
+        Note that the puzzleboard has shown a puzzle dict.
+
+        :param puzzle: A puzzle dict
+        :type puzzle: dict
+        :return: None
+        """
+
+        self._set('puzzle_string', ' '.join(puzzle['puzzle'].split()))
+        if self.puzzle_string:
+            self.tie_resolved = False
+        self.puzzle_clue = puzzle['clue']
+
+    def next_puzzle(self):
+        """
+        If there are still puzzles in the game list, load the next one.
+        After the final spin, the rest of the speed-up rounds are
+        skipped. Before the bonus round, the winner is selected.
+
+        :return: None
+        """
+
+        try:
+            self.game.pop(0)
+            puzzle = self.game[0]
+
+            if self.final_spin_started:
+                while puzzle['round_type'] == strings.round_type_speedup:
+                    self.game.pop(0)
+                    puzzle = self.game[0]
+                self.set_final_spin_started(False)
+        except IndexError:
+            self._emit('game', self.game)
+            return
+        self._emit('game', self.game)
+
+        if puzzle['round_type'] == strings.round_type_bonus:
+            self.select_winner()
+        else:
+            self.load_puzzle(puzzle['puzzle'])
+
+    def clear_puzzle(self):
+        """
+        Clear the puzzleboard.
+
+        :return: None
+        """
+
+        self.load_puzzle({
+            'category': '',
+            'clue': '',
+            'puzzle': ' ' * 52})
+
+    def tossup(self, player=None):
+        """
+        If there is no tossup in progress, start one.
+        If there is a tossup in progress, pause it.
+        If `player` is 1, 2, or 3, select that player.
+
+        :param player: A player's number, defaults to None
+        :type player: int, optional
+        :return: None
+        """
+
+        if player:
+            if player in self.tossup_players_done:
+                return
+            self.tossup_players_done.append(player)
+            self._emit('tossup_players_done', self.tossup_players_done)
+
+        if self.tossup_running:
+            self._emit('puzzleboard', ('pause_tossup', None))
+            self._set('tossup_available', True)
+
+            if self.revealed:
+                self._emit('tossup_music', False)
+                self._emit('sound', values.file_sound_buzz_double)
+
+            if player in range(1, players + 1):
+                self.select_player(player)
+        else:
+            self._set('tossup_available', False)
+            if not self.tossup_players_done:
+                # start tossup
+                self._emit('puzzleboard', ('tossup', self.tossup_seed))
+            else:
+                # tossup already started, resume
+                self._emit('puzzleboard', ('resume_tossup', None))
+            self.select_player(0)
+            self._emit('tossup_music', True)
+
+        self.tossup_running = not self.tossup_running
+
+    def tossup_timeout(self):
+        """
+        Note that time is up for solving a toss-up, and pause it.
+
+        :return: None
+        """
+
+        self._set('revealed', True)
+        self.tossup()
+
+    def reveal_puzzle(self, player_solved=True):
+        """
+        Reveal the puzzle.
+        If `player_solved` is True, reward the selected player and play
+        the sound indicating their success, depending on the round.
+
+        :param player_solved: True if a player solved the puzzle,
+                              defaults to True
+        :type player_solved: bool, optional
+        :return: None
+        """
+
+        self._emit('tossup_music', False)
+
+        if player_solved:
+            if self.game:
+                if self.tiebreaker_started:
+                    self.tie_resolved = True
+                    self.tiebreaker_started = False
+                round_type = self.round_type
+                if round_type == strings.round_type_bonus:
+                    self._emit('sound', values.file_sound_solve_bonus)
+                elif round_type == strings.round_type_triple_tossup:
+                    self._emit(
+                        'sound', values.file_sound_solve_triple_tossup)
+                elif round_type in [
+                        strings.round_type_tossup,
+                        strings.round_type_triple_tossup_final]:
+                    self._emit('sound', values.file_sound_solve_tossup)
+                else:
+                    # not a tossup or bonus round,
+                    # increase score if less than minimum prize
+                    if self.get_score() < self.min_win:
+                        self.set_score(self.min_win)
+
+                    if self.game[0]['puzzle']['clue']:
+                        self._emit('sound', values.file_sound_solve_clue)
+                    else:
+                        self._emit('sound', values.file_sound_solve)
+
+                self.add_total(int(self.game[0]['round_reward']))
+        self._emit('puzzleboard', ('reveal', None))
+        self._emit('stop_flashing')
+
+        self._set('revealed', True)
+
+    def solve_clue(self, player_solved):
+        """
+        If `player_solved` is True, add `clue_solve_reward` to the
+        selected player's score, and play the 'clue correct' sound.
+        Otherwise, play the buzzer sound.
+
+        :param player_solved: True if the player solved the clue
+        :type player_solved: bool
+        :return: None
+        """
+
+        if player_solved:
+            self.add_score(self.clue_solve_reward)
+            self._emit('sound', values.file_sound_clue_correct)
+        else:
+            self._emit('sound', values.file_sound_buzz)
+
+    def guessed_letter(self, letter):
+        """
+        Check the puzzle for a letter, and remove it from the used
+        letters board.
+
+        :param letter: A string consisting of a single letter
+        :type letter: str
+        :return: None
+        """
+
+        self.unavailable_letters.append(letter.lower())
+        self._emit('puzzleboard', ('letter', letter))
+        self._emit('used_letters', list(self.unavailable_letters))
+
+    def buy_vowel(self):
+        """
+        If the player can afford a vowel, subtract `vowel_price` from
+        their score.
+
+        :return: None
+        """
+
+        if self.get_score() >= self.vowel_price:
+            self.add_score(-self.vowel_price)
+
+    def bonus_round_letters(self, letters):
+        """
+        Check the puzzle for the letters selected in the bonus round,
+        and remove them from the used letter board.
+
+        :param letters: A list of single-character strings
+        :type letters: list
+        :return: None
+        """
+
+        self.unavailable_letters.extend(letters)
+        self._emit('puzzleboard', ('bonus_round_letters', letters))
+        self._emit('used_letters', list(self.unavailable_letters))
+
+    def correct_letter(self, match):
+        """
+        Note the number of matches for a letter.
+        If there are no matches, play the buzzer sound.
+        `match` is a tuple of the form (letter, number) indicating the
+        letter and the number of matches.
+
+        :param match: A letter and the number of matches
+        :type match: tuple
+        :return: None
+        """
+
+        _letter, matches = match
+        self._set('matches', matches)
+
+        if not self.matches and not self.final_spin_started:
+            self._emit('sound', values.file_sound_buzz)
+
+    def reset_matches(self):
+        """
+        Forget the number of matches for the last letter.
+
+        :return: None
+        """
+
+        self._set('matches', 0)
+
+    def increase_score(self, value):
+        """
+        Adjust the selected player's score based on the number of
+        matches.
+
+        :param value: The value of each match, or None if no value is
+                      selected
+        :type value: int
+        :return: None
+        """
+
+        if value:
+            self.add_score(self.matches * value)
+
+    def ding(self):
+        """
+        Play a 'ding' sound as a panel turns blue, unless it is the
+        speed-up round.
+
+        :return: None
+        """
+
+        if not self.final_spin_started:
+            self._emit('sound', values.file_sound_ding)
+
+    def consonants_exhausted(self):
+        """
+        Note that no consonants remain in the puzzle. In the speed-up
+        round, the announcement is postponed until the next player's
+        turn.
+
+        :return: None
+        """
+
+        if self.final_spin_started:
+            self.speedup_consonants_remaining = False
+        else:
+            self.no_more_consonants()
+
+    def no_more_consonants(self):
+        """
+        Play a sound indicating no more consonants, and remove
+        consonants from the used letters board.
+
+        :return: None
+        """
+
+        # only do this once per round
+        if self.consonants_remaining:
+            self.consonants_remaining = False
+
+            self._emit('sound', values.file_sound_no_more_consonants)
+
+            self.unavailable_letters.extend([
+                c for c in strings.consonants
+                if c not in self.unavailable_letters])
+            self._emit('used_letters', list(self.unavailable_letters))
+
+    def no_more_vowels(self):
+        """
+        Play a sound indicating no more vowels, and remove vowels from
+        the used letters board.
+
+        :return: None
+        """
+
+        # only do this once per round
+        if self.vowels_remaining:
+            self.vowels_remaining = False
+
+            self._emit('sound', values.file_sound_no_more_vowels)
+
+            self.unavailable_letters.extend([
+                c for c in strings.vowels
+                if c not in self.unavailable_letters])
+            self._emit('used_letters', list(self.unavailable_letters))
+
+    def lose_turn(self):
+        """
+        Player has lost a turn; move to next player.
+
+        :return: None
+        """
+
+        self.select_player((self.selected_player % players) + 1)
+
+    def bankrupt(self):
+        """
+        Bankrupt the selected player.
+
+        :return: None
+        """
+
+        if self.selected_player:
+            self._emit('sound', values.file_sound_bankrupt)
+            self.set_score(0)
+
+    def bank_score(self):
+        """
+        Add the selected player's score to their game total, then set
+        each player's score to 0.
+
+        :return: None
+        """
+
+        self.add_total(self.get_score())
+
+        for i in range(1, players + 1):
+            self._set_player_score(i, 0)
+
+    def set_final_spin_started(self, started):
+        """
+        Start or end the final spin of the speed-up round.
+
+        :param started: True if the final spin has started
+        :type started: bool
+        :return: None
+        """
+
+        if started != self.final_spin_started:
+            self._set('final_spin_started', started)
+
+    def speedup_buzz(self):
+        """
+        Play the buzz sound when a player runs out of time to solve the
+        puzzle in the speed-up round.
+        Does nothing if the final spin has ended.
+
+        :return: None
+        """
+
+        if self.final_spin_started:
+            self._emit('sound', values.file_sound_buzz)
@@ -0,0 +1,322 @@
+import multiprocessing
+import struct
+import time
+from multiprocessing import sharedctypes
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python 3.7
+    shared_memory = None
+
+import strings
+
+# players, in the order in which they are stored
+colors = ('red', 'yellow', 'blue')
+
+# maximum number of bytes of a player's name, encoded as UTF-8
+name_size = 64
+
+# the sequence counter, followed by each player's score, total, name and
+# whether their scoreboard is flashing, followed by the final spin
+# timer's start time, seconds left, and deadline (NaN unless the timer
+# is running), followed by the unavailable letters
+_counter = struct.Struct('<Q')
+_player = struct.Struct('<qq{}s?'.format(name_size))
+_timer = struct.Struct('<ddd')
+_letters = struct.Struct('<{}s'.format(len(strings.alphabet)))
+_timer_offset = _counter.size + _player.size * len(colors)
+_letters_offset = _timer_offset + _timer.size
+_size = _letters_offset + _letters.size
+
+# times a reader retries while the block is being written, before giving
+# up on the writer, which may have stopped in the middle of a write
+_max_read_attempts = 1000
+
+
+def _read_players(buf):
+    """
+    Read the values of all players, and the unavailable letters, from a
+    shared block.
+
+    :param buf: The shared block
+    :type buf: memoryview
+    :return: A list of (score, total, encoded name, flashing) tuples, in
+             the order of `colors`, and the encoded unavailable letters
+    :rtype: tuple
+    """
+
+    return [
+        _player.unpack_from(buf, _counter.size + _player.size * i)
+        for i in range(len(colors))
+    ], _letters.unpack_from(buf, _letters_offset)[0]
+
+
+def _read_timer(buf):
+    """
+    Read the state of the final spin timer from a shared block.
+
+    :param buf: The shared block
+    :type buf: memoryview
+    :return: A tuple of (start_time, seconds_left, deadline)
+    :rtype: tuple
+    """
+
+    return _timer.unpack_from(buf, _timer_offset)
+
+
+class GameState(object):
+    """
+    The players' scores, totals, and names, which scoreboards are
+    flashing, the unavailable letters, and the state of the final spin
+    timer, in a block of memory shared between processes.
+
+    The manager writes the block, and the score windows read it. Before
+    and after each write, a sequence counter is incremented, so it is
+    odd while a write is in progress. Readers retry if the counter is
+    odd or changes while they read. After each write, the readers
+    blocked in :meth:`wait` are woken, so that nothing has to be sent
+    to them.
+
+    The block uses :mod:`multiprocessing.shared_memory` where it is
+    available, or a :func:`multiprocessing.sharedctypes.RawArray`
+    otherwise. A GameState may be passed to a
+    :class:`multiprocessing.Process` as an argument, but should not be
+    sent through a Queue.
+    """
+
+    def __init__(self):
+        """
+        Create the shared block, with all players' values zeroed and the
+        timer stopped at zero.
+        """
+
+        if shared_memory:
+            self._memory = shared_memory.SharedMemory(create=True, size=_size)
+        else:
+            self._memory = sharedctypes.RawArray('B', _size)
+        self._owner = True
+        # notified after each write
+        self._changed = multiprocessing.Condition()
+        # {read function: (counter, values)} of the last good reads
+        self._last_read = {}
+        self.set_timer(0, 0)
+
+    def __getstate__(self):
+        return {'_memory': self._memory, '_changed': self._changed}
+
+    def __setstate__(self, state):
+        self._memory = state['_memory']
+        self._changed = state['_changed']
+        self._owner = False
+        self._last_read = {}
+
+    @property
+    def _buf(self):
+        """
+        The shared block.
+
+        :return: An object supporting the buffer protocol
+        :rtype: memoryview
+        """
+
+        if shared_memory:
+            return self._memory.buf
+        return self._memory
+
+    def set_player(self, color, score=None, total=None, name=None,
+                   flashing=None):
+        """
+        Change the values of a player. Values which are None are not
+        changed.
+        Names longer than `name_size` bytes are shortened.
+
+        :param color: The player's color, one of `colors`
+        :type color: str
+        :param score: The player's score, defaults to None
+        :type score: int, optional
+        :param total: The player's game total, defaults to None
+        :type total: int, optional
+        :param name: The player's name, defaults to None
+        :type name: str, optional
+        :param flashing: Whether the player's scoreboard is flashing,
+                         defaults to None
+        :type flashing: bool, optional
+        :return: None
+        """
+
+        buf = self._buf
+        offset = _counter.size + _player.size * colors.index(color)
+        old_score, old_total, old_name, old_flashing = _player.unpack_from(
+            buf, offset)
+        if name is None:
+            encoded_name = old_name
+        else:
+            encoded_name = name.encode('utf-8')[:name_size].decode(
+                'utf-8', 'ignore').encode('utf-8')
+
+        self._write(
+            _player, offset,
+            old_score if score is None else score,
+            old_total if total is None else total,
+            encoded_name,
+            old_flashing if flashing is None else flashing)
+
+    def set_unavailable(self, letters):
+        """
+        Change the letters which have been called or are otherwise
+        unavailable. Repeated letters are only stored once.
+
+        :param letters: A list of single-character strings from
+                        `strings.alphabet`
+        :type letters: list
+        :return: None
+        """
+
+        letters = ''.join(dict.fromkeys(letter.lower() for letter in letters))
+        self._write(_letters, _letters_offset, letters.encode('ascii'))
+
+    def set_timer(self, start_time, seconds_left, deadline=None):
+        """
+        Change the state of the final spin timer.
+
+        `deadline` is a time from :func:`time.monotonic`, which is the
+        same in every process on a computer.
+
+        :param start_time: The number of seconds on the timer before it
+                           is started
+        :type start_time: float
+        :param seconds_left: The number of seconds left when the timer
+                             was last paused or reset
+        :type seconds_left: float
+        :param deadline: The time at which the running timer will run
+                         out, or None if it is not running, defaults to
+                         None
+        :type deadline: float, optional
+        :return: None
+        """
+
+        self._write(
+            _timer, _timer_offset, start_time, seconds_left,
+            float('nan') if deadline is None else deadline)
+
+    def _write(self, item, offset, *values):
+        """
+        Write a struct to the shared block, incrementing the sequence
+        counter before and after, and wake the readers.
+
+        :param item: The format of the values
+        :type item: struct.Struct
+        :param offset: The offset of the values in the block
+        :type offset: int
+        :param values: The values to write
+        :return: None
+        """
+
+        buf = self._buf
+        counter, = _counter.unpack_from(buf, 0)
+        _counter.pack_into(buf, 0, counter + 1)
+        item.pack_into(buf, offset, *values)
+        _counter.pack_into(buf, 0, counter + 2)
+        with self._changed:
+            self._changed.notify_all()
+
+    def _read(self, read_values):
+        """
+        Read values from the shared block, retrying until they were not
+        changed while being read. Between attempts, the rest of the
+        process is allowed to run. If the values are still changing
+        after `_max_read_attempts` attempts, the last good values read
+        by this GameState are returned, or the values as they are if
+        there are none.
+
+        :param read_values: A function accepting the block and returning
+                            the values, such as :func:`_read_players`
+        :type read_values: function
+        :return: A tuple of (counter, values)
+        :rtype: tuple
+        """
+
+        buf = self._buf
+        for _attempt in range(_max_read_attempts):
+            counter, = _counter.unpack_from(buf, 0)
+            if not counter % 2:
+                result = read_values(buf)
+                if _counter.unpack_from(buf, 0)[0] == counter:
+                    self._last_read[read_values] = counter, result
+                    return counter, result
+            # a write is in progress
+            time.sleep(0)
+        if read_values in self._last_read:
+            return self._last_read[read_values]
+        return counter, read_values(buf)
+
+    def read(self):
+        """
+        Get the values of all players, and the unavailable letters.
+
+        :return: A tuple of (counter, players, letters), where players
+                 is a dict of {color: (score, total, name, flashing)},
+                 and letters is a list of single-character strings
+        :rtype: tuple
+        """
+
+        counter, (rows, letters) = self._read(_read_players)
+        return counter, {
+            color: (
+                score, total, name.rstrip(b'\0').decode('utf-8'), flashing)
+            for color, (score, total, name, flashing) in zip(colors, rows)
+        }, list(letters.rstrip(b'\0').decode('ascii'))
+
+    def read_timer(self):
+        """
+        Get the state of the final spin timer.
+        See :meth:`set_timer`. The time left on a running timer is
+        `deadline` minus :func:`time.monotonic`, so it can be worked out
+        at any moment without reading the block again.
+
+        :return: A tuple of (start_time, seconds_left, deadline), where
+                 deadline is None if the timer is not running
+        :rtype: tuple
+        """
+
+        _counter_value, (start_time, seconds_left, deadline) = self._read(
+            _read_timer)
+        if deadline != deadline:
+            # NaN
+            deadline = None
+        return start_time, seconds_left, deadline
+
+    def wait(self, counter=None, timeout=None):
+        """
+        Block until the block has been written since a reader saw the
+        sequence counter `counter`.
+
+        :param counter: The counter as of the last read, defaults to
+                        None to return straight away
+        :type counter: int, optional
+        :param timeout: The maximum number of seconds to wait, defaults
+                        to None to wait for as long as it takes
+        :type timeout: float, optional
+        :return: The current counter
+        :rtype: int
+        """
+
+        buf = self._buf
+        with self._changed:
+            self._changed.wait_for(
+                lambda: _counter.unpack_from(buf, 0)[0] != counter, timeout)
+            return _counter.unpack_from(buf, 0)[0]
+
+    def close(self):
+        """
+        Stop using the shared block, freeing it if it was created by
+        this process.
+
+        :return: None
+        """
+
+        if shared_memory:
+            self._memory.close()
+            if self._owner:
+                self._memory.unlink()
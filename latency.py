@@ -0,0 +1,63 @@
+import bisect
+
+import strings
+
+
+class LatencyHistogram(object):
+    """
+    Counts how long something takes, in buckets of increasing duration.
+    Used for debugging, such as timing the handling of keystrokes.
+    """
+
+    def __init__(self, bounds):
+        """
+        Create an empty histogram.
+
+        :param bounds: The upper bound in seconds of each bucket, in
+                       increasing order. Durations of at least the last
+                       bound are counted in an extra bucket.
+        :type bounds: list
+        """
+
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.max = 0
+
+    def __len__(self):
+        return sum(self.counts)
+
+    def record(self, seconds):
+        """
+        Count a duration.
+
+        :param seconds: A duration in seconds
+        :type seconds: float
+        :return: None
+        """
+
+        self.counts[bisect.bisect_right(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def report(self, title):
+        """
+        Describe the histogram, with durations in milliseconds.
+
+        :param title: What was timed
+        :type title: str
+        :return: A multi-line string
+        :rtype: str
+        """
+
+        count = len(self)
+        lines = [strings.latency_title.format(
+            title=title, count=count,
+            mean=self.total / count * 1000 if count else 0,
+            max=self.max * 1000)]
+        for bound, bucket_count in zip(self.bounds, self.counts):
+            lines.append(strings.latency_bucket.format(
+                bound=bound * 1000, count=bucket_count))
+        lines.append(strings.latency_bucket_last.format(
+            bound=self.bounds[-1] * 1000, count=self.counts[-1]))
+        return '\n'.join(lines)
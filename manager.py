@@ -1,5 +1,14 @@
+import argparse
 import multiprocessing
 import queue
+import sys
+import time
+
+import startup_profiler
+
+if __name__ == '__main__' and '--profile-startup' in sys.argv:
+    # before the imports below, so that they are timed
+    startup_profiler.enable()
 
 from kivy.app import App
 from kivy.clock import Clock
@@ -10,21 +19,46 @@ from kivy.properties import (
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.textinput import TextInput
 
-import data_caching
-import prompts
+startup_profiler.mark('import kivy')
+
+from kivy.core.window import Window
+
+import game_engine
+import game_state
+import latency
+import messaging
+import puzzle_solver
 import puzzleboard
 import score
+import sounds
 import strings
 import used_letters
 import values
 from my_widgets import Fullscreenable, KeyboardBindable
 
+# data_caching and prompts are imported by the methods which use them, so
+# that the windows launched from this module do not load them at startup
+
+startup_profiler.mark('import modules and create window')
+
 Builder.load_file(values.file_kv_manager)
 
+startup_profiler.mark('load manager kv')
+
+# modifier keys which can be part of a hotkey, in the order in which they
+# are written in key combinations
+hotkey_modifiers = ['ctrl', 'alt', 'shift']
+
 
 class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
     """
     The root layout for the manager app.
+
+    The rules of the game are kept by a :class:`game_engine.GameEngine`.
+    The layout passes the host's actions to the engine, and shows,
+    plays, and sends on the engine's events; see
+    :meth:`handle_engine_event`. The properties below mirror the
+    engine's attributes of the same name, for use in kv.
     """
 
     game = ListProperty([])
@@ -35,9 +69,16 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
     selected_player = NumericProperty(0)
     matches = NumericProperty(0)
 
+    # whether to record how long each keystroke takes to handle
+    profile_hotkeys = False
+    # seed for the order of toss-up reveals, or None for a random order,
+    # see game_engine.GameEngine.tossup_seed
+    tossup_seed = None
+
     def __init__(
             self, puzzle_queue_out, puzzle_queue_in,
-            red_q, ylw_q, blu_q, letters_q, **kwargs):
+            red_q, ylw_q, blu_q, letters_q, game_state, queue_budget=None,
+            **kwargs):
         """
         Create the layout.
 
@@ -55,6 +96,15 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :type blu_q: multiprocessing.Queue
         :param letters_q: Queue to use for the used letters board
         :type letters_q: multiprocessing.Queue
+        :param game_state: The players' names, scores, totals, and
+                           flashing, and the unavailable letters, shared
+                           with the scoreboards and used letters board
+        :type game_state: game_state.GameState
+        :param queue_budget: The limits on the commands handled from
+                             the queue in each frame, see
+                             :class:`messaging.QueueListener`, defaults
+                             to None
+        :type queue_budget: tuple, optional
         :param kwargs: Additional keyword arguments for the layout
         :return: None
         """
@@ -67,29 +117,47 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         self.ylw_q = ylw_q
         self.blu_q = blu_q
         self.letters_q = letters_q
+        self.game_state = game_state
+
+        self.player_buttons = [self.btn_red, self.btn_ylw, self.btn_blu]
+
+        self.engine = game_engine.GameEngine()
+        self.engine.tossup_seed = self.tossup_seed
+        self.engine.subscribe(self.handle_engine_event)
+        # finds answers which fit the puzzleboard, see show_hints
+        self.solver = puzzle_solver.SolverWorker(
+            self.solver_corpus, self.hints_found, values.solver_hint_limit)
+        self._tossup_sound = None
+        self.sound_bank = sounds.SoundBank(
+            values.sound_cache_size, values.sound_voices)
+        # load common sounds once the window is showing
+        Clock.schedule_once(
+            lambda _dt: self.sound_bank.preload(values.sound_preload),
+            values.sound_preload_delay)
 
-        self.unavailable_letters = []
-        self.tossup_running = False
-        self.tossup_sound = SoundLoader.load(values.file_sound_tossup)
-        self.puzzle_clue = ''
-        self.speedup_consonants_remaining = True
-        self.consonants_remaining = True
-        self.vowels_remaining = True
-        self.tiebreaker_started = False
-        self.tie_resolved = False
-
-        self.vowel_price = 0
-        self.min_win = 0
-        self.clue_solve_reward = 0
         self.hotkeys = {}
-
+        # {key combination: function}, see compile_hotkeys
+        self.hotkey_table = {}
+        self.letters_allowed = False
+        self.round_is_speedup = False
+        self.round_is_tossup = False
+        self.hotkey_latency = None
+        if self.profile_hotkeys:
+            self.hotkey_latency = latency.LatencyHistogram(
+                values.hotkey_latency_buckets)
+
+        self.timer.bind(on_timer_changed=self.share_timer)
+        self.timer.bind(final_spin_started=self.final_spin_changed)
         self.load_settings()
+        startup_profiler.mark('load settings')
         self.tossup_button.disabled = False
 
         self.get_keyboard()
 
         if self.puzzle_queue_in:
-            Clock.schedule_once(self.check_queue, values.queue_start)
+            self.listener = messaging.QueueListener(
+                self.puzzle_queue_in, self.handle_command, queue_budget)
+            Clock.schedule_once(self.listener.start, values.queue_start)
 
         App.get_running_app().bind(on_stop=self.exit_other_apps)
 
@@ -139,6 +207,9 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         If a registered hotkey is detected, perform the associated
         action.
 
+        If `profile_hotkeys` is set, the time taken is recorded in
+        `hotkey_latency`.
+
         :param _keyboard: A Keyboard
         :type _keyboard: kivy.core.window.Keyboard
         :param keycode: An integer and a string representing the keycode
@@ -151,111 +222,168 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :rtype: bool
         """
 
-        valid_hotkey_modifiers = ['ctrl', 'alt', 'shift']
-        relevant_modifiers = [
-            mod for mod in valid_hotkey_modifiers if mod in modifiers]
+        if self.hotkey_latency is None:
+            return self.handle_key(keycode[1], modifiers)
+        start = time.perf_counter()
+        handled = self.handle_key(keycode[1], modifiers)
+        self.hotkey_latency.record(time.perf_counter() - start)
+        return handled
+
+    def handle_key(self, letter, modifiers):
+        """
+        Perform the action for a key, using the table compiled by
+        :meth:`compile_hotkeys`.
+
+        :param letter: The name of the key
+        :type letter: str
+        :param modifiers: A list of modifiers
+        :type modifiers: list
+        :return: True if key was handled, otherwise False
+        :rtype: bool
+        """
 
-        letter = keycode[1]
-        combination = '+'.join(relevant_modifiers + [letter])
         if letter == 'tab':
             self.name_input.focus = True
-        elif (
+            return True
+
+        relevant_modifiers = [
+            mod for mod in hotkey_modifiers if mod in modifiers]
+        if (
                 not relevant_modifiers
+                and self.letters_allowed
                 and letter in strings.alphabet
                 and self.selected_player != 0
                 and (self.get_value() is not None
-                     or letter in strings.vowels)
-                and self.game
-                and self.game[0]['round_type'] not in [
-                    strings.round_type_tossup,
-                    strings.round_type_triple_tossup,
-                    strings.round_type_triple_tossup_final,
-                    strings.round_type_bonus]):
+                     or letter in strings.vowels)):
             self.guessed_letter(letter)
-        elif combination == self.hotkeys.get('select_1'):
-            self.select_player(1)
-        elif combination == self.hotkeys.get('select_2'):
-            self.select_player(2)
-        elif combination == self.hotkeys.get('select_3'):
-            self.select_player(3)
-        elif combination == self.hotkeys.get('select_next'):
-            self.select_player((self.selected_player % 3) + 1)
-        elif combination == self.hotkeys.get('increase_score'):
-            self.increase_score()
-        elif combination == self.hotkeys.get('select_puzzle'):
+            return True
+
+        action = self.hotkey_table.get('+'.join(relevant_modifiers + [letter]))
+        if action is None:
+            return False
+        action()
+        return True
+
+    def compile_hotkeys(self):
+        """
+        Build the table of hotkeys for the current round, mapping each
+        key combination to the function it calls. Hotkeys which cannot
+        be used in the current round are left out, so handling a key
+        needs a single lookup. This is called when the settings are
+        loaded, and when the round changes.
+
+        :return: None
+        """
+
+        round_type = self.game[0]['round_type'] if self.game else None
+        self.round_is_speedup = round_type == strings.round_type_speedup
+        self.round_is_tossup = round_type in [
+            strings.round_type_tossup,
+            strings.round_type_triple_tossup,
+            strings.round_type_triple_tossup_final]
+        # letters can't be guessed, and turns can't be lost, in a tossup
+        # or the bonus round
+        turns = not (
+            self.round_is_tossup or round_type == strings.round_type_bonus)
+        self.letters_allowed = bool(self.game) and turns
+
+        # in order of priority, where two hotkeys have the same keys
+        actions = [
+            ('select_1', lambda: self.select_player(1), True),
+            ('select_2', lambda: self.select_player(2), True),
+            ('select_3', lambda: self.select_player(3), True),
+            ('select_next',
+             lambda: self.select_player((self.selected_player % 3) + 1),
+             True),
+            ('increase_score', self.increase_score, True),
+            ('select_puzzle', self.choose_puzzle, True),
+            ('clear_puzzle', self.clear_puzzle, True),
+            ('solve', self.hotkey_solve, True),
+            ('timer_start', self.timer.start_stop_reset,
+             self.round_is_speedup),
+            ('timer_reset', self.timer.reset, self.round_is_speedup),
+            ('start_tossup', self.hotkey_start_tossup, True),
+            ('buzzer', self.hotkey_buzzer, True),
+            ('show_hints', self.show_hints, True),
+            ('lose_turn', self.lose_turn, turns),
+            ('bankrupt', self.bankrupt, turns),
+            ('buy_vowel', self.buy_vowel, turns),
+            ('bank_score', self.bank_score, turns),
+        ]
+        self.hotkey_table = {}
+        for name, action, allowed in actions:
+            combination = self.hotkeys.get(name)
+            if allowed and combination:
+                self.hotkey_table.setdefault(combination, action)
+
+    def on_game(self, _instance, _game):
+        """
+        Recompile the hotkeys when the round changes.
+
+        :param _instance: This layout
+        :type _instance: ManagerLayout
+        :param _game: The list of rounds
+        :type _game: list
+        :return: None
+        """
+
+        self.compile_hotkeys()
+
+    def hotkey_solve(self):
+        """
+        Perform the next step of solving, depending on the buttons
+        showing: select a puzzle, go to the next puzzle, solve the clue,
+        or reveal the puzzle.
+
+        :return: None
+        """
+
+        if self.select_layout_manager.current == 'select':
             self.choose_puzzle()
-        elif combination == self.hotkeys.get('clear_puzzle'):
-            self.clear_puzzle()
-        elif combination == self.hotkeys.get('solve'):
-            if self.select_layout_manager.current == 'select':
-                self.choose_puzzle()
-            elif self.select_layout_manager.current == 'next':
-                self.next_puzzle()
-            elif self.select_layout_manager.current == 'clue':
-                self.solve_clue(True)
-                self.select_layout_manager.clue_solved = True
-            else:
-                self.reveal_puzzle()
-        elif (
-                combination == self.hotkeys.get('timer_start')
-                and self.game
-                and self.game[0]['round_type'] == strings.round_type_speedup):
+        elif self.select_layout_manager.current == 'next':
+            self.next_puzzle()
+        elif self.select_layout_manager.current == 'clue':
+            self.solve_clue(True)
+            self.select_layout_manager.clue_solved = True
+        else:
+            self.reveal_puzzle()
+
+    def hotkey_start_tossup(self):
+        """
+        Start a tossup, or the final spin if the speedup timer has run
+        out.
+
+        :return: None
+        """
+
+        if (
+                self.round_is_tossup
+                and self.puzzle_string
+                and not self.tossup_button.disabled):
+            self.tossup()
+        elif self.round_is_speedup and self.timer.current == 'timeout':
+            self.timer.final_spin_started = True
             self.timer.start_stop_reset()
-        elif (
-                combination == self.hotkeys.get('timer_reset')
-                and self.game
-                and self.game[0]['round_type'] == strings.round_type_speedup):
-            self.timer.reset()
-        elif combination == self.hotkeys.get('start_tossup'):
-            if (
-                    self.puzzle_string
-                    and not self.tossup_button.disabled
-                    and self.game
-                    and self.game[0]['round_type'] in [
-                        strings.round_type_tossup,
-                        strings.round_type_triple_tossup,
-                        strings.round_type_triple_tossup_final]):
-                self.tossup()
-            elif (
-                    self.timer.current == 'timeout'
-                    and self.game
-                    and self.game[0]['round_type']
-                    == strings.round_type_speedup):
-                self.timer.final_spin_started = True
-                self.timer.start_stop_reset()
-        elif combination == self.hotkeys.get('buzzer'):
-            if self.select_layout_manager.current == 'solve?':
-                self.reveal_puzzle(False)
-            elif self.select_layout_manager.current == 'clue':
-                self.solve_clue(False)
-                self.select_layout_manager.clue_solved = True
-            else:
-                self.play_sound(values.file_sound_buzz)
-        elif not (
-                self.game
-                and self.game[0]['round_type'] in [
-                    strings.round_type_tossup,
-                    strings.round_type_triple_tossup,
-                    strings.round_type_triple_tossup_final,
-                    strings.round_type_bonus]):
-            # following hotkeys cannot be used in a tossup
-            if combination == self.hotkeys.get('lose_turn'):
-                self.lose_turn()
-            elif combination == self.hotkeys.get('bankrupt'):
-                self.bankrupt()
-            elif combination == self.hotkeys.get('buy_vowel'):
-                self.buy_vowel()
-            elif combination == self.hotkeys.get('bank_score'):
-                self.bank_score()
-            else:
-                return False
+
+    def hotkey_buzzer(self):
+        """
+        Indicate that the player failed to solve the puzzle or clue, or
+        play the buzzer sound.
+
+        :return: None
+        """
+
+        if self.select_layout_manager.current == 'solve?':
+            self.reveal_puzzle(False)
+        elif self.select_layout_manager.current == 'clue':
+            self.solve_clue(False)
+            self.select_layout_manager.clue_solved = True
         else:
-            return False
-        return True
+            self.play_sound(values.file_sound_buzz)
 
-    def check_queue(self, _dt):
+    def handle_command(self, command, args):
         """
-        Check the queue for incoming commands to execute.
+        Execute a command received from the queue.
 
         Each command in the queue should be a tuple of the form:
 
@@ -293,43 +421,38 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         'no_more_vowels':
             Play a sound indicating that no vowels remain.
             *args* is ignored.
-
-        :param _dt: The time elapsed between scheduling and calling
-        :type _dt: float
+        'pattern':
+            Find the answers which fit the puzzleboard.
+            *args* is a board pattern, see
+            :meth:`board_state.BoardState.pattern`.
+
+        :param command: The name of the command
+        :type command: str
+        :param args: The arguments of the command
+        :type args: object
         :return: None
         """
 
-        try:
-            command, args = self.puzzle_queue_in.get(block=False)
-            if command == 'puzzle_loaded':
-                self.puzzle_string = ' '.join(args['puzzle'].split())
-                if self.puzzle_string:
-                    self.tie_resolved = False
-                self.puzzle_clue = args['clue']
-                self.display_puzzle()
-            elif command == 'ding':
-                if not self.timer.final_spin_started:
-                    self.play_sound(values.file_sound_ding)
-            elif command == 'matches':
-                self.correct_letter(args)
-            elif command == 'tossup_timeout':
-                self.revealed = True
-                self.tossup()
-            elif command == 'reveal_finished':
-                if self.timer.final_spin_started:
-                    Clock.schedule_once(
-                        self.speedup_buzz,
-                        values.speedup_timeout)
-            elif command == 'no_more_consonants':
-                if self.timer.final_spin_started:
-                    self.speedup_consonants_remaining = False
-                else:
-                    self.no_more_consonants()
-            elif command == 'no_more_vowels':
-                self.no_more_vowels()
-        except queue.Empty:
-            pass
-        Clock.schedule_once(self.check_queue, values.queue_interval)
+        if command == 'puzzle_loaded':
+            self.engine.puzzle_loaded(args)
+            self.display_puzzle()
+        elif command == 'ding':
+            self.engine.ding()
+        elif command == 'matches':
+            self.correct_letter(args)
+        elif command == 'tossup_timeout':
+            self.engine.tossup_timeout()
+        elif command == 'reveal_finished':
+            if self.engine.final_spin_started:
+                Clock.schedule_once(
+                    self.speedup_buzz,
+                    values.speedup_timeout)
+        elif command == 'no_more_consonants':
+            self.engine.consonants_exhausted()
+        elif command == 'no_more_vowels':
+            self.engine.no_more_vowels()
+        elif command == 'pattern':
+            self.solver.submit(args, self.engine.unavailable_letters)
 
     def display_puzzle(self, _dt=None):
         """
@@ -344,127 +467,93 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
 
         if self.puzzle_string:
             self.puzzle_label.text = self.puzzle_string
-            if self.puzzle_clue:
+            if self.engine.puzzle_clue:
                 self.puzzle_label.text += (
-                        '\n' + strings.label_manager_clue + self.puzzle_clue)
+                        '\n' + strings.label_manager_clue
+                        + self.engine.puzzle_clue)
         else:
             self.puzzle_label.text = ''
 
-    def select_player(self, player_number):
+    def handle_engine_event(self, event, args):
         """
-        Select the player indicated by `player_number`.
-        If `player_number` is not 1, 2, or 3, deselect all players.
-        If the player is ineligible to take a turn, do nothing.
+        Show or play an event from the game engine, and pass it on to
+        the other windows. See :meth:`game_engine.GameEngine.subscribe`
+        for the events.
 
-        :param player_number: The number of the player
-        :type player_number: int
+        :param event: The name of the event
+        :type event: str
+        :param args: The arguments of the event
+        :type args: object
         :return: None
         """
 
-        if player_number == 1:
-            color, button, q = 'red', self.btn_red, self.red_q
-        elif player_number == 2:
-            color, button, q = 'yellow', self.btn_ylw, self.ylw_q
-        elif player_number == 3:
-            color, button, q = 'blue', self.btn_blu, self.blu_q
-        else:
-            # deselect
-            self.selected_player = 0
-            self.name_input.text = ''
+        if event == 'sound':
+            self.play_sound(args)
+        elif event in ('score', 'total', 'name'):
+            player_number, value = args
+            setattr(self.player_buttons[player_number - 1], event, value)
+            self.game_state.set_player(
+                game_state.colors[player_number - 1], **{event: value})
+        elif event == 'selected_player':
+            self.selected_player = args
+            self.name_input.text = (
+                self.player_buttons[args - 1].name if args else '')
+        elif event == 'flash':
+            self.game_state.set_player(
+                game_state.colors[args - 1], flashing=True)
+        elif event == 'stop_flashing':
             self.stop_all_flashing()
-            return
+        elif event == 'puzzleboard':
+            self.puzzle_queue_out.put(args)
+        elif event == 'used_letters':
+            self.game_state.set_unavailable(args)
+        elif event == 'tossup_music':
+            if not args:
+                self.tossup_sound.stop()
+            elif not self.tossup_sound.state == 'play':
+                self.tossup_sound.play()
+        elif event == 'tossup_available':
+            self.tossup_button.disabled = not args
+        elif event == 'tie':
+            self.break_tie(args)
+        elif event == 'final_spin_started':
+            self.timer.final_spin_started = args
+        elif event in (
+                'game', 'puzzle_string', 'revealed', 'matches',
+                'tossup_players_done'):
+            setattr(self, event, args)
+
+    def break_tie(self, winning_players):
+        """
+        Prompt the user to choose a winner among tied players, or to
+        load a tiebreaker toss-up.
+
+        :param winning_players: The numbers of the tied players
+        :type winning_players: list
+        :return: None
+        """
 
-        # True if the player already rang in on this toss-up
-        already_rang = (player_number in self.tossup_players_done)
-        # True if a tossup has been started but is currently paused.
-        # This means another player has already rung in.
-        not_my_turn = (self.tossup_players_done and not self.tossup_running)
-        if already_rang or not_my_turn:
-            # player is ineligible
-            return
+        import prompts
 
-        self.selected_player = player_number
-        self.name_input.text = button.name
-        self.stop_all_flashing()
-        q.put(('flash', None))
-        self.letters_q.put(('flash', color, None))
-        if self.tossup_running:
-            self.tossup(player=self.selected_player)
-        if (
-                self.timer.final_spin_started
-                and not self.speedup_consonants_remaining):
-            self.no_more_consonants()
+        prompts.TiebreakerPrompt(
+            lambda puzzle: self.engine.load_tiebreaker(
+                puzzle, winning_players),
+            self.engine.winner_chosen, winning_players,
+            player_names=[btn.name for btn in self.player_buttons]
+        ).open()
 
-    def select_winner(self):
+    def select_player(self, player_number):
         """
-        Select a player to proceed to the bonus round, then set the
-        layout to bonus round mode.
+        Select the player indicated by `player_number`.
+        If `player_number` is not 1, 2, or 3, deselect all players.
+        If the player is ineligible to take a turn, do nothing.
 
+        :param player_number: The number of the player
+        :type player_number: int
         :return: None
         """
 
-        max_score = 0
-        winning_players = []
-
-        tmp = self.selected_player
-        for player_index in range(1, 4):
-            self.selected_player = player_index
-            total = self.get_total()
-            if total > max_score:
-                max_score = total
-                winning_players = [player_index]
-            elif total == max_score:
-                winning_players.append(player_index)
-        self.selected_player = tmp
-
-        def load_tiebreaker(puzzle):
-            """
-            Load a puzzle dict as a tiebreaker toss-up.
-
-            `puzzle` is a puzzle dict.
-            See :func:`data_caching.add_puzzle` for a description of
-            puzzle dicts.
-
-            :param puzzle: A puzzle dict
-            :type puzzle: dict
-            :return: None
-            """
-
-            self.tiebreaker_started = True
-            game_round = {
-                'round_type': strings.round_type_tossup,
-                'round_reward': 0,
-                'puzzle': puzzle}
-            self.game = [game_round] + self.game
-            self.load_puzzle(puzzle)
-            self.tossup_players_done = [
-                i for i in range(1, 4) if i not in winning_players]
-
-        def winner_chosen(i):
-            """
-            Declare player `i`
-            as the winner.
-
-            :param i: The player number
-            :type i: int
-            :return: None
-            """
-
-            self.select_player(i)
-            self.load_puzzle(self.game[0]['puzzle'])
-
-        if len(winning_players) > 1:
-            if not self.tie_resolved:
-                prompts.TiebreakerPrompt(
-                    load_tiebreaker, winner_chosen, winning_players,
-                    player_names=[btn.name for btn in (
-                        self.btn_red, self.btn_ylw, self.btn_blu)]
-                ).open()
-            else:
-                # proceed to bonus round with selected player
-                self.load_puzzle(self.game[0]['puzzle'])
-        else:
-            winner_chosen(winning_players[0])
+        self.engine.select_player(player_number)
 
     def update_name(self, text):
         """
@@ -475,193 +564,153 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        if self.selected_player == 1:
-            self.btn_red.name = text
-            self.red_q.put(('name', text))
-            self.letters_q.put(('name', 'red', text))
-        elif self.selected_player == 2:
-            self.btn_ylw.name = text
-            self.ylw_q.put(('name', text))
-            self.letters_q.put(('name', 'yellow', text))
-        elif self.selected_player == 3:
-            self.btn_blu.name = text
-            self.blu_q.put(('name', text))
-            self.letters_q.put(('name', 'blue', text))
+        self.engine.set_name(text)
 
-    def get_score(self):
+    def add_score(self, new_score):
         """
-        Get the score of the selected player.
-        Returns 0 if no player is selected.
+        Add `new_score` to the selected player's score.
 
-        :return: The player's score
-        :rtype: int
+        :param new_score: The number to be added
+        :type new_score: int
+        :return: None
         """
 
-        if self.selected_player == 1:
-            return self.btn_red.score
-        elif self.selected_player == 2:
-            return self.btn_ylw.score
-        elif self.selected_player == 3:
-            return self.btn_blu.score
-        return 0
+        self.engine.add_score(new_score)
 
-    def set_score(self, new_score):
+    def share_timer(self, timer):
         """
-        Set the score of the selected player.
+        Share the state of the final spin timer with the other windows,
+        which can then calculate the time left whenever they need it.
 
-        :param new_score: The new score
-        :type new_score: int
+        :param timer: The final spin timer
+        :type timer: my_widgets.FinalSpinTimer
         :return: None
         """
 
-        if self.selected_player == 1:
-            self.btn_red.score = new_score
-            self.red_q.put(('score', new_score))
-            self.letters_q.put(('score', 'red', new_score))
-        elif self.selected_player == 2:
-            self.btn_ylw.score = new_score
-            self.ylw_q.put(('score', new_score))
-            self.letters_q.put(('score', 'yellow', new_score))
-        elif self.selected_player == 3:
-            self.btn_blu.score = new_score
-            self.blu_q.put(('score', new_score))
-            self.letters_q.put(('score', 'blue', new_score))
+        self.game_state.set_timer(*timer.state())
 
-    def add_score(self, new_score):
+    def final_spin_changed(self, _timer, started):
         """
-        Add `new_score` to the selected player's score.
+        Tell the game engine when the final spin starts or ends.
 
-        :param new_score: The number to be added
-        :type new_score: int
+        :param _timer: The final spin timer
+        :type _timer: my_widgets.FinalSpinTimer
+        :param started: True if the final spin has started
+        :type started: bool
         :return: None
         """
 
-        self.set_score(self.get_score() + new_score)
+        self.engine.set_final_spin_started(started)
 
-    def get_total(self):
+    def choose_puzzle(self):
         """
-        Get the game total of the selected player.
-        Returns 0 if no player is selected.
+        Prompt the user to select a puzzle.
 
-        :return: The player's total
-        :rtype: int
+        :return: None
         """
 
-        if self.selected_player == 1:
-            return self.btn_red.total
-        elif self.selected_player == 2:
-            return self.btn_ylw.total
-        elif self.selected_player == 3:
-            return self.btn_blu.total
-        return 0
+        import prompts
 
-    def set_total(self, total):
-        """
-        Set the game total of the selected player.
+        def dismissed(_instance):
+            """
+            Take back the keyboard, and find hints in any puzzles added
+            while the prompt was open.
 
-        :param total: The player's new total
-        :type total: int
-        :return: None
-        """
+            :param _instance: The prompt
+            :type _instance: prompts.LoadGamePrompt
+            :return: None
+            """
 
-        if self.selected_player == 1:
-            self.btn_red.total = total
-            self.red_q.put(('total', total))
-            self.letters_q.put(('total', 'red', total))
-        elif self.selected_player == 2:
-            self.btn_ylw.total = total
-            self.ylw_q.put(('total', total))
-            self.letters_q.put(('total', 'yellow', total))
-        elif self.selected_player == 3:
-            self.btn_blu.total = total
-            self.blu_q.put(('total', total))
-            self.letters_q.put(('total', 'blue', total))
+            self.get_keyboard()
+            self.solver.reload()
+
+        prompts.LoadGamePrompt(self.load_game, on_dismiss=dismissed).open()
 
-    def add_total(self, total):
+    def load_game(self, game, compiled_puzzles):
         """
-        Add `total` to the selected player's game total.
+        Send the compiled puzzles of a game to the puzzleboard in one
+        message, then load the game.
+        See :func:`data_caching.export_game` for a description of game
+        lists.
 
-        :param total: The number to be added
-        :type total: int
+        :param game: A game list
+        :type game: list
+        :param compiled_puzzles: The puzzles of the game, compiled by
+                                 :func:`game_compiler.compile_game`
+        :type compiled_puzzles: dict
         :return: None
         """
 
-        self.set_total(self.get_total() + total)
+        self.puzzle_queue_out.put(('load_game', compiled_puzzles))
+        self.engine.load_game(game)
 
-    def reset_scores(self):
+    def show_hints(self):
         """
-        Reset all players' scores and game totals.
+        Ask the puzzleboard for the letters showing, to find the answers
+        which fit them. The answers are shown by :meth:`hints_found`.
 
         :return: None
         """
 
-        for i in range(1, 4):
-            self.selected_player = i
-            self.set_score(0)
-            self.set_total(0)
-
-        self.select_player(0)
+        if self.puzzle_string:
+            self.puzzle_queue_out.put(('pattern', None))
 
-    def choose_puzzle(self):
+    @staticmethod
+    def solver_corpus():
         """
-        Prompt the user to select a puzzle.
+        Get the phrases searched for hints: the names of all puzzles in
+        the puzzle store, and the lines of `values.file_solver_corpus`
+        if it exists. This is called in the solver's background thread.
 
-        :return: None
+        :return: A list of phrases
+        :rtype: list
         """
 
-        prompts.LoadGamePrompt(
-            self.load_game,
-            on_dismiss=lambda i: self.get_keyboard()
-        ).open()
+        import data_caching
 
-    def load_game(self, game):
+        phrases = data_caching.read_puzzle_names()
+        try:
+            with open(values.file_solver_corpus, encoding='utf-8') as f:
+                phrases.extend(f.read().splitlines())
+        except EnvironmentError:
+            pass
+        return phrases
+
+    def hints_found(self, pattern, phrases, count):
         """
-        Load a game. See :func:`data_caching.export_game` for a
-        description of game lists.
+        Show the answers which fit the puzzleboard. This is called in
+        the solver's background thread, so the prompt is opened on the
+        main thread.
 
-        :param game: A game list
-        :type game: list
+        :param pattern: The board pattern
+        :type pattern: str
+        :param phrases: Some of the phrases which fit the pattern
+        :type phrases: list
+        :param count: The number of phrases which fit the pattern
+        :type count: int
         :return: None
         """
 
-        self.tie_resolved = False
-        self.game = game
-        if game:
-            self.load_puzzle(self.game[0]['puzzle'])
-        self.reset_scores()
+        if phrases:
+            text = strings.label_hints.format(
+                count=count, pattern=pattern, hints='\n'.join(phrases))
+        else:
+            text = strings.label_no_hints.format(pattern=pattern)
 
-    def load_puzzle(self, puzzle):
-        """
-        Load a puzzle dict.
-        See :func:`data_caching.add_puzzle` for a description of
-        puzzle dicts.
+        def show(_dt):
+            """
+            Open a prompt showing `text`.
 
-        :param puzzle: A puzzle dict
-        :type puzzle: dict
-        :return: None
-        """
+            :param _dt: The time elapsed between scheduling and calling
+            :type _dt: float
+            :return: None
+            """
 
-        if puzzle['puzzle'].strip():
-            if self.game and self.game[0]['round_type'] in [
-                    strings.round_type_tossup,
-                    strings.round_type_triple_tossup,
-                    strings.round_type_triple_tossup_final]:
-                self.play_sound(values.file_sound_reveal_tossup)
-            else:
-                self.play_sound(values.file_sound_reveal_puzzle)
+            import prompts
 
-        if self.tossup_running:
-            self.tossup()
-        self.unavailable_letters = []
-        self.puzzle_queue_out.put(('load', puzzle))
-        self.letters_q.put(('reload', None, None))
-        self.tossup_players_done = []
-        self.consonants_remaining = True
-        self.vowels_remaining = True
-        self.speedup_consonants_remaining = True
+            prompts.InfoPrompt(title=strings.title_hints, text=text).open()
 
-        # consider revealed if the puzzleboard is clear
-        self.revealed = True if not puzzle['puzzle'].split() else False
+        Clock.schedule_once(show)
 
     def next_puzzle(self):
         """
@@ -670,25 +719,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        try:
-            self.game.pop(0)
-            puzzle = self.game[0]
-
-            if self.timer.final_spin_started:
-                while puzzle['round_type'] == strings.round_type_speedup:
-                    self.game.pop(0)
-                    puzzle = self.game[0]
-                self.timer.final_spin_started = False
-
-            if (
-                    self.game
-                    and self.game[0]['round_type']
-                    == strings.round_type_bonus):
-                self.select_winner()
-            else:
-                self.load_puzzle(puzzle['puzzle'])
-        except IndexError:
-            pass
+        self.engine.next_puzzle()
 
     def clear_puzzle(self):
         """
@@ -697,10 +728,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        self.load_puzzle({
-            'category': '',
-            'clue': '',
-            'puzzle': ' ' * 52})
+        self.engine.clear_puzzle()
 
     def tossup(self, player=None):
         """
@@ -713,34 +741,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        if player:
-            if player in self.tossup_players_done:
-                return
-            self.tossup_players_done.append(player)
-
-        if self.tossup_running:
-            self.puzzle_queue_out.put(('pause_tossup', None))
-            self.tossup_button.disabled = False
-
-            if self.revealed:
-                self.tossup_sound.stop()
-                self.play_sound(values.file_sound_buzz_double)
-
-            if player in [1, 2, 3]:
-                self.select_player(player)
-        else:
-            self.tossup_button.disabled = True
-            if not self.tossup_players_done:
-                # start tossup
-                self.puzzle_queue_out.put(('tossup', None))
-            else:
-                # tossup already started, resume
-                self.puzzle_queue_out.put(('resume_tossup', None))
-            self.select_player(0)
-            if not self.tossup_sound.state == 'play':
-                self.tossup_sound.play()
-
-        self.tossup_running = not self.tossup_running
+        self.engine.tossup(player)
 
     def stop_all_flashing(self):
         """
@@ -749,12 +750,8 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        self.red_q.put(('stop_flash', None))
-        self.ylw_q.put(('stop_flash', None))
-        self.blu_q.put(('stop_flash', None))
-        self.letters_q.put(('stop_flash', 'red', None))
-        self.letters_q.put(('stop_flash', 'yellow', None))
-        self.letters_q.put(('stop_flash', 'blue', None))
+        for color in game_state.colors:
+            self.game_state.set_player(color, flashing=False)
 
     def reveal_puzzle(self, player_solved=True):
         """
@@ -768,38 +765,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        self.tossup_sound.stop()
-
-        if player_solved:
-            if self.game:
-                if self.tiebreaker_started:
-                    self.tie_resolved = True
-                    self.tiebreaker_started = False
-                round_type = self.game[0]['round_type']
-                if round_type == strings.round_type_bonus:
-                    self.play_sound(values.file_sound_solve_bonus)
-                elif round_type == strings.round_type_triple_tossup:
-                    self.play_sound(values.file_sound_solve_triple_tossup)
-                elif round_type in [
-                        strings.round_type_tossup,
-                        strings.round_type_triple_tossup_final]:
-                    self.play_sound(values.file_sound_solve_tossup)
-                else:
-                    # not a tossup or bonus round,
-                    # increase score if less than minimum prize
-                    if self.get_score() < self.min_win:
-                        self.set_score(self.min_win)
-
-                    if self.game[0]['puzzle']['clue']:
-                        self.play_sound(values.file_sound_solve_clue)
-                    else:
-                        self.play_sound(values.file_sound_solve)
-
-                self.add_total(int(self.game[0]['round_reward']))
-        self.puzzle_queue_out.put(('reveal', None))
-        self.stop_all_flashing()
-
-        self.revealed = True
+        self.engine.reveal_puzzle(player_solved)
 
     def solve_clue(self, player_solved):
         """
@@ -812,11 +778,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        if player_solved:
-            self.add_score(self.clue_solve_reward)
-            self.play_sound(values.file_sound_clue_correct)
-        else:
-            self.play_sound(values.file_sound_buzz)
+        self.engine.solve_clue(player_solved)
 
     def guess_letter(self):
         """
@@ -825,13 +787,15 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
+        import prompts
+
         if (
                 self.selected_player == 0
                 or self.get_value() is None):
             return
         popup = prompts.ChooseLetterPrompt(
             self.guessed_letter,
-            self.unavailable_letters,
+            self.engine.unavailable_letters,
             on_dismiss=lambda i: self.get_keyboard())
         popup.open()
         popup.get_keyboard()
@@ -845,9 +809,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        self.unavailable_letters.append(letter.lower())
-        self.puzzle_queue_out.put(('letter', letter))
-        self.letters_q.put(('remove_letter', None, letter))
+        self.engine.guessed_letter(letter)
 
     def buy_vowel(self):
         """
@@ -857,8 +819,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        if self.get_score() >= self.vowel_price:
-            self.add_score(-self.vowel_price)
+        self.engine.buy_vowel()
 
     def bonus_round_letters(self, letters):
         """
@@ -870,9 +831,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        self.unavailable_letters.extend(letters)
-        self.puzzle_queue_out.put(('bonus_round_letters', letters))
-        self.letters_q.put(('remove_letters', None, letters))
+        self.engine.bonus_round_letters(letters)
 
     def get_value(self):
         """
@@ -884,6 +843,8 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :rtype: int
         """
 
+        import data_caching
+
         custom_value = data_caching.str_to_int(self.custom_value.text, None)
         if custom_value is not None:
             return custom_value
@@ -911,10 +872,8 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        letter, self.matches = match
-
-        if not self.matches and not self.timer.final_spin_started:
-            self.play_sound(values.file_sound_buzz)
+        letter, _matches = match
+        self.engine.correct_letter(match)
 
         # show number of matches in puzzle_label
         self.puzzle_label.text = strings.label_matches.format(
@@ -930,51 +889,20 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        value = self.get_value()
-        if value:
-            self.add_score(self.matches * value)
+        self.engine.increase_score(self.get_value())
         # reset the values, unless it is the speed-up round
-        if not self.timer.final_spin_started:
+        if not self.engine.final_spin_started:
             self.custom_value.text = ''
             self.dropdown.text = strings.dropdown_select_value
 
-    def no_more_consonants(self):
+    def reset_matches(self):
         """
-        Play a sound indicating no more consonants, and remove
-        consonants from the used letters board.
+        Forget the number of matches for the last letter.
 
         :return: None
         """
 
-        # only do this once per round
-        if self.consonants_remaining:
-            self.consonants_remaining = False
-
-            self.play_sound(values.file_sound_no_more_consonants)
-
-            self.unavailable_letters.extend([
-                c for c in strings.consonants
-                if c not in self.unavailable_letters])
-            self.letters_q.put(('no_more_consonants', None, None))
-
-    def no_more_vowels(self):
-        """
-        Play a sound indicating no more vowels, and remove vowels from
-        the used letters board.
-
-        :return: None
-        """
-
-        # only do this once per round
-        if self.vowels_remaining:
-            self.vowels_remaining = False
-
-            self.play_sound(values.file_sound_no_more_vowels)
-
-            self.unavailable_letters.extend([
-                c for c in strings.vowels
-                if c not in self.unavailable_letters])
-            self.letters_q.put(('no_more_vowels', None, None))
+        self.engine.reset_matches()
 
     def lose_turn(self):
         """
@@ -983,7 +911,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        self.select_player((self.selected_player % 3) + 1)
+        self.engine.lose_turn()
 
     def bankrupt(self):
         """
@@ -992,9 +920,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        if self.selected_player:
-            self.play_sound(values.file_sound_bankrupt)
-            self.set_score(0)
+        self.engine.bankrupt()
 
     def bank_score(self):
         """
@@ -1004,15 +930,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        self.add_total(self.get_score())
-
-        # set score = 0 for each player
-        tmp = self.selected_player
-        for i in range(1, 4):
-            self.selected_player = i
-            self.set_score(0)
-
-        self.selected_player = tmp
+        self.engine.bank_score()
 
     def cash_settings(self):
         """
@@ -1021,6 +939,8 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
+        import prompts
+
         popup = prompts.ManagerSettingsPrompt()
         popup.bind(on_dismiss=self.load_settings)
         popup.bind(on_dismiss=lambda i: self.get_keyboard())
@@ -1036,22 +956,26 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
+        import data_caching
+
         settings = data_caching.get_variables()
 
         try:
-            self.vowel_price = int(settings.get('vowel_price'))
+            self.engine.vowel_price = int(settings.get('vowel_price'))
         except (ValueError, TypeError):
-            self.vowel_price = values.default_vowel_price
+            self.engine.vowel_price = values.default_vowel_price
 
         try:
-            self.min_win = int(settings.get('min_win'))
+            self.engine.min_win = int(settings.get('min_win'))
         except (ValueError, TypeError):
-            self.min_win = values.default_min_win
+            self.engine.min_win = values.default_min_win
 
         try:
-            self.clue_solve_reward = int(settings.get('clue_solve_reward'))
+            self.engine.clue_solve_reward = int(
+                settings.get('clue_solve_reward'))
         except (ValueError, TypeError):
-            self.clue_solve_reward = values.default_clue_solve_reward
+            self.engine.clue_solve_reward = (
+                values.default_clue_solve_reward)
 
         try:
             self.final_spin_bonus = int(settings.get('final_spin_bonus'))
@@ -1064,8 +988,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
             minutes, seconds = (0, 0)
         minutes = data_caching.str_to_int(minutes)
         seconds = data_caching.str_to_int(seconds)
-        self.timer.start_time = (minutes * 60) + seconds
-        self.timer.seconds_left = self.timer.start_time
+        self.timer.set_start_time((minutes * 60) + seconds)
 
         self.dropdown.values = [strings.currency_format.format(value)
                                 for value in settings.get('cash_values', [])]
@@ -1075,9 +998,22 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
                 settings.get('hotkeys', {}).get(
                     hotkey['name'], hotkey['default']).lower()
             for hotkey in values.hotkeys}
+        self.compile_hotkeys()
 
-    @staticmethod
-    def play_sound(filename):
+    @property
+    def tossup_sound(self):
+        """
+        The music played during a toss-up, loaded on first use.
+
+        :return: The sound
+        :rtype: kivy.core.audio.Sound
+        """
+
+        if self._tossup_sound is None:
+            self._tossup_sound = SoundLoader.load(values.file_sound_tossup)
+        return self._tossup_sound
+
+    def play_sound(self, filename):
         """
         Play the audio file specified by `filename`.
 
@@ -1086,9 +1022,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        sound = SoundLoader.load(filename)
-        if sound:
-            sound.play()
+        self.sound_bank.play(filename)
 
     def speedup_buzz(self, _dt):
         """
@@ -1099,8 +1033,7 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         :return: None
         """
 
-        if self.timer.final_spin_started:
-            self.play_sound(values.file_sound_buzz)
+        self.engine.speedup_buzz()
 
     def update_dropdown(self):
         """
@@ -1149,6 +1082,63 @@ class ManagerLayout(BoxLayout, Fullscreenable, KeyboardBindable):
         for q in [self.puzzle_queue_out, self.red_q, self.ylw_q, self.blu_q]:
             q.put(('exit', None))
         self.letters_q.put(('exit', None, None))
+        self.game_state.close()
+        if self.hotkey_latency is not None:
+            print(self.hotkey_latency.report(strings.latency_keystrokes))
+
+
+class SingleWindowLayout(BoxLayout):
+    """
+    A layout containing the manager, puzzleboard, scoreboards, and used
+    letters board, for running the whole app in a single process.
+
+    Kivy can only open one window per process, so the layouts share one
+    window. They communicate through in-process Queues instead of
+    multiprocessing Queues, so nothing is pickled.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Create the layout.
+
+        :param kwargs: Additional keyword arguments for the layout
+        """
+
+        super(SingleWindowLayout, self).__init__(**kwargs)
+
+        import data_caching
+
+        queue_budget = data_caching.get_queue_budget()
+        puzzle_q1 = queue.Queue()
+        puzzle_q2 = queue.Queue()
+        red_queue = queue.Queue()
+        yellow_queue = queue.Queue()
+        blue_queue = queue.Queue()
+        letters_queue = queue.Queue()
+        shared_state = game_state.GameState()
+
+        displays = BoxLayout(orientation='vertical')
+        displays.add_widget(
+            puzzleboard.PuzzleWithCategory(
+                puzzle_q1, puzzle_q2, queue_budget))
+        scores = BoxLayout(orientation='horizontal', size_hint_y=0.3)
+        for bg_color, q, color in [
+                (values.color_red, red_queue, 'red'),
+                (values.color_yellow, yellow_queue, 'yellow'),
+                (values.color_blue, blue_queue, 'blue')]:
+            scores.add_widget(
+                score.ScoreLayout(
+                    bg_color, q, shared_state, color, queue_budget))
+        displays.add_widget(scores)
+        displays.add_widget(
+            used_letters.LettersWithScore(
+                letters_queue, shared_state, queue_budget))
+
+        # the manager is created last so that it has keyboard focus
+        self.add_widget(ManagerLayout(
+            puzzle_q1, puzzle_q2, red_queue, yellow_queue, blue_queue,
+            letters_queue, shared_state, queue_budget))
+        self.add_widget(displays)
 
 
 class BaseApp(App):
@@ -1191,10 +1181,43 @@ class BaseApp(App):
         :rtype: kivy.uix.widget.Widget
         """
 
-        return self.layout(*self.args)
+        layout = self.layout(*self.args)
+        startup_profiler.mark('build layout')
+        return layout
+
+    def on_start(self):
+        """
+        If startup is being profiled, record when the first frame has
+        been drawn.
+
+        :return: None
+        """
+
+        if startup_profiler.enabled():
+            Window.bind(on_flip=self.first_frame_drawn)
+
+    def first_frame_drawn(self, window):
+        """
+        Save the startup timings of this process. If this is the process
+        which launched the others, print the timeline of all processes
+        once they have had time to start.
+
+        :param window: The app's window
+        :type window: kivy.core.window.WindowBase
+        :return: None
+        """
 
+        window.unbind(on_flip=self.first_frame_drawn)
+        startup_profiler.mark('draw first frame')
+        startup_profiler.save(self.title)
+        if startup_profiler.is_reporter():
+            Clock.schedule_once(
+                lambda _dt: startup_profiler.report(),
+                values.profile_report_delay)
 
-def launch_app(root_layout_class, args=(), title=None, new_window=True):
+
+def launch_app(root_layout_class, args=(), title=None, new_window=True,
+               launch_time=None):
     """
     Create and launch a :class:`BaseApp`\\, using an instance of
      `root_layout_class` as the root layout. Use the tuple `args` to
@@ -1212,6 +1235,10 @@ def launch_app(root_layout_class, args=(), title=None, new_window=True):
     :param new_window: True if the app should be opened in a new
                        process, otherwise False, defaults to True
     :type new_window: bool, optional
+    :param launch_time: The time at which the process running the app
+                        was launched, if it was launched by another,
+                        defaults to None
+    :type launch_time: float, optional
     :return: None
     """
 
@@ -1221,44 +1248,89 @@ def launch_app(root_layout_class, args=(), title=None, new_window=True):
         multiprocessing.Process(
             target=launch_app,
             args=(root_layout_class,),
-            kwargs={'args': args, 'title': title, 'new_window': False}
+            kwargs={
+                'args': args, 'title': title, 'new_window': False,
+                'launch_time': time.time()}
         ).start()
     else:
+        if launch_time is not None:
+            startup_profiler.started(launch_time)
         BaseApp(root_layout_class, args, title=title).run()
 
 
-if __name__ == '__main__':
+def launch_all():
+    """
+    Launch the manager, puzzleboard, scoreboards, and used letters
+    board, each in its own window and process.
+
+    :return: None
+    """
+
+    import data_caching
+
+    # read once here, rather than by every window
+    queue_budget = data_caching.get_queue_budget()
     puzzle_q1 = multiprocessing.Queue()
     puzzle_q2 = multiprocessing.Queue()
     red_queue = multiprocessing.Queue()
     yellow_queue = multiprocessing.Queue()
     blue_queue = multiprocessing.Queue()
     letters_queue = multiprocessing.Queue()
+    shared_state = game_state.GameState()
 
     launch_app(
         puzzleboard.PuzzleWithCategory,
-        args=(puzzle_q1, puzzle_q2),
+        args=(puzzle_q1, puzzle_q2, queue_budget),
         title=strings.app_title_puzzleboard)
     launch_app(
         score.ScoreLayout,
-        args=(values.color_red, red_queue),
+        args=(values.color_red, red_queue, shared_state, 'red', queue_budget),
         title=strings.app_title_score)
     launch_app(
         score.ScoreLayout,
-        args=(values.color_yellow, yellow_queue),
+        args=(
+            values.color_yellow, yellow_queue, shared_state, 'yellow',
+            queue_budget),
         title=strings.app_title_score)
     launch_app(
         score.ScoreLayout,
-        args=(values.color_blue, blue_queue),
+        args=(
+            values.color_blue, blue_queue, shared_state, 'blue',
+            queue_budget),
         title=strings.app_title_score)
     launch_app(
         used_letters.LettersWithScore,
-        args=(letters_queue,),
+        args=(letters_queue, shared_state, queue_budget),
         title=strings.app_title_used_letters)
     launch_app(
         ManagerLayout,
         args=(
             puzzle_q1, puzzle_q2, red_queue, yellow_queue, blue_queue,
-            letters_queue),
+            letters_queue, shared_state, queue_budget),
         title=strings.app_title_manager,
         new_window=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=strings.app_title)
+    parser.add_argument(
+        '--single-process', action='store_true',
+        help=strings.help_single_process)
+    parser.add_argument(
+        '--profile-startup', action='store_true',
+        help=strings.help_profile_startup)
+    parser.add_argument(
+        '--profile-hotkeys', action='store_true',
+        help=strings.help_profile_hotkeys)
+    parser.add_argument(
+        '--tossup-seed', type=int, help=strings.help_tossup_seed)
+    arguments = parser.parse_args()
+
+    ManagerLayout.profile_hotkeys = arguments.profile_hotkeys
+    ManagerLayout.tossup_seed = arguments.tossup_seed
+    # --profile-startup is handled before the imports at the top
+
+    if arguments.single_process:
+        launch_app(SingleWindowLayout, new_window=False)
+    else:
+        launch_all()
@@ -0,0 +1,191 @@
+import collections
+import queue
+import threading
+import time
+
+from kivy.clock import Clock
+
+import values
+
+
+class QueueListener(object):
+    """
+    Waits for commands on a Queue in a background thread, and passes
+    them to a handler on the Kivy main thread.
+
+    The thread blocks until a command arrives, so nothing runs while the
+    Queue is empty. Each time the main thread is woken, the commands
+    received so far are handled in the order in which they were sent,
+    up to the limits given by `budget`. Any commands beyond those limits
+    are handled in the next frame.
+    """
+
+    def __init__(self, q, handler, budget=None, coalesce_key=None):
+        """
+        Create the listener. Commands are not received until
+        :meth:`start` is called.
+
+        Each command received from `q` must be a tuple, which is
+        unpacked into the arguments of `handler`.
+
+        If `coalesce_key` is given, it is called with the items of each
+        command, and returns either None or a key. Of the commands
+        handled in the same frame with the same key, only the last is
+        passed to `handler`; this is for commands whose effect does not
+        depend on how many are received, such as a command replacing
+        everything a window shows.
+
+        :param q: A Queue to receive commands from
+        :type q: multiprocessing.Queue
+        :param handler: A function accepting the items of a command
+        :type handler: function
+        :param budget: A tuple of (maximum commands, maximum seconds)
+                       handled in each frame, as returned by
+                       :func:`data_caching.get_queue_budget`, defaults
+                       to None for `values.default_queue_max_commands`
+                       and `values.default_queue_time_budget`
+        :type budget: tuple, optional
+        :param coalesce_key: A function accepting the items of a
+                             command, defaults to None
+        :type coalesce_key: function, optional
+        """
+
+        self.queue = q
+        self.handler = handler
+        self.coalesce_key = coalesce_key
+        self.max_commands, self.time_budget = budget or (
+            values.default_queue_max_commands,
+            values.default_queue_time_budget)
+        self._received = collections.deque()
+        self._trigger = Clock.create_trigger(self._handle_received)
+        self._thread = threading.Thread(target=self._listen, daemon=True)
+
+    def start(self, _dt=None):
+        """
+        Start receiving commands.
+
+        :param _dt: The time elapsed between scheduling and calling,
+                    defaults to None
+        :type _dt: float, optional
+        :return: None
+        """
+
+        self._thread.start()
+
+    def _listen(self):
+        """
+        Wait for commands, and wake the main thread when any arrive.
+        This runs in the background thread.
+
+        :return: None
+        """
+
+        while True:
+            self._received.append(self.queue.get())
+            # collect any other commands which have already arrived, so
+            # that they are handled together
+            try:
+                while True:
+                    self._received.append(self.queue.get(block=False))
+            except queue.Empty:
+                pass
+            self._trigger()
+
+    def _handle_received(self, _dt):
+        """
+        Pass received commands to `handler`, until `max_commands` have
+        been taken or `time_budget` seconds have passed. If any commands
+        remain, they are handled in the next frame.
+
+        :param _dt: The time elapsed between scheduling and calling
+        :type _dt: float
+        :return: None
+        """
+
+        deadline = time.perf_counter() + self.time_budget
+        commands = [
+            self._received.popleft()
+            for _i in range(min(self.max_commands, len(self._received)))]
+
+        if self.coalesce_key:
+            keys = [self.coalesce_key(*command) for command in commands]
+            last = {key: i for i, key in enumerate(keys) if key is not None}
+            commands = [
+                command for i, (command, key) in enumerate(zip(commands, keys))
+                if key is None or last[key] == i]
+
+        for i, command in enumerate(commands):
+            if i and time.perf_counter() > deadline:
+                # put back the rest, in order
+                self._received.extendleft(reversed(commands[i:]))
+                break
+            self.handler(*command)
+
+        if self._received:
+            self._trigger()
+
+
+class StateListener(object):
+    """
+    Waits for changes to a :class:`game_state.GameState` in a background
+    thread, and passes the new state to a handler on the Kivy main
+    thread.
+
+    Nothing is sent to the window for each change: the thread is woken
+    by the writer, and however many changes are made before the next
+    frame, the handler is called once with the latest state.
+    """
+
+    def __init__(self, state, handler):
+        """
+        Create the listener. Changes are not received until
+        :meth:`start` is called, which passes the current state to
+        `handler` straight away.
+
+        :param state: The shared state to watch
+        :type state: game_state.GameState
+        :param handler: A function accepting the items returned by
+                        :meth:`game_state.GameState.read`
+        :type handler: function
+        """
+
+        self.state = state
+        self.handler = handler
+        self._trigger = Clock.create_trigger(self._handle_changed)
+        self._thread = threading.Thread(target=self._listen, daemon=True)
+
+    def start(self, _dt=None):
+        """
+        Start receiving changes.
+
+        :param _dt: The time elapsed between scheduling and calling,
+                    defaults to None
+        :type _dt: float, optional
+        :return: None
+        """
+
+        self._thread.start()
+
+    def _listen(self):
+        """
+        Wait for changes, and wake the main thread when any are made.
+        This runs in the background thread.
+
+        :return: None
+        """
+
+        counter = None
+        while True:
+            counter = self.state.wait(counter)
+            self._trigger()
+
+    def _handle_changed(self, _dt):
+        """
+        Pass the latest state to `handler`.
+
+        :param _dt: The time elapsed between scheduling and calling
+        :type _dt: float
+        :return: None
+        """
+
+        self.handler(*self.state.read())
@@ -1,3 +1,5 @@
+import time
+
 from kivy.animation import Animation
 from kivy.clock import Clock
 from kivy.core.window import Window
@@ -318,16 +320,92 @@ class FinalSpinTimer(ScreenManager, Hideable):
     currently running.
 
     The numeric property `seconds_left` indicates the number of seconds
-    left on the timer.
+    left on the timer. While the timer is running, it is updated every
+    `values.timer_refresh_interval` seconds.
 
     The numeric property `start_time` indicates the number of seconds
     on the timer before it is started.
+
+    A running timer counts down to a deadline on the monotonic clock,
+    so the time left is accurate however long each frame takes. The
+    event `on_timer_changed` is dispatched when the timer is started,
+    paused, reset, or runs out, and :meth:`state` describes the timer
+    at that moment.
     """
 
+    __events__ = ('on_timer_changed',)
+
     final_spin_started = BooleanProperty(False)
     running = BooleanProperty(False)
     seconds_left = NumericProperty(0)
 
+    def __init__(self, **kwargs):
+        """
+        Create the timer.
+
+        :param kwargs: Additional keyword arguments for the timer
+        """
+
+        super(FinalSpinTimer, self).__init__(**kwargs)
+        # the time.monotonic() at which the running timer runs out
+        self.deadline = None
+        self._refresh_event = None
+        self._timeout_event = None
+
+    def remaining(self):
+        """
+        Get the number of seconds left on the timer, as of now.
+
+        :return: The number of seconds left
+        :rtype: float
+        """
+
+        if self.deadline is None:
+            return max(0, self.seconds_left)
+        return max(0, self.deadline - time.monotonic())
+
+    def elapsed(self):
+        """
+        Get the number of seconds the timer has run for since it was
+        reset, as of now.
+
+        :return: The number of seconds elapsed
+        :rtype: float
+        """
+
+        return self.start_time - self.remaining()
+
+    def state(self):
+        """
+        Describe the timer, so that the time left can be calculated
+        elsewhere. See :meth:`game_state.GameState.set_timer`.
+
+        :return: A tuple of (start_time, seconds_left, deadline), where
+                 deadline is None if the timer is not running
+        :rtype: tuple
+        """
+
+        return self.start_time, self.seconds_left, self.deadline
+
+    def set_start_time(self, seconds):
+        """
+        Change the number of seconds on the timer before it is started,
+        and put that many seconds on the timer.
+
+        :param seconds: A number of seconds
+        :type seconds: float
+        :return: None
+        """
+
+        running = self.running
+        if running:
+            self._stop()
+        self.start_time = seconds
+        self.seconds_left = seconds
+        if running:
+            self._start()
+        self.dispatch('on_timer_changed')
+
     def start_stop_reset(self):
         """
         If the timer is paused, start the timer.
@@ -343,27 +421,60 @@ class FinalSpinTimer(ScreenManager, Hideable):
 
         self.final_spin_started = False
 
-        self.running = not self.running
-
         if self.running:
-            Clock.schedule_once(self.decrement, values.timer_accuracy)
+            self._stop()
+        else:
+            self._start()
+        self.dispatch('on_timer_changed')
 
-    def decrement(self, _dt):
+    def _start(self):
         """
-        Reduce `seconds_left` by `values.timer_accuracy` seconds.
-        Then schedule this function in another `values.timer_accuracy`
-        seconds.
+        Start counting down from `seconds_left`.
 
-        :param _dt: The time elapsed between scheduling and calling
         :return: None
         """
 
-        if self.seconds_left <= 0:
-            self.running = False
+        self.deadline = time.monotonic() + self.seconds_left
+        self.running = True
+        self._refresh_event = Clock.schedule_interval(
+            self.refresh, values.timer_refresh_interval)
+        # run out on time, rather than at the next refresh
+        self._timeout_event = Clock.schedule_once(
+            self.refresh, self.seconds_left)
 
-        if self.running:
-            self.seconds_left -= values.timer_accuracy
-            Clock.schedule_once(self.decrement, values.timer_accuracy)
+    def _stop(self):
+        """
+        Stop counting down, keeping the time left in `seconds_left`.
+
+        :return: None
+        """
+
+        self.seconds_left = self.remaining()
+        self.deadline = None
+        self.running = False
+        for event in (self._refresh_event, self._timeout_event):
+            if event is not None:
+                event.cancel()
+        self._refresh_event = None
+        self._timeout_event = None
+
+    def refresh(self, _dt=None):
+        """
+        Update `seconds_left` from the deadline, and stop the timer if it
+        has run out.
+
+        :param _dt: The time elapsed between scheduling and calling,
+                    defaults to None
+        :type _dt: float, optional
+        :return: None
+        """
+
+        if self.deadline is None:
+            return
+        self.seconds_left = self.remaining()
+        if self.seconds_left <= 0:
+            self._stop()
+            self.dispatch('on_timer_changed')
 
     def reset(self):
         """
@@ -372,5 +483,15 @@ class FinalSpinTimer(ScreenManager, Hideable):
         :return: None
         """
 
-        self.running = False
+        self._stop()
         self.seconds_left = self.start_time
+        self.dispatch('on_timer_changed')
+
+    def on_timer_changed(self):
+        """
+        Default handler for the `on_timer_changed` event.
+
+        :return: None
+        """
+
+        pass
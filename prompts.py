@@ -2,12 +2,16 @@ import os
 
 from kivy.clock import Clock
 from kivy.lang import Builder
+from kivy.properties import (
+    BooleanProperty, NumericProperty, ObjectProperty, StringProperty)
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 
 import data_caching
+import game_compiler
 import strings
 import values
 from my_widgets import KeyboardBindable
@@ -59,11 +63,13 @@ class LoadGamePrompt(Popup):
         Create the Popup.
 
         When the game has been selected, it will be passed to `callback`
-        as a game list.
+        as a game list, along with its puzzles compiled by
+        :func:`game_compiler.compile_game`.
         See :func:`data_caching.export_game` for a description of
         game lists.
 
-        :param callback: A function that can accept a list of dicts
+        :param callback: A function that can accept a list of dicts and
+                         a dict of compiled puzzles
         :type callback: function
         :param kwargs: Additional keyword arguments for the Popup
         """
@@ -72,9 +78,10 @@ class LoadGamePrompt(Popup):
         self.callback = callback
 
         settings = data_caching.get_variables()
-        self.order = settings.get('game_order', values.default_game_order)
-        self.rewards = settings.get(
-            'game_rewards', values.default_game_rewards)
+        self.order = list(
+            settings.get('game_order', values.default_game_order))
+        self.rewards = list(
+            settings.get('game_rewards', values.default_game_rewards))
         self.puzzles = []
 
         self.fill_puzzle_layout()
@@ -272,8 +279,10 @@ class LoadGamePrompt(Popup):
 
     def confirm(self):
         """
-        Create a game list from the selected files and pass the list to
-        `callback`.
+        Create a game list from the selected files, compile its puzzles,
+        and pass both to `callback`. If any puzzle cannot be shown on the
+        puzzleboard, the problems are shown instead, and the prompt stays
+        open.
         See :func:`data_caching.export_game` for a description of
         game lists.
 
@@ -283,7 +292,16 @@ class LoadGamePrompt(Popup):
         data_caching.update_variables({
             'game_order': self.order,
             'game_rewards': self.rewards})
-        self.callback(self.create_game())
+        game = self.create_game()
+        compiled_puzzles, problems = game_compiler.compile_game(
+            game, *values.puzzleboard_size)
+        if problems:
+            InfoPrompt(
+                title=strings.title_invalid_game,
+                text=strings.label_invalid_game.format('\n'.join(problems))
+            ).open()
+            return
+        self.callback(game, compiled_puzzles)
         self.dismiss()
 
 
@@ -338,10 +356,16 @@ class PuzzleSelectionLayout(BoxLayout):
 
 
 class LoadPuzzlePrompt(Popup):
-    """A Popup to prompt the user to select puzzles by name."""
-
-    selected_names = []
-    all_puzzles = {}
+    """
+    A Popup to prompt the user to select puzzles by name.
+
+    The puzzles are listed in a RecycleView, so only the rows which are
+    visible have widgets. Each row of `puzzle_list.data` is a dict with
+    the keys 'name' and 'selected'.
+    The list is filtered by the search box using
+    :func:`data_caching.search_puzzles`. Selected puzzles stay selected
+    while they are hidden by the search.
+    """
 
     def __init__(self, callback, **kwargs):
         """
@@ -360,25 +384,36 @@ class LoadPuzzlePrompt(Popup):
         super(LoadPuzzlePrompt, self).__init__(**kwargs)
 
         self.callback = callback
+        self.selected_names = []
         self.fill_puzzle_layout()
 
     def fill_puzzle_layout(self, _instance=None):
         """
-        Fill in the layout with existing puzzles.
+        Fill in the list with the names of existing puzzles.
 
         :param _instance: A Popup instance, defaults to None
         :type _instance: kivy.uix.popup.Popup, optional
         :return: None
         """
 
-        self.puzzle_layout.clear_widgets()
         self.selected_names = []
+        data_caching.refresh_puzzle_index()
+        self.filter_puzzles(self.search_input.text)
+
+    def filter_puzzles(self, query):
+        """
+        Show only the puzzles matching the search query `query`.
+        See :func:`puzzle_index.parse_query` for the format of queries.
+
+        :param query: The text of the search box
+        :type query: str
+        :return: None
+        """
 
-        self.all_puzzles = data_caching.read_puzzles()
-        for name in self.all_puzzles.keys():
-            button = PuzzleButton(
-                name, self.puzzle_selected, self.fill_puzzle_layout)
-            self.puzzle_layout.add_widget(button)
+        selected = set(self.selected_names)
+        self.puzzle_list.data = [
+            {'name': name, 'selected': name in selected}
+            for name in data_caching.search_puzzles(query)]
 
     def input_save(self):
         """
@@ -390,8 +425,8 @@ class LoadPuzzlePrompt(Popup):
         :return: None
         """
 
-        selected_puzzles = [
-            self.all_puzzles[name] for name in self.selected_names]
+        selected_puzzles = list(
+            data_caching.get_puzzles(self.selected_names).values())
         if selected_puzzles:
             self.callback(selected_puzzles)
 
@@ -401,14 +436,15 @@ class LoadPuzzlePrompt(Popup):
         """
         Prompt the user to select a file containing puzzles. When a file
         is selected, the puzzles will be imported and displayed in the
-        layout.
+        layout once the import has finished.
 
         :return: None
         """
 
         FileChooserPrompt(
-            data_caching.import_puzzles,
-            on_dismiss=self.fill_puzzle_layout).open()
+            lambda file_list: data_caching.import_puzzles(
+                file_list, callback=self.fill_puzzle_layout)
+        ).open()
 
     def export_puzzles(self):
         """
@@ -446,8 +482,8 @@ class LoadPuzzlePrompt(Popup):
             """
 
             data_caching.delete_all_puzzles()
-            # reload layout to reflect deletion
-            self.fill_puzzle_layout()
+            self.selected_names = []
+            self.puzzle_list.data = []
 
         YesNoPrompt(
             strings.label_delete_all_puzzles,
@@ -455,77 +491,89 @@ class LoadPuzzlePrompt(Popup):
             title=strings.title_delete_all_puzzles
         ).open()
 
-    def puzzle_selected(self, name):
+    def puzzle_selected(self, index):
         """
-        Add `name` to `self.selected_names`, or remove if it is already
-        there.
+        Select the puzzle in row `index` of the list, or deselect it if
+        it is already selected.
 
-        :param name: The name of a puzzle
-        :type name: str
+        :param index: The index of a row in `puzzle_list.data`
+        :type index: int
         :return: None
         """
 
-        if name in self.selected_names:
+        row = self.puzzle_list.data[index]
+        name = row['name']
+        if row['selected']:
             self.selected_names.remove(name)
         else:
             self.selected_names.append(name)
+        row['selected'] = not row['selected']
+        self.puzzle_list.refresh_from_data()
 
-
-class PuzzleButton(BoxLayout):
-    """
-    A layout containing a ToggleButton to select a puzzle, and a button
-    to delete the puzzle.
-    """
-
-    def __init__(self, name, selection_callback, deletion_callback, **kwargs):
-        """
-        Create the layout.
-
-        `name` will be passed to `selection_callback` when the
-        ToggleButton is toggled.
-        If the puzzle is deleted, `deletion_callback` will be called
-        afterwards.
-
-        :param name: The name of the puzzle
-        :type name: str
-        :param selection_callback: A function accepting a string
-        :type selection_callback: function
-        :param deletion_callback: A function with no arguments
-        :type deletion_callback: function
-        :param kwargs: Additional keyword arguments for the layout
-        """
-
-        super(PuzzleButton, self).__init__(**kwargs)
-        self.toggle_button.text = name
-        self.selection_cb = selection_callback
-        self.deleted_cb = deletion_callback
-
-    def prompt_delete_puzzle(self):
+    def prompt_delete_puzzle(self, index):
         """
-        Prompt the user to delete the puzzle whose name is displayed in
-        this layout.
+        Prompt the user to delete the puzzle in row `index` of the list.
 
+        :param index: The index of a row in `puzzle_list.data`
+        :type index: int
         :return: None
         """
 
+        name = self.puzzle_list.data[index]['name']
+
         def confirm_delete():
             """
-            Delete the puzzle.
+            Delete the puzzle, and remove its row from the list.
 
             :return: None
             """
 
-            data_caching.delete_puzzle(self.toggle_button.text)
-            self.deleted_cb()
+            data_caching.delete_puzzle(name)
+            if name in self.selected_names:
+                self.selected_names.remove(name)
+            # the row may have moved if the list changed in the meantime
+            for i, row in enumerate(self.puzzle_list.data):
+                if row['name'] == name:
+                    del self.puzzle_list.data[i]
+                    break
 
         YesNoPrompt(
-            strings.label_delete_puzzle.format(
-                self.toggle_button.text),
+            strings.label_delete_puzzle.format(name),
             yes_callback=confirm_delete,
             title=strings.title_delete_puzzle
         ).open()
 
 
+class PuzzleButton(RecycleDataViewBehavior, BoxLayout):
+    """
+    A row of a :class:`LoadPuzzlePrompt`'s list, containing a
+    ToggleButton to select a puzzle, and a button to delete the puzzle.
+    """
+
+    index = NumericProperty(0)
+    name = StringProperty('')
+    selected = BooleanProperty(False)
+    prompt = ObjectProperty(None)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """
+        Display the row `index` of the list, which belongs to the
+        LoadPuzzlePrompt `rv.prompt`.
+
+        :param rv: The RecycleView
+        :type rv: kivy.uix.recycleview.RecycleView
+        :param index: The index of the row in `data`
+        :type index: int
+        :param data: The row's data
+        :type data: dict
+        :return: None
+        """
+
+        self.index = index
+        self.prompt = rv.prompt
+        return super(PuzzleButton, self).refresh_view_attrs(rv, index, data)
+
+
 class YesNoPrompt(Popup):
     """
     A Popup prompting the user with text, with yes and no buttons.
@@ -0,0 +1,391 @@
+import json
+import operator
+import threading
+from array import array
+
+import file_io
+import strings
+
+# metrics of each puzzle, in the order in which they are stored:
+# 'consonant_matches': the expected number of panels revealed by calling
+#     a consonant chosen at random
+# 'rstlne_coverage': the percentage of letters revealed by R, S, T, L,
+#     N, and E in the bonus round
+# 'vowel_density': the percentage of letters which are vowels
+# 'unique_letters': the number of different letters
+metrics = [
+    'consonant_matches', 'rstlne_coverage', 'vowel_density', 'unique_letters']
+
+# comparisons which can be used to filter puzzles by a metric
+comparisons = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '=': operator.eq,
+    '>=': operator.ge,
+    '>': operator.gt,
+}
+
+# the version of the format of the cache file
+_cache_version = 1
+
+_consonant_indices = [strings.alphabet.index(c) for c in strings.consonants]
+_vowel_indices = [strings.alphabet.index(c) for c in strings.vowels]
+_rstlne_indices = [
+    strings.alphabet.index(c) for c in strings.bonus_round_letters.lower()]
+
+_numpy = None
+
+
+def get_numpy():
+    """
+    Get the NumPy module, importing it on first use, since it is slow to
+    import. NumPy is optional; without it, puzzles are analyzed one at a
+    time.
+
+    :return: The numpy module, or None if it is not installed
+    :rtype: module
+    """
+
+    global _numpy
+
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def letter_count_matrix(names):
+    """
+    Count each letter of the alphabet in each puzzle name, using NumPy.
+
+    :param names: A list of puzzle names
+    :type names: list
+    :return: An array of shape (len(names), 26), where row *i* holds the
+             number of times each letter appears in `names[i]`
+    :rtype: numpy.ndarray
+    """
+
+    numpy = get_numpy()
+    # one byte per character, with letters outside of the alphabet
+    # replaced, so that every name takes as many bytes as characters
+    encoded = [name.upper().encode('ascii', 'replace') for name in names]
+    data = numpy.frombuffer(b''.join(encoded), dtype=numpy.uint8)
+    rows = numpy.repeat(
+        numpy.arange(len(names)),
+        numpy.fromiter(map(len, encoded), dtype=numpy.intp, count=len(names)))
+    letters = data.astype(numpy.intp) - ord('A')
+    is_letter = (letters >= 0) & (letters < len(strings.alphabet))
+    cells = rows[is_letter] * len(strings.alphabet) + letters[is_letter]
+    return numpy.bincount(
+        cells, minlength=len(names) * len(strings.alphabet)
+    ).reshape(len(names), len(strings.alphabet))
+
+
+def compute_metrics(names):
+    """
+    Compute the metrics of puzzles, all at once if NumPy is installed.
+    See `metrics` for a description of each metric.
+
+    :param names: A list of puzzle names
+    :type names: list
+    :return: A dict of {metric: list of values}, in the order of `names`
+    :rtype: dict
+    """
+
+    numpy = get_numpy()
+    if numpy is None or not names:
+        return _compute_metrics_slowly(names)
+
+    counts = letter_count_matrix(names)
+    letters = counts.sum(axis=1)
+    # avoid dividing by 0 for puzzles without letters
+    divisor = numpy.maximum(letters, 1)
+    return {
+        'consonant_matches': (
+            counts[:, _consonant_indices].sum(axis=1)
+            / len(_consonant_indices)).tolist(),
+        'rstlne_coverage': (
+            counts[:, _rstlne_indices].sum(axis=1) * 100 / divisor).tolist(),
+        'vowel_density': (
+            counts[:, _vowel_indices].sum(axis=1) * 100 / divisor).tolist(),
+        'unique_letters': (counts > 0).sum(axis=1).tolist(),
+    }
+
+
+def _compute_metrics_slowly(names):
+    """
+    Compute the metrics of puzzles one at a time, without NumPy.
+
+    :param names: A list of puzzle names
+    :type names: list
+    :return: A dict of {metric: list of values}, in the order of `names`
+    :rtype: dict
+    """
+
+    columns = {metric: [] for metric in metrics}
+    for name in names:
+        counts = array('H', [0]) * len(strings.alphabet)
+        for c in name.lower():
+            i = strings.alphabet.find(c)
+            if i >= 0:
+                counts[i] += 1
+        divisor = max(sum(counts), 1)
+        columns['consonant_matches'].append(
+            sum(counts[i] for i in _consonant_indices)
+            / len(_consonant_indices))
+        columns['rstlne_coverage'].append(
+            sum(counts[i] for i in _rstlne_indices) * 100 / divisor)
+        columns['vowel_density'].append(
+            sum(counts[i] for i in _vowel_indices) * 100 / divisor)
+        columns['unique_letters'].append(sum(1 for n in counts if n))
+    return columns
+
+
+class PuzzleAnalysis(object):
+    """
+    The metrics of every puzzle in the puzzle store, for sorting and
+    filtering puzzles. See `metrics` for a description of each metric.
+
+    The metrics of a puzzle depend only on its name, which is the text
+    of the puzzle, so they never go out of date. They are kept in a
+    cache file, and :meth:`update` only computes the metrics of puzzles
+    which were added since the file was written. The file is written in
+    a background thread, `save_delay` seconds after the first change,
+    so several updates in quick succession only result in a single
+    write.
+    """
+
+    def __init__(self, filename, save_delay=0):
+        """
+        Create the analysis, loading the metrics in the cache file
+        `filename` if it exists.
+
+        :param filename: The name of the cache file
+        :type filename: str
+        :param save_delay: The number of seconds to wait before writing
+                           changes to the cache file, defaults to 0
+        :type save_delay: float, optional
+        """
+
+        self.filename = filename
+        self.save_delay = save_delay
+        # {name: position in each column}
+        self._positions = {}
+        # {metric: list of values}
+        self._columns = {metric: [] for metric in metrics}
+        # held while the metrics are changed or copied for saving
+        self._lock = threading.Lock()
+        self._save_timer = None
+        self._load()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def _load(self):
+        """
+        Load the metrics from the cache file. The cache is ignored if it
+        cannot be read.
+
+        :return: None
+        """
+
+        try:
+            with open(self.filename) as f:
+                cache = json.load(f)
+            if cache.get('version') != _cache_version:
+                return
+            names = cache['names']
+            columns = {metric: cache[metric] for metric in metrics}
+        except (EnvironmentError, ValueError, KeyError, AttributeError):
+            return
+        if all(len(column) == len(names) for column in columns.values()):
+            self._positions = {name: i for i, name in enumerate(names)}
+            self._columns = columns
+
+    def save(self):
+        """
+        Write the metrics to the cache file.
+        See :func:`file_io.atomic_write_json`.
+
+        :return: None
+        """
+
+        with self._lock:
+            cache = {
+                'version': _cache_version, 'names': list(self._positions)}
+            cache.update(
+                (metric, list(column))
+                for metric, column in self._columns.items())
+        file_io.atomic_write_json(self.filename, cache)
+
+    def _schedule_save(self):
+        """
+        Schedule :meth:`flush` to run in a background thread after
+        `save_delay` seconds, unless it is already scheduled.
+
+        :return: None
+        """
+
+        with self._lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(
+                    self.save_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self):
+        """
+        Write the metrics to the cache file now, if a write is
+        scheduled. If the file cannot be written, the metrics are still
+        kept in memory.
+
+        :return: None
+        """
+
+        with self._lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+        try:
+            self.save()
+        except EnvironmentError:
+            pass
+
+    def update(self, names):
+        """
+        Bring the metrics up to date with a list of stored puzzle names.
+        Puzzles not in `names` are forgotten, and the metrics of new
+        puzzles are computed. If anything changed, the cache file is
+        written after `save_delay` seconds.
+
+        :param names: The names of all stored puzzles
+        :type names: list
+        :return: True if anything changed, otherwise False
+        :rtype: bool
+        """
+
+        stored = set(names)
+        missing = [name for name in names if name not in self._positions]
+        if not missing and len(stored) == len(self._positions):
+            return False
+
+        new_columns = compute_metrics(missing) if missing else None
+
+        with self._lock:
+            kept = [name for name in self._positions if name in stored]
+            if len(kept) < len(self._positions):
+                positions = [self._positions[name] for name in kept]
+                self._columns = {
+                    metric: [column[i] for i in positions]
+                    for metric, column in self._columns.items()}
+                self._positions = {name: i for i, name in enumerate(kept)}
+
+            if new_columns:
+                for metric in metrics:
+                    self._columns[metric].extend(new_columns[metric])
+                start = len(self._positions)
+                for i, name in enumerate(missing, start):
+                    self._positions[name] = i
+
+        self._schedule_save()
+        return True
+
+    def get(self, name):
+        """
+        Get the metrics of a puzzle.
+
+        :param name: The name of a puzzle
+        :type name: str
+        :return: A dict of {metric: value}, or None if the puzzle has not
+                 been analyzed
+        :rtype: dict
+        """
+
+        i = self._positions.get(name)
+        if i is None:
+            return None
+        return {metric: self._columns[metric][i] for metric in metrics}
+
+    def _values(self, names, metric):
+        """
+        Get one metric of several puzzles.
+
+        :param names: A list of analyzed puzzle names
+        :type names: list
+        :param metric: One of `metrics`
+        :type metric: str
+        :return: A list of values, in the order of `names`
+        :rtype: list
+        """
+
+        column = self._columns[metric]
+        return [column[i] for i in map(self._positions.__getitem__, names)]
+
+    def filter(self, names, metric, comparison, value):
+        """
+        Get the puzzles whose metric compares to `value` in the given
+        way. Puzzles which have not been analyzed are left out.
+
+        :param names: A list of puzzle names
+        :type names: list
+        :param metric: One of `metrics`
+        :type metric: str
+        :param comparison: One of the keys of `comparisons`
+        :type comparison: str
+        :param value: The value to compare with
+        :type value: float
+        :return: A list of puzzle names, in the order of `names`
+        :rtype: list
+        """
+
+        names = [name for name in names if name in self._positions]
+        if not names:
+            return []
+        compare = comparisons[comparison]
+        numpy = get_numpy()
+        if numpy is None:
+            return [
+                name for name, metric_value in zip(
+                    names, self._values(names, metric))
+                if compare(metric_value, value)]
+        matching = compare(
+            numpy.array(self._values(names, metric)), value)
+        return [names[i] for i in numpy.flatnonzero(matching)]
+
+    def sort(self, names, metric, descending=False):
+        """
+        Sort puzzles by a metric. Puzzles with the same value keep their
+        order, and puzzles which have not been analyzed go last.
+
+        :param names: A list of puzzle names
+        :type names: list
+        :param metric: One of `metrics`
+        :type metric: str
+        :param descending: True to put the highest values first,
+                           defaults to False
+        :type descending: bool, optional
+        :return: A sorted list of puzzle names
+        :rtype: list
+        """
+
+        analyzed = [name for name in names if name in self._positions]
+        others = [name for name in names if name not in self._positions]
+        metric_values = self._values(analyzed, metric)
+        numpy = get_numpy()
+        if numpy is None:
+            order = sorted(
+                range(len(analyzed)), key=metric_values.__getitem__,
+                reverse=descending)
+        else:
+            keys = numpy.array(metric_values)
+            # a stable sort of the negated values keeps ties in order
+            order = numpy.argsort(
+                -keys if descending else keys, kind='stable').tolist()
+        return [analyzed[i] for i in order] + others
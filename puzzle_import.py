@@ -0,0 +1,406 @@
+import collections
+import io
+import itertools
+import locale
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# errors that prevent a puzzle file from being imported
+import_errors = (EnvironmentError, UnicodeDecodeError, IndexError)
+
+
+class _UnreadableChunk(Exception):
+    """Raised when part of a puzzle file could not be parsed."""
+
+    pass
+
+
+def parse_puzzle_line(line):
+    """
+    Parse a single line of a puzzle file.
+    Lines must consist of tab-separated values, of the form:
+    {puzzle} {category} ({clue})
+
+    Raises an IndexError if the line has no category.
+
+    :param line: A line from a puzzle file
+    :type line: str
+    :return: A tuple of the puzzle's name and its puzzle dict, or None
+             if the line is blank
+    :rtype: tuple
+    """
+
+    if not line.strip():
+        return None
+
+    fields = line.split('\t')
+    puzzle = fields[0].ljust(52)[:52].upper()
+    category = fields[1].strip()
+    try:
+        clue = fields[2].strip()
+    except IndexError:
+        clue = ''
+
+    name = ' '.join(puzzle.split())
+    return name, {'puzzle': puzzle, 'category': category, 'clue': clue}
+
+
+def iter_puzzle_file(filename):
+    """
+    Read puzzles from the file `filename` one line at a time.
+    See :func:`parse_puzzle_line` for the format of the file.
+
+    :param filename: A filename
+    :type filename: str
+    :return: A generator of (name, puzzle dict) tuples
+    :rtype: generator
+    """
+
+    with open(filename) as f:
+        for line in f:
+            parsed = parse_puzzle_line(line)
+            if parsed is not None:
+                yield parsed
+
+
+def parse_puzzle_chunk(filename, start, end, encoding):
+    """
+    Parse the lines of the file `filename` which begin between the byte
+    offsets `start` (inclusive) and `end` (exclusive).
+    See :func:`parse_puzzle_line` for the format of the file.
+
+    The returned puzzles are the first instance of each name in the
+    chunk, as a list of (line index, name, puzzle dict) tuples. The
+    returned duplicates are the second instance of each name which
+    appears more than once, as a list of (line index, name) tuples.
+    Line indices are relative to the start of the chunk.
+
+    This runs in a worker process, so errors are not raised.
+
+    :param filename: A filename
+    :type filename: str
+    :param start: The offset of the start of the chunk
+    :type start: int
+    :param end: The offset of the end of the chunk, or None to read to
+                the end of the file
+    :type end: int
+    :param encoding: The text encoding of the file
+    :type encoding: str
+    :return: A tuple of (puzzles, duplicates), or None if the chunk
+             could not be parsed
+    :rtype: tuple
+    """
+
+    try:
+        with open(filename, 'rb') as f:
+            if start:
+                # skip the line that began in the previous chunk
+                f.seek(start - 1)
+                f.readline()
+            if end is None:
+                data = f.read()
+            else:
+                lines = []
+                while f.tell() < end:
+                    line = f.readline()
+                    if not line:
+                        break
+                    lines.append(line)
+                data = b''.join(lines)
+
+        puzzles = []
+        duplicates = []
+        names = set()
+        duplicate_names = set()
+        text = io.StringIO(data.decode(encoding), newline=None)
+        for index, line in enumerate(text):
+            parsed = parse_puzzle_line(line)
+            if parsed is None:
+                continue
+            name, puzzle = parsed
+            if name not in names:
+                names.add(name)
+                puzzles.append((index, name, puzzle))
+            elif name not in duplicate_names:
+                duplicate_names.add(name)
+                duplicates.append((index, name))
+        return puzzles, duplicates
+    except import_errors:
+        return None
+
+
+def batches(iterable, size):
+    """
+    Split `iterable` into lists of at most `size` items.
+
+    :param iterable: An iterable
+    :type iterable: iterable
+    :param size: The maximum number of items in each list
+    :type size: int
+    :return: A generator of lists
+    :rtype: generator
+    """
+
+    iterator = iter(iterable)
+    batch = list(itertools.islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(itertools.islice(iterator, size))
+
+
+class PuzzleImporter(object):
+    """
+    Imports puzzles from a list of files into a
+    :class:`puzzle_store.PuzzleStore`.
+
+    Files are split into chunks of at most `chunk_size` bytes, which are
+    parsed in parallel by a pool of worker processes. The results are
+    merged in the order of `file_list`, so the outcome is the same as
+    reading the files one after another, and the puzzles are written in
+    batches of `batch_size`, each in its own transaction, so that no
+    transaction grows with the size of a file.
+
+    If any line of a file cannot be read, the puzzles already written
+    from that file are deleted again, so none of the puzzles in that
+    file are added.
+    Only the first instance of each puzzle name is imported. Puzzles
+    which already exist in the store are not overwritten; their names
+    are collected in `existing_names` so that they can be overwritten
+    afterwards with :meth:`overwrite_existing`.
+
+    After :meth:`run` has finished, the following attributes are set:
+
+    `imported`: the number of puzzles added to the store.
+    `duplicate_names`: names encountered more than once in the files.
+    `existing_names`: names which were already in the store.
+    `unable_to_import`: files which could not be imported.
+    """
+
+    def __init__(self, file_list, store, batch_size, chunk_size,
+                 processes=None, progress_callback=None):
+        """
+        Create the importer.
+
+        While importing, `progress_callback` is called after each batch
+        of puzzles is written, and after each file is finished. It is
+        called with the importer, the name of the current file, and the
+        number of that file (starting at 1).
+
+        :param file_list: A list of filename strings
+        :type file_list: list
+        :param store: The store to import puzzles into
+        :type store: puzzle_store.PuzzleStore
+        :param batch_size: The number of puzzles to write at once
+        :type batch_size: int
+        :param chunk_size: The maximum number of bytes parsed by a worker
+                           process at once
+        :type chunk_size: int
+        :param processes: The number of worker processes, or None to use
+                          one per CPU, defaults to None
+        :type processes: int, optional
+        :param progress_callback: A function accepting a
+                                  PuzzleImporter, a string, and an int,
+                                  defaults to None
+        :type progress_callback: function, optional
+        """
+
+        self.file_list = file_list
+        self.store = store
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.processes = processes or os.cpu_count() or 1
+        self.progress_callback = progress_callback
+
+        self.imported = 0
+        self.duplicate_names = []
+        self.existing_names = []
+        self.unable_to_import = []
+
+    def _report(self, filename, number):
+        """
+        Call `progress_callback`, if there is one.
+
+        :param filename: The name of the current file
+        :type filename: str
+        :param number: The number of the current file
+        :type number: int
+        :return: None
+        """
+
+        if self.progress_callback:
+            self.progress_callback(self, filename, number)
+
+    def _chunks(self, filename):
+        """
+        Split the file `filename` into chunks of at most `chunk_size`
+        bytes. If the size of the file cannot be read, it is treated as
+        a single chunk.
+
+        :param filename: A filename
+        :type filename: str
+        :return: A list of (start, end) offsets
+        :rtype: list
+        """
+
+        try:
+            size = os.path.getsize(filename)
+        except EnvironmentError:
+            size = 0
+        starts = list(range(0, size, self.chunk_size)) or [0]
+        return [(start, start + self.chunk_size) for start in starts[:-1]] + [
+            (starts[-1], None)]
+
+    def _parse(self, chunks):
+        """
+        Parse each chunk with :func:`parse_puzzle_chunk`, using a pool of
+        worker processes if there is more than one chunk.
+        Only a limited number of chunks are parsed ahead of the one
+        being merged, to limit memory use.
+
+        :param chunks: A list of (filename, start, end) tuples
+        :type chunks: list
+        :return: A generator of the results, in the order of `chunks`
+        :rtype: generator
+        """
+
+        encoding = locale.getpreferredencoding(False)
+
+        if len(chunks) == 1 or self.processes == 1:
+            for filename, start, end in chunks:
+                yield parse_puzzle_chunk(filename, start, end, encoding)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            remaining = iter(chunks)
+            pending = collections.deque(
+                executor.submit(parse_puzzle_chunk, *chunk + (encoding,))
+                for chunk in itertools.islice(remaining, self.processes * 2))
+            while pending:
+                result = pending.popleft().result()
+                for chunk in itertools.islice(remaining, 1):
+                    pending.append(executor.submit(
+                        parse_puzzle_chunk, *chunk + (encoding,)))
+                yield result
+
+    def run(self):
+        """
+        Import all of the files in `file_list`.
+
+        :return: None
+        """
+
+        file_chunks = [self._chunks(filename) for filename in self.file_list]
+        results = self._parse([
+            (filename, start, end)
+            for filename, chunks in zip(self.file_list, file_chunks)
+            for start, end in chunks])
+
+        found_names = set()
+        for number, (puzzle_file, chunks) in enumerate(
+                zip(self.file_list, file_chunks), 1):
+            self._report(puzzle_file, number)
+
+            file_results = itertools.islice(results, len(chunks))
+            file_names = set()
+            duplicate_names = []
+            existing_names = []
+            # names of the puzzles written from this file
+            added_names = []
+
+            try:
+                for result in file_results:
+                    if result is None:
+                        raise _UnreadableChunk
+                    puzzles, duplicates = result
+
+                    # a name is a duplicate where it is first seen if it
+                    # was already found, otherwise where it is seen for
+                    # the second time
+                    new_puzzles = []
+                    duplicate_lines = []
+                    for index, name, puzzle in puzzles:
+                        if name in found_names or name in file_names:
+                            duplicate_lines.append((index, name))
+                        else:
+                            new_puzzles.append((name, puzzle))
+                    new_names = {name for name, _puzzle in new_puzzles}
+                    duplicate_lines.extend(
+                        (index, name) for index, name in duplicates
+                        if name in new_names)
+                    file_names |= new_names
+
+                    for _index, name in sorted(duplicate_lines):
+                        if name not in duplicate_names:
+                            duplicate_names.append(name)
+
+                    for batch in batches(new_puzzles, self.batch_size):
+                        with self.store.transaction():
+                            existing = self.store.existing_names(
+                                name for name, _puzzle in batch)
+                            not_existing = [
+                                (name, puzzle) for name, puzzle in batch
+                                if name not in existing]
+                            self.store.put_many(not_existing, overwrite=False)
+
+                        existing_names.extend(
+                            name for name, _puzzle in batch
+                            if name in existing)
+                        added_names.extend(
+                            name for name, _puzzle in not_existing)
+                        self.imported += len(not_existing)
+                        self._report(puzzle_file, number)
+            except _UnreadableChunk:
+                # skip the rest of this file's chunks
+                for _result in file_results:
+                    pass
+                for batch in batches(added_names, self.batch_size):
+                    with self.store.transaction():
+                        for name in batch:
+                            self.store.delete(name)
+                self.imported -= len(added_names)
+                self.unable_to_import.append(puzzle_file)
+            else:
+                # only record any puzzles if no errors encountered above
+                found_names |= file_names
+                self.duplicate_names += duplicate_names
+                self.existing_names += existing_names
+            self._report(puzzle_file, number)
+
+    def overwrite_existing(self):
+        """
+        Overwrite the puzzles in the store whose names are in
+        `existing_names` with the first instance of each found in the
+        files.
+
+        :return: None
+        """
+
+        remaining = set(self.existing_names)
+        for number, puzzle_file in enumerate(self.file_list, 1):
+            if not remaining:
+                break
+            if puzzle_file in self.unable_to_import:
+                continue
+            self._report(puzzle_file, number)
+
+            def first_instances():
+                """
+                Read the puzzles from the current file which are still
+                to be overwritten.
+
+                :return: A generator of (name, puzzle dict) tuples
+                :rtype: generator
+                """
+
+                for name, puzzle in iter_puzzle_file(puzzle_file):
+                    if name in remaining:
+                        remaining.discard(name)
+                        yield name, puzzle
+
+            try:
+                with self.store.transaction():
+                    for batch in batches(first_instances(), self.batch_size):
+                        self.store.put_many(batch)
+            except import_errors:
+                self.unable_to_import.append(puzzle_file)
+        self.existing_names = []
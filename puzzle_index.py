@@ -0,0 +1,392 @@
+import shlex
+from collections import defaultdict
+
+import puzzle_analysis
+
+# words which can begin a filter in a search query, such as 'words:3'
+filter_keys = {
+    'cat': 'category',
+    'category': 'category',
+    'clue': 'has_clue',
+    'letters': 'letters',
+    'matches': 'consonant_matches',
+    'rstlne': 'rstlne_coverage',
+    'sort': 'sort',
+    'unique': 'unique_letters',
+    'vowels': 'vowel_density',
+    'words': 'words',
+}
+
+# values of the 'clue:' filter meaning that the puzzle has a clue
+_true_words = {'1', 'true', 'y', 'yes'}
+# values of the 'clue:' filter meaning that the puzzle has no clue
+_false_words = {'0', 'false', 'n', 'no'}
+
+
+def trigrams(text):
+    """
+    Get the set of three-character substrings of `text`.
+
+    :param text: A string
+    :type text: str
+    :return: A set of strings
+    :rtype: set
+    """
+
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def letter_count(name):
+    """
+    Count the letters in a puzzle name.
+
+    :param name: The name of a puzzle
+    :type name: str
+    :return: The number of letters
+    :rtype: int
+    """
+
+    return sum(1 for c in name if c.isalpha())
+
+
+def _split_query(query):
+    """
+    Split a search query into words. Double quotes group words
+    containing spaces; apostrophes are kept as part of words.
+
+    :param query: The text of a search box
+    :type query: str
+    :return: A list of words, or None if a quote is not closed
+    :rtype: list
+    """
+
+    lexer = shlex.shlex(query, posix=True)
+    lexer.quotes = '"'
+    lexer.whitespace_split = True
+    lexer.commenters = ''
+    try:
+        return list(lexer)
+    except ValueError:
+        return None
+
+
+def _parse_comparison(value):
+    """
+    Parse the value of a metric filter, such as '>=50'. A value without
+    a comparison must be equal.
+
+    :param value: A comparison from `puzzle_analysis.comparisons`
+                  followed by a number
+    :type value: str
+    :return: A tuple of the comparison and the number, or None if the
+             value is incomplete
+    :rtype: tuple
+    """
+
+    comparison = '='
+    # longest first, so that '>=' is not read as '>'
+    for symbol in sorted(puzzle_analysis.comparisons, key=len, reverse=True):
+        if value.startswith(symbol):
+            comparison = symbol
+            value = value[len(symbol):]
+            break
+    try:
+        return comparison, float(value)
+    except ValueError:
+        return None
+
+
+def parse_query(query):
+    """
+    Split a search query into filters for :meth:`PuzzleIndex.search`.
+
+    Words of the form 'key:value' filter the puzzles, where key is one
+    of `filter_keys`:
+    'cat:' or 'category:' matches the start of the category,
+    'words:' and 'letters:' match the number of words or letters in the
+    puzzle, and 'clue:yes' or 'clue:no' match whether it has a clue.
+    'matches:', 'rstlne:', 'vowels:', and 'unique:' compare a metric of
+    :mod:`puzzle_analysis` with a number, such as 'rstlne:>=50', and
+    'sort:' sorts by a metric, such as 'sort:unique', or 'sort:-unique'
+    to put the highest values first.
+    Values containing spaces may be double quoted. Any other words must appear
+    in the puzzle's name.
+    Incomplete filters, such as 'words:' while the number is still being
+    typed, are ignored.
+
+    The metric filters are returned under 'metrics', as a list of
+    (metric, comparison, value) tuples, and the sort is returned under
+    'sort', as a tuple of the metric and whether to sort in descending
+    order. These must be removed before passing the filters to
+    :meth:`PuzzleIndex.search`, and applied with a
+    :class:`puzzle_analysis.PuzzleAnalysis`.
+
+    :param query: The text of a search box
+    :type query: str
+    :return: A dict of keyword arguments for :meth:`PuzzleIndex.search`
+    :rtype: dict
+    """
+
+    words = _split_query(query)
+    if words is None:
+        # the closing quote has not been typed yet
+        words = _split_query(query + '"')
+
+    filters = {}
+    text = []
+    for word in words:
+        key, sep, value = word.partition(':')
+        key = filter_keys.get(key.lower()) if sep else None
+        if key is None:
+            text.append(word)
+        elif key == 'category':
+            if value:
+                filters['category'] = value
+        elif key == 'has_clue':
+            if value.lower() in _true_words:
+                filters['has_clue'] = True
+            elif value.lower() in _false_words:
+                filters['has_clue'] = False
+        elif key == 'sort':
+            descending = value.startswith('-')
+            metric = filter_keys.get(value.lstrip('-').lower())
+            if metric in puzzle_analysis.metrics:
+                filters['sort'] = (metric, descending)
+        elif key in puzzle_analysis.metrics:
+            metric_filter = _parse_comparison(value)
+            if metric_filter is not None:
+                filters.setdefault('metrics', []).append(
+                    (key,) + metric_filter)
+        else:
+            try:
+                filters[key] = int(value)
+            except ValueError:
+                pass
+
+    if text:
+        filters['text'] = ' '.join(text)
+    return filters
+
+
+class PuzzleIndex(object):
+    """
+    An in-memory index of puzzles for searching by name, category,
+    number of words and letters, and whether the puzzle has a clue.
+
+    Names are indexed by their trigrams, so a substring search only
+    checks the names containing every trigram of the search text.
+    The index is updated one puzzle at a time with :meth:`add` and
+    :meth:`remove`, and search results are in the order in which the
+    puzzles were added. `version` increases whenever the index changes.
+    """
+
+    def __init__(self, puzzles=()):
+        """
+        Create the index.
+
+        :param puzzles: An iterable of (name, puzzle dict) pairs,
+                        defaults to an empty tuple
+        :type puzzles: iterable, optional
+        """
+
+        self.version = 0
+        self._reset()
+
+        for name, puzzle in puzzles:
+            self.add(name, puzzle)
+
+    def _reset(self):
+        """
+        Empty the index, without changing `version`.
+
+        :return: None
+        """
+
+        # {name: puzzle dict}, in order of addition
+        self._puzzles = {}
+        # {name: number}, increasing in order of addition
+        self._positions = {}
+        self._next_position = 0
+        self._by_trigram = defaultdict(set)
+        self._by_category = defaultdict(set)
+        self._by_words = defaultdict(set)
+        self._by_letters = defaultdict(set)
+        self._by_has_clue = defaultdict(set)
+
+    def __len__(self):
+        return len(self._puzzles)
+
+    def __contains__(self, name):
+        return name in self._puzzles
+
+    def names(self):
+        """
+        Get the names of all indexed puzzles.
+
+        :return: A list of puzzle names, in order of addition
+        :rtype: list
+        """
+
+        return list(self._puzzles)
+
+    def _keys(self, name, puzzle):
+        """
+        Get the index entries for a puzzle.
+
+        :param name: The name of the puzzle
+        :type name: str
+        :param puzzle: A puzzle dict
+        :type puzzle: dict
+        :return: A list of (index dict, key) pairs
+        :rtype: list
+        """
+
+        keys = [(self._by_trigram, trigram) for trigram in trigrams(name)]
+        keys.append((self._by_category, puzzle['category'].lower()))
+        keys.append((self._by_words, len(name.split())))
+        keys.append((self._by_letters, letter_count(name)))
+        keys.append((self._by_has_clue, bool(puzzle.get('clue'))))
+        return keys
+
+    def add(self, name, puzzle):
+        """
+        Add a puzzle to the index. If a puzzle with the same name is
+        already indexed, it is replaced, keeping its position.
+
+        :param name: The name of the puzzle
+        :type name: str
+        :param puzzle: A puzzle dict
+        :type puzzle: dict
+        :return: None
+        """
+
+        if name in self._puzzles:
+            self._unindex(name)
+        else:
+            self._positions[name] = self._next_position
+            self._next_position += 1
+        self._puzzles[name] = puzzle
+        for index, key in self._keys(name, puzzle):
+            index[key].add(name)
+        self.version += 1
+
+    def remove(self, name):
+        """
+        Remove a puzzle from the index. Does nothing if there is no such
+        puzzle.
+
+        :param name: The name of a puzzle
+        :type name: str
+        :return: None
+        """
+
+        if name in self._puzzles:
+            self._unindex(name)
+            del self._puzzles[name]
+            del self._positions[name]
+            self.version += 1
+
+    def _unindex(self, name):
+        """
+        Remove the index entries of the puzzle `name`.
+
+        :param name: The name of an indexed puzzle
+        :type name: str
+        :return: None
+        """
+
+        for index, key in self._keys(name, self._puzzles[name]):
+            names = index[key]
+            names.discard(name)
+            if not names:
+                del index[key]
+
+    def update(self, names, get_puzzles):
+        """
+        Bring the index up to date with a list of stored puzzle names,
+        such as after another process has changed the puzzle store.
+        Puzzles not in `names` are removed, and missing puzzles are
+        loaded with `get_puzzles` and added.
+
+        :param names: The names of all stored puzzles, in order
+        :type names: list
+        :param get_puzzles: A function accepting a list of names and
+                            returning a dict of {name: puzzle dict}
+                            pairs, such as
+                            :func:`data_caching.get_puzzles`
+        :type get_puzzles: function
+        :return: None
+        """
+
+        stored = set(names)
+        for name in [name for name in self._puzzles if name not in stored]:
+            self.remove(name)
+        missing = [name for name in names if name not in self._puzzles]
+        if missing:
+            for name, puzzle in get_puzzles(missing).items():
+                self.add(name, puzzle)
+
+    def clear(self):
+        """
+        Remove all puzzles from the index.
+
+        :return: None
+        """
+
+        self._reset()
+        self.version += 1
+
+    def search(self, text='', category=None, words=None, letters=None,
+               has_clue=None):
+        """
+        Get the names of the puzzles matching all of the given filters.
+        Filters which are None are not applied.
+
+        :param text: A string which must appear in the name,
+                     defaults to ''
+        :type text: str, optional
+        :param category: The start of the category, defaults to None
+        :type category: str, optional
+        :param words: The number of words in the name, defaults to None
+        :type words: int, optional
+        :param letters: The number of letters in the name,
+                        defaults to None
+        :type letters: int, optional
+        :param has_clue: Whether the puzzle has a clue, defaults to None
+        :type has_clue: bool, optional
+        :return: A list of puzzle names, in order of addition
+        :rtype: list
+        """
+
+        text = ' '.join(text.upper().split())
+        candidates = []
+        if category is not None:
+            category = category.lower()
+            candidates.append(set().union(*(
+                names for key, names in self._by_category.items()
+                if key.startswith(category))))
+        if words is not None:
+            candidates.append(self._by_words.get(words, set()))
+        if letters is not None:
+            candidates.append(self._by_letters.get(letters, set()))
+        if has_clue is not None:
+            candidates.append(self._by_has_clue.get(has_clue, set()))
+        candidates.extend(
+            self._by_trigram.get(trigram, set())
+            for trigram in trigrams(text))
+
+        if not candidates:
+            matches = self._puzzles
+        else:
+            candidates.sort(key=len)
+            matches = candidates[0].intersection(*candidates[1:])
+        if text:
+            # trigrams only narrow down the names which may contain text
+            matches = {name for name in matches if text in name}
+
+        if len(matches) == len(self._puzzles):
+            return list(self._puzzles)
+        if len(matches) * 8 > len(self._puzzles):
+            # cheaper than sorting when most of the puzzles match
+            return [name for name in self._puzzles if name in matches]
+        return sorted(matches, key=self._positions.__getitem__)
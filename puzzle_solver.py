@@ -0,0 +1,369 @@
+import logging
+import threading
+from collections import OrderedDict
+
+import strings
+
+# the character standing for a hidden letter in a board pattern
+hidden = '_'
+
+_logger = logging.getLogger(__name__)
+
+_letters = set(strings.alphabet.upper())
+
+
+def normalize(phrase):
+    """
+    Put a phrase or board pattern in the form used by the solver:
+    uppercase, with single spaces between words.
+
+    :param phrase: A phrase, puzzle name, or board pattern
+    :type phrase: str
+    :return: The normalized phrase
+    :rtype: str
+    """
+
+    return ' '.join(phrase.upper().split())
+
+
+def shape(phrase):
+    """
+    Get the shape of a normalized phrase or board pattern: every letter
+    becomes `hidden`, and any other characters are kept. Phrases can
+    only fit a pattern with the same shape.
+
+    :param phrase: A normalized phrase or board pattern
+    :type phrase: str
+    :return: The shape of the phrase
+    :rtype: str
+    """
+
+    return ''.join(hidden if c in _letters else c for c in phrase)
+
+
+def reveal_pattern(phrase, letters):
+    """
+    Get the board pattern of a phrase in which only `letters` have been
+    revealed.
+
+    :param phrase: A phrase or puzzle name
+    :type phrase: str
+    :param letters: The revealed letters
+    :type letters: iterable
+    :return: A normalized board pattern
+    :rtype: str
+    """
+
+    shown = {letter.upper() for letter in letters}
+    return ''.join(
+        hidden if c in _letters and c not in shown else c
+        for c in normalize(phrase))
+
+
+def _bitset(indices, size):
+    """
+    Make a bitset with the bits at `indices` set.
+
+    :param indices: A list of bit numbers
+    :type indices: list
+    :param size: The number of bits
+    :type size: int
+    :return: The bitset
+    :rtype: int
+    """
+
+    bits = bytearray((size + 7) // 8)
+    for i in indices:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class _ShapeIndex(object):
+    """
+    The phrases of one shape, with a bitset of the phrases having each
+    letter at each position. Bit *i* of a bitset stands for
+    `phrases[i]`.
+    """
+
+    __slots__ = ('phrases', 'everything', 'masks')
+
+    def __init__(self, phrases):
+        """
+        Index phrases which all have the same shape.
+
+        :param phrases: A list of normalized phrases
+        :type phrases: list
+        """
+
+        self.phrases = phrases
+        self.everything = (1 << len(phrases)) - 1
+        # [{letter: list of phrase numbers}], one dict per position
+        positions = [{} for _ in phrases[0]]
+        for i, phrase in enumerate(phrases):
+            for letters, c in zip(positions, phrase):
+                if c in _letters:
+                    letters.setdefault(c, []).append(i)
+        # [{letter: bitset}], one dict per position
+        self.masks = [
+            {c: _bitset(indices, len(phrases))
+             for c, indices in letters.items()}
+            for letters in positions]
+
+
+class PuzzleSolver(object):
+    """
+    Finds the phrases of a corpus which fit a puzzleboard.
+
+    Phrases are grouped by their shape (see :func:`shape`), which fixes
+    the length of every word and the position of any punctuation. Within
+    a shape, each letter at each position has a bitset of the phrases
+    with that letter there, so a board pattern is solved by combining
+    one bitset per panel, without looking at any phrase.
+    """
+
+    def __init__(self, phrases=()):
+        """
+        Index a corpus. Duplicate phrases are only indexed once.
+
+        :param phrases: An iterable of phrases, such as puzzle names,
+                        defaults to an empty tuple
+        :type phrases: iterable, optional
+        """
+
+        # {shape: list of normalized phrases}
+        by_shape = {}
+        seen = set()
+        for phrase in phrases:
+            phrase = normalize(phrase)
+            if phrase and phrase not in seen:
+                seen.add(phrase)
+                by_shape.setdefault(shape(phrase), []).append(phrase)
+        self._shapes = {
+            phrase_shape: _ShapeIndex(shape_phrases)
+            for phrase_shape, shape_phrases in by_shape.items()}
+        self._size = len(seen)
+
+    def __len__(self):
+        return self._size
+
+    def _fits(self, pattern, unavailable_letters):
+        """
+        Find the phrases which fit a board pattern.
+
+        :param pattern: A board pattern
+        :type pattern: str
+        :param unavailable_letters: Letters which have been called
+        :type unavailable_letters: iterable
+        :return: The index of the pattern's shape, and a bitset of the
+                 phrases which fit, or (None, 0) if none fit
+        :rtype: tuple
+        """
+
+        pattern = normalize(pattern)
+        index = self._shapes.get(shape(pattern))
+        if index is None:
+            return None, 0
+        called = {letter.upper() for letter in unavailable_letters}
+
+        fits = index.everything
+        for masks, c in zip(index.masks, pattern):
+            if c == hidden:
+                # every panel with a called letter has been revealed
+                for letter in called:
+                    fits &= ~masks.get(letter, 0)
+            elif c in _letters:
+                fits &= masks.get(c, 0)
+            if not fits:
+                return None, 0
+        return index, fits
+
+    def solve(self, pattern, unavailable_letters=(), limit=None):
+        """
+        Get the phrases which fit a board pattern.
+
+        A board pattern is the text of the puzzleboard, as given by
+        :meth:`board_state.BoardState.pattern`, with `hidden` for every
+        hidden letter. A phrase fits if it has the same shape, has the
+        revealed letters in the same places, and has none of
+        `unavailable_letters` in a hidden place.
+
+        :param pattern: A board pattern
+        :type pattern: str
+        :param unavailable_letters: Letters which have been called,
+                                    defaults to an empty tuple
+        :type unavailable_letters: iterable, optional
+        :param limit: The maximum number of phrases to return, defaults
+                      to None for no limit
+        :type limit: int, optional
+        :return: A list of phrases, in the order of the corpus
+        :rtype: list
+        """
+
+        index, fits = self._fits(pattern, unavailable_letters)
+        phrases = []
+        while fits and (limit is None or len(phrases) < limit):
+            lowest = fits & -fits
+            phrases.append(index.phrases[lowest.bit_length() - 1])
+            fits ^= lowest
+        return phrases
+
+    def count(self, pattern, unavailable_letters=()):
+        """
+        Count the phrases which fit a board pattern.
+        See :meth:`solve` for a description of board patterns.
+
+        :param pattern: A board pattern
+        :type pattern: str
+        :param unavailable_letters: Letters which have been called,
+                                    defaults to an empty tuple
+        :type unavailable_letters: iterable, optional
+        :return: The number of phrases
+        :rtype: int
+        """
+
+        return bin(self._fits(pattern, unavailable_letters)[1]).count('1')
+
+
+def find_ambiguous(names, solver=None, letters=strings.bonus_round_letters,
+                   limit=None):
+    """
+    Find the puzzles which could be mistaken for another phrase once
+    `letters` are revealed, such as puzzles with more than one answer
+    after R, S, T, L, N, and E in the bonus round.
+
+    :param names: A list of puzzle names
+    :type names: list
+    :param solver: The solver holding the phrases to compare with,
+                   defaults to None to compare the puzzles with each
+                   other
+    :type solver: PuzzleSolver, optional
+    :param letters: The revealed letters, defaults to
+                    `strings.bonus_round_letters`
+    :type letters: iterable, optional
+    :param limit: The maximum number of other answers to find for each
+                  puzzle, defaults to None for no limit
+    :type limit: int, optional
+    :return: An OrderedDict of {name: list of other phrases which fit},
+             in the order of `names`
+    :rtype: collections.OrderedDict
+    """
+
+    if solver is None:
+        solver = PuzzleSolver(names)
+    letters = list(letters)
+    ambiguous = OrderedDict()
+    for name in names:
+        answer = normalize(name)
+        others = [
+            phrase for phrase in solver.solve(
+                reveal_pattern(answer, letters), letters,
+                None if limit is None else limit + 1)
+            if phrase != answer][:limit]
+        if others:
+            ambiguous[name] = others
+    return ambiguous
+
+
+class SolverWorker(object):
+    """
+    Solves board patterns in a background thread, so that building the
+    solver and solving never block the caller.
+
+    Only the latest request is solved: a request made while another is
+    waiting replaces it. If the corpus cannot be loaded or the pattern
+    cannot be solved, the error is logged and no phrases are reported,
+    and the worker carries on with the next request.
+    """
+
+    def __init__(self, load_corpus, callback, limit=None):
+        """
+        Create the worker. The thread is started by the first request.
+
+        :param load_corpus: A function with no arguments returning an
+                            iterable of phrases. It is called in the
+                            background thread when the solver is
+                            first needed, and after :meth:`reload`.
+        :type load_corpus: function
+        :param callback: A function accepting a board pattern, a list
+                         of phrases which fit, and the number of phrases
+                         which fit. It is called in the background
+                         thread, once for each request solved.
+        :type callback: function
+        :param limit: The maximum number of phrases to pass to
+                      `callback`, defaults to None for no limit
+        :type limit: int, optional
+        """
+
+        self.load_corpus = load_corpus
+        self.callback = callback
+        self.limit = limit
+        self.solver = None
+        self._condition = threading.Condition()
+        self._request = None
+        self._reload = False
+        self._thread = None
+
+    def submit(self, pattern, unavailable_letters=()):
+        """
+        Ask for a board pattern to be solved.
+        See :meth:`PuzzleSolver.solve` for a description of board
+        patterns.
+
+        :param pattern: A board pattern
+        :type pattern: str
+        :param unavailable_letters: Letters which have been called,
+                                    defaults to an empty tuple
+        :type unavailable_letters: iterable, optional
+        :return: None
+        """
+
+        with self._condition:
+            self._request = (pattern, list(unavailable_letters))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def reload(self):
+        """
+        Rebuild the solver from `load_corpus` before the next request,
+        such as after puzzles have been added.
+
+        :return: None
+        """
+
+        with self._condition:
+            self._reload = True
+
+    def _run(self):
+        """
+        Solve requests as they arrive. This runs in the background
+        thread.
+
+        :return: None
+        """
+
+        while True:
+            with self._condition:
+                while self._request is None:
+                    self._condition.wait()
+                pattern, unavailable_letters = self._request
+                self._request = None
+                reload, self._reload = self._reload, False
+            try:
+                if self.solver is None or reload:
+                    self.solver = PuzzleSolver(self.load_corpus())
+                phrases = self.solver.solve(
+                    pattern, unavailable_letters, self.limit)
+                count = self.solver.count(pattern, unavailable_letters)
+            except Exception:
+                _logger.exception('Unable to solve %r', pattern)
+                phrases, count = [], 0
+                if reload:
+                    # try again with the next request
+                    self.reload()
+            try:
+                self.callback(pattern, phrases, count)
+            except Exception:
+                _logger.exception('Unable to report hints for %r', pattern)
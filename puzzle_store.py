@@ -0,0 +1,470 @@
+import contextlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import values
+
+# SQLite limits the number of variables in a single statement
+_max_sql_variables = 500
+
+
+class PuzzleStore(object):
+    """
+    Base class for puzzle storage backends.
+
+    Puzzles are stored as {name: puzzle dict} pairs, in the order in
+    which they were first added. Overwriting an existing puzzle does not
+    change its position.
+    See :func:`data_caching.add_puzzle` for a description of puzzle
+    dicts.
+    """
+
+    def names(self):
+        """
+        Get the names of all stored puzzles.
+
+        :return: A list of puzzle names
+        :rtype: list
+        """
+
+        raise NotImplementedError
+
+    def count(self):
+        """
+        Get the number of stored puzzles.
+
+        :return: The number of puzzles
+        :rtype: int
+        """
+
+        return len(self.names())
+
+    def get(self, name):
+        """
+        Get a single puzzle.
+
+        :param name: The name of a puzzle
+        :type name: str
+        :return: A puzzle dict, or None if there is no such puzzle
+        :rtype: dict
+        """
+
+        return self.get_many([name]).get(name)
+
+    def get_many(self, names):
+        """
+        Get the puzzles with names in `names`, in the order given.
+        Names that do not exist are skipped.
+
+        :param names: A list of puzzle names
+        :type names: list
+        :return: A dict of {name: puzzle dict} pairs
+        :rtype: collections.OrderedDict
+        """
+
+        raise NotImplementedError
+
+    def read_all(self):
+        """
+        Get all stored puzzles.
+
+        :return: A dict of {name: puzzle dict} pairs
+        :rtype: collections.OrderedDict
+        """
+
+        raise NotImplementedError
+
+    def read_page(self, offset, limit):
+        """
+        Get at most `limit` puzzles, skipping the first `offset`.
+
+        :param offset: The number of puzzles to skip
+        :type offset: int
+        :param limit: The maximum number of puzzles to return
+        :type limit: int
+        :return: A dict of {name: puzzle dict} pairs
+        :rtype: collections.OrderedDict
+        """
+
+        names = self.names()[offset:offset + limit]
+        return self.get_many(names)
+
+    def existing_names(self, names):
+        """
+        Get the names in `names` which belong to stored puzzles.
+
+        :param names: An iterable of puzzle names
+        :type names: iterable
+        :return: A set of puzzle names
+        :rtype: set
+        """
+
+        stored = set(self.names())
+        return {name for name in names if name in stored}
+
+    def put(self, name, puzzle):
+        """
+        Store a puzzle, overwriting any puzzle with the same name.
+
+        :param name: The name of the puzzle
+        :type name: str
+        :param puzzle: A puzzle dict
+        :type puzzle: dict
+        :return: None
+        """
+
+        self.put_many([(name, puzzle)])
+
+    def put_many(self, puzzles, overwrite=True):
+        """
+        Store several puzzles.
+
+        :param puzzles: An iterable of (name, puzzle dict) pairs
+        :type puzzles: iterable
+        :param overwrite: True if existing puzzles with the same names
+                          should be overwritten, otherwise False,
+                          defaults to True
+        :type overwrite: bool, optional
+        :return: None
+        """
+
+        raise NotImplementedError
+
+    def delete(self, name):
+        """
+        Delete a puzzle. Does nothing if there is no such puzzle.
+
+        :param name: The name of a puzzle
+        :type name: str
+        :return: None
+        """
+
+        raise NotImplementedError
+
+    def delete_all(self):
+        """
+        Delete all puzzles.
+
+        :return: None
+        """
+
+        raise NotImplementedError
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        A context manager grouping writes made by the current thread, so
+        that either all of them are stored, or none of them are if an
+        exception is raised.
+        Transactions may be nested; only the outermost one takes effect.
+
+        :return: A context manager
+        """
+
+        yield
+
+
+class JsonPuzzleStore(PuzzleStore):
+    """
+    Stores puzzles as a single dict under the 'puzzles' key of the
+    settings file.
+
+    Every change rewrites the entire dict, so this backend is only
+    suitable for small puzzle libraries.
+    """
+
+    def __init__(self, get_variables, update_variables):
+        """
+        Create the store.
+
+        :param get_variables: A function returning the settings dict,
+                              such as :func:`data_caching.get_variables`
+        :type get_variables: function
+        :param update_variables: A function accepting a dict to add to
+                                 the settings, such as
+                                 :func:`data_caching.update_variables`
+        :type update_variables: function
+        """
+
+        self.get_variables = get_variables
+        self.update_variables = update_variables
+        self._local = threading.local()
+
+    def _puzzles(self):
+        """
+        Get the stored puzzles, including uncommitted changes made in a
+        transaction by the current thread.
+
+        :return: A dict of {name: puzzle dict} pairs
+        :rtype: dict
+        """
+
+        pending = getattr(self._local, 'pending', None)
+        if pending is not None:
+            return pending
+        return self.get_variables().get('puzzles', {})
+
+    def _write(self, puzzles):
+        """
+        Write the dict `puzzles` to the settings, or keep it until the
+        end of the transaction if one is in progress.
+
+        :param puzzles: A dict of {name: puzzle dict} pairs
+        :type puzzles: dict
+        :return: None
+        """
+
+        if getattr(self._local, 'pending', None) is not None:
+            self._local.pending = puzzles
+        else:
+            self.update_variables({'puzzles': puzzles})
+
+    def names(self):
+        """See :meth:`PuzzleStore.names`."""
+
+        return list(self._puzzles())
+
+    def get_many(self, names):
+        """See :meth:`PuzzleStore.get_many`."""
+
+        puzzles = self._puzzles()
+        return OrderedDict(
+            (name, puzzles[name]) for name in names if name in puzzles)
+
+    def read_all(self):
+        """See :meth:`PuzzleStore.read_all`."""
+
+        return OrderedDict(self._puzzles())
+
+    def put_many(self, puzzles, overwrite=True):
+        """See :meth:`PuzzleStore.put_many`."""
+
+        stored = self.read_all()
+        for name, puzzle in puzzles:
+            if overwrite or name not in stored:
+                stored[name] = puzzle
+        self._write(stored)
+
+    def delete(self, name):
+        """See :meth:`PuzzleStore.delete`."""
+
+        stored = self.read_all()
+        if stored.pop(name, None) is not None:
+            self._write(stored)
+
+    def delete_all(self):
+        """See :meth:`PuzzleStore.delete_all`."""
+
+        self._write(OrderedDict())
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """See :meth:`PuzzleStore.transaction`."""
+
+        if getattr(self._local, 'pending', None) is not None:
+            # nested transaction
+            yield
+            return
+
+        self._local.pending = self.read_all()
+        try:
+            yield
+            self.update_variables({'puzzles': self._local.pending})
+        finally:
+            self._local.pending = None
+
+
+class SqlitePuzzleStore(PuzzleStore):
+    """
+    Stores puzzles in an SQLite database, one row per puzzle, with
+    indexes on the name, category, and whether the puzzle has a clue.
+
+    Each thread uses its own connection to the database.
+    """
+
+    def __init__(self, filename):
+        """
+        Create the store, creating the database file if it does not
+        exist.
+
+        :param filename: The name of the database file
+        :type filename: str
+        """
+
+        self.filename = filename
+        self._local = threading.local()
+
+        with self.transaction() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS puzzles ('
+                'id INTEGER PRIMARY KEY, '
+                'name TEXT NOT NULL, '
+                'puzzle TEXT NOT NULL, '
+                'category TEXT NOT NULL, '
+                'clue TEXT NOT NULL, '
+                'has_clue INTEGER NOT NULL)')
+            connection.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS puzzles_name '
+                'ON puzzles (name)')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS puzzles_category '
+                'ON puzzles (category)')
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS puzzles_has_clue '
+                'ON puzzles (has_clue)')
+
+    def _connection(self):
+        """
+        Get the database connection for the current thread, opening it
+        if necessary.
+        Writes should be made inside :meth:`transaction`.
+
+        :return: A database connection
+        :rtype: sqlite3.Connection
+        """
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.filename, timeout=values.puzzle_store_timeout)
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _row(name, puzzle):
+        """
+        Convert a puzzle dict to a row of values for the puzzles table.
+
+        :param name: The name of the puzzle
+        :type name: str
+        :param puzzle: A puzzle dict
+        :type puzzle: dict
+        :return: A tuple of (puzzle, category, clue, has_clue, name)
+        :rtype: tuple
+        """
+
+        clue = puzzle.get('clue', '')
+        return (
+            puzzle['puzzle'], puzzle['category'], clue, int(bool(clue)), name)
+
+    @staticmethod
+    def _puzzles_from_rows(rows):
+        """
+        Convert rows of (name, puzzle, category, clue) to puzzle dicts.
+
+        :param rows: An iterable of rows from the puzzles table
+        :type rows: iterable
+        :return: A dict of {name: puzzle dict} pairs
+        :rtype: collections.OrderedDict
+        """
+
+        return OrderedDict(
+            (name, {'puzzle': puzzle, 'category': category, 'clue': clue})
+            for name, puzzle, category, clue in rows)
+
+    def names(self):
+        """See :meth:`PuzzleStore.names`."""
+
+        return [
+            name for name, in self._connection().execute(
+                'SELECT name FROM puzzles ORDER BY id')]
+
+    def count(self):
+        """See :meth:`PuzzleStore.count`."""
+
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM puzzles').fetchone()[0]
+
+    def get_many(self, names):
+        """See :meth:`PuzzleStore.get_many`."""
+
+        names = list(names)
+        found = {}
+        for i in range(0, len(names), _max_sql_variables):
+            chunk = names[i:i + _max_sql_variables]
+            found.update(self._puzzles_from_rows(self._connection().execute(
+                'SELECT name, puzzle, category, clue FROM puzzles '
+                'WHERE name IN ({})'.format(','.join('?' * len(chunk))),
+                chunk)))
+        return OrderedDict(
+            (name, found[name]) for name in names if name in found)
+
+    def read_all(self):
+        """See :meth:`PuzzleStore.read_all`."""
+
+        return self._puzzles_from_rows(self._connection().execute(
+            'SELECT name, puzzle, category, clue FROM puzzles ORDER BY id'))
+
+    def read_page(self, offset, limit):
+        """See :meth:`PuzzleStore.read_page`."""
+
+        return self._puzzles_from_rows(self._connection().execute(
+            'SELECT name, puzzle, category, clue FROM puzzles '
+            'ORDER BY id LIMIT ? OFFSET ?',
+            (limit, offset)))
+
+    def existing_names(self, names):
+        """See :meth:`PuzzleStore.existing_names`."""
+
+        names = list(names)
+        existing = set()
+        for i in range(0, len(names), _max_sql_variables):
+            chunk = names[i:i + _max_sql_variables]
+            existing.update(name for name, in self._connection().execute(
+                'SELECT name FROM puzzles WHERE name IN ({})'.format(
+                    ','.join('?' * len(chunk))),
+                chunk))
+        return existing
+
+    def put_many(self, puzzles, overwrite=True):
+        """See :meth:`PuzzleStore.put_many`."""
+
+        rows = [self._row(name, puzzle) for name, puzzle in puzzles]
+        with self.transaction() as connection:
+            if overwrite:
+                # update in place, so overwritten puzzles keep their order
+                connection.executemany(
+                    'UPDATE puzzles '
+                    'SET puzzle = ?, category = ?, clue = ?, has_clue = ? '
+                    'WHERE name = ?',
+                    rows)
+            connection.executemany(
+                'INSERT OR IGNORE INTO puzzles '
+                '(puzzle, category, clue, has_clue, name) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows)
+
+    def delete(self, name):
+        """See :meth:`PuzzleStore.delete`."""
+
+        with self.transaction() as connection:
+            connection.execute('DELETE FROM puzzles WHERE name = ?', (name,))
+
+    def delete_all(self):
+        """See :meth:`PuzzleStore.delete_all`."""
+
+        with self.transaction() as connection:
+            connection.execute('DELETE FROM puzzles')
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        See :meth:`PuzzleStore.transaction`.
+
+        The context manager yields the current thread's database
+        connection.
+        """
+
+        connection = self._connection()
+        if getattr(self._local, 'in_transaction', False):
+            # nested transaction
+            yield connection
+            return
+
+        self._local.in_transaction = True
+        try:
+            with connection:
+                yield connection
+        finally:
+            self._local.in_transaction = False
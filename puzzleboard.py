@@ -1,4 +1,3 @@
-import queue
 import random
 
 from kivy.app import App
@@ -10,8 +9,11 @@ from kivy.uix.button import Button
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.widget import Widget
 
-import prompts
+import board_state
+import messaging
 import strings
+import timeline
+import tossup
 import values
 from my_widgets import Fullscreenable, KeyboardBindable
 
@@ -21,7 +23,7 @@ Builder.load_file(values.file_kv_puzzleboard)
 class PuzzleWithCategory(BoxLayout, Fullscreenable):
     """A BoxLayout containing the puzzleboard and category strip."""
 
-    def __init__(self, q_in=None, q_out=None, **kwargs):
+    def __init__(self, q_in=None, q_out=None, queue_budget=None, **kwargs):
         """
         Create the layout.
 
@@ -31,18 +33,141 @@ class PuzzleWithCategory(BoxLayout, Fullscreenable):
         :param q_out: A Queue to send information to the manager app,
                       defaults to None
         :type q_out: multiprocessing.Queue, optional
+        :param queue_budget: The limits on the commands handled from
+                             the queue in each frame, see
+                             :class:`messaging.QueueListener`, defaults
+                             to None
+        :type queue_budget: tuple, optional
         :param kwargs: Additional keyword arguments for the layout
         """
 
         super(PuzzleWithCategory, self).__init__(**kwargs)
         self.splitter_center.add_widget(
-            PuzzleLayout(self.category, q_in, q_out))
+            PuzzleLayout(self.category, q_in, q_out, queue_budget))
+
+
+class RevealAnimator(object):
+    """
+    Fades in the letters of revealed Panels.
+
+    A single Clock event runs each frame while any letter is fading or
+    waiting to be revealed, and sets the opacity of every such letter
+    from the time elapsed since its reveal began. This keeps the speed
+    of a fade the same at any frame rate, and revealing a whole puzzle
+    does not schedule an event for each Panel.
+    """
+
+    def __init__(self, duration):
+        """
+        Create the animator.
+
+        :param duration: The number of seconds for a letter to fade in
+        :type duration: float
+        """
+
+        self.duration = duration
+        # {Panel: time at which its reveal began}
+        self._fading = {}
+        # {Panel: time at which its reveal will begin}
+        self._waiting = {}
+        self._event = Clock.create_trigger(self._update, 0, interval=True)
+
+    def reveal(self, panel, delay=0):
+        """
+        Reveal the letter of a Panel, and fade it in. If the letter is
+        already partly visible, it continues to fade in from its current
+        opacity.
+
+        :param panel: The Panel to reveal
+        :type panel: Panel
+        :param delay: The number of seconds to wait before revealing the
+                      Panel, defaults to 0
+        :type delay: float, optional
+        :return: None
+        """
+
+        now = Clock.get_time()
+        if delay > 0:
+            self._waiting[panel] = now + delay
+        else:
+            self._waiting.pop(panel, None)
+            panel.mark_revealed()
+            if panel not in self._fading:
+                opacity = panel.text_label.color[3]
+                self._fading[panel] = now - opacity * self.duration
+            self._set_opacity(panel, now)
+        self._event()
+
+    def stop(self, panel):
+        """
+        Stop revealing a Panel, leaving its letter at its current
+        opacity.
+
+        :param panel: A Panel
+        :type panel: Panel
+        :return: None
+        """
+
+        self._fading.pop(panel, None)
+        self._waiting.pop(panel, None)
+
+    def clear(self):
+        """
+        Stop revealing all Panels.
+
+        :return: None
+        """
+
+        self._fading.clear()
+        self._waiting.clear()
+        self._event.cancel()
+
+    def _set_opacity(self, panel, now):
+        """
+        Set the opacity of a fading letter for the time `now`, and stop
+        fading it once it is fully visible.
+
+        :param panel: A Panel in `_fading`
+        :type panel: Panel
+        :param now: The time of the current frame
+        :type now: float
+        :return: None
+        """
+
+        opacity = min(1, (now - self._fading[panel]) / self.duration)
+        panel.text_label.color = [0, 0, 0, opacity]
+        if opacity >= 1:
+            del self._fading[panel]
+
+    def _update(self, _dt):
+        """
+        Begin any waiting reveals which are due, and advance every fading
+        letter. Stop running when there is nothing left to do.
+
+        :param _dt: The time elapsed since the last frame
+        :type _dt: float
+        :return: None
+        """
+
+        now = Clock.get_time()
+        due = [
+            (start, panel) for panel, start in self._waiting.items()
+            if start <= now]
+        for start, panel in sorted(due, key=lambda item: item[0]):
+            del self._waiting[panel]
+            panel.mark_revealed()
+            self._fading.setdefault(panel, start)
+        for panel in list(self._fading):
+            self._set_opacity(panel, now)
+        if not self._fading and not self._waiting:
+            self._event.cancel()
 
 
 class PuzzleLayout(GridLayout, KeyboardBindable):
     """A GridLayout containing all :class:`Panel`\\s."""
 
-    def __init__(self, category_label=None, q_in=None, q_out=None, **kwargs):
+    def __init__(self, category_label=None, q_in=None, q_out=None,
+                 queue_budget=None, **kwargs):
         """
         Create the layout.
 
@@ -55,6 +180,11 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
         :param q_out: A Queue to send information to the manager app,
                       defaults to None
         :type q_out: multiprocessing.Queue, optional
+        :param queue_budget: The limits on the commands handled from
+                             the queue in each frame, see
+                             :class:`messaging.QueueListener`, defaults
+                             to None
+        :type queue_budget: tuple, optional
         :param kwargs: Additional keyword arguments for the layout
         """
 
@@ -63,29 +193,53 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
         self.category_label = category_label
         self.queue_in = q_in
         self.queue_out = q_out
-        self.tossup_running = False
-
+        self.tossup = tossup.TossupEngine(
+            values.interval_tossup, self.tossup_reveal, self.tossup_finished)
+        # the next Panel to be revealed in the current toss-up
+        self.tossup_next = None
+        # random number generator for the order of toss-up reveals
+        self.random = random.Random()
+        # the generator used by the current toss-up
+        self.tossup_random = self.random
+        # panel numbers of the letters still to be revealed in the
+        # current toss-up, in reverse order
+        self.tossup_order = []
+
+        # the letters and state of the panels, which are drawn by the
+        # Panels in `panels`, numbered in the same way
+        self.board = board_state.BoardState(self.rows, self.cols)
+        # {puzzle string: game_compiler.CompiledPuzzle} of the current
+        # game, see load_game
+        self.compiled_puzzles = {}
+        self.animator = RevealAnimator(values.reveal_fade_duration)
+        # the Timelines of puzzle loads and letter checks which may still
+        # be running
+        self.timelines = []
+        self.panels = []
         for i in range(self.rows):
             for j in range(self.cols):
 
-                if (i, j) in [
-                        (0, 0), (0, self.cols - 1),
-                        (self.rows - 1, 0), (self.rows - 1, self.cols - 1)]:
+                if (i, j) not in self.board.indices:
+                    # corner
                     self.add_widget(Widget())
                 else:
                     # create panels
-                    panel = Panel()
+                    panel = Panel(
+                        self.board, self.board.indices[(i, j)], self.animator)
                     self.add_widget(panel)
+                    self.panels.append(panel)
                     self.reference_layout = panel.letter_layout
 
         self.get_keyboard()
 
         if self.queue_in:
-            Clock.schedule_once(self.check_queue, values.queue_start)
+            self.listener = messaging.QueueListener(
+                self.queue_in, self.handle_command, queue_budget)
+            Clock.schedule_once(self.listener.start, values.queue_start)
 
-    def check_queue(self, _dt):
+    def handle_command(self, command, args):
         """
-        Check the queue for incoming commands to execute.
+        Execute a command received from the queue.
 
         Each command in the queue should be a tuple of the form:
 
@@ -101,10 +255,16 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
             *args* is a list of single-character strings.
         'load':
             Load a puzzle onto the puzzleboard.
-            *args* is a puzzle string.
+            *args* is a puzzle dict.
+        'load_game':
+            Keep the puzzles of a game, laid out ahead of time, so that
+            loading them does not parse them again.
+            *args* is a dict of {puzzle string: compiled puzzle}, from
+            :func:`game_compiler.compile_game`.
         'tossup':
             Start a tossup.
-            *args* is ignored.
+            *args* is a seed for the order in which letters are
+            revealed, or None for a random order.
         'pause_tossup':
             Pause a tossup.
             *args* is ignored.
@@ -114,39 +274,44 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
         'reveal':
             Reveal the entire puzzle.
             *args* is ignored.
+        'pattern':
+            Send the board pattern to the manager app, for finding
+            answers which fit the puzzleboard.
+            *args* is ignored.
         'exit':
             Close the running app.
             *args* is ignored.
 
-        :param _dt: The time elapsed between scheduling and calling
-        :type _dt: float
+        :param command: The name of the command
+        :type command: str
+        :param args: The arguments of the command
+        :type args: object
         :return: None
         """
 
-        try:
-            command, args = self.queue_in.get(block=False)
-            if command == 'letter':
-                # args is a guessed letter
-                self.check_all(args)
-            elif command == 'bonus_round_letters':
-                # args is multiple letters
-                self.check_all_by_list(args, bonus_round=True)
-            elif command == 'load':
-                # args is a puzzle to be loaded
-                self.load_puzzle(args)
-            elif command == 'tossup':
-                self.start_tossup()
-            elif command == 'pause_tossup':
-                self.tossup_running = False
-            elif command == 'resume_tossup':
-                self.tossup_running = True
-            elif command == 'reveal':
-                self.reveal_all()
-            elif command == 'exit':
-                App.get_running_app().stop()
-        except queue.Empty:
-            pass
-        Clock.schedule_once(self.check_queue, values.queue_interval)
+        if command == 'letter':
+            # args is a guessed letter
+            self.check_all(args)
+        elif command == 'bonus_round_letters':
+            # args is multiple letters
+            self.check_all_by_list(args, bonus_round=True)
+        elif command == 'load':
+            # args is a puzzle to be loaded
+            self.load_puzzle(args)
+        elif command == 'load_game':
+            self.load_game(args)
+        elif command == 'tossup':
+            self.start_tossup(args)
+        elif command == 'pause_tossup':
+            self.tossup.pause()
+        elif command == 'resume_tossup':
+            self.tossup.resume()
+        elif command == 'reveal':
+            self.reveal_all()
+        elif command == 'pattern':
+            self.queue_out.put(('pattern', self.board.pattern()))
+        elif command == 'exit':
+            App.get_running_app().stop()
 
     def check_all_by_list(self, letters, bonus_round=False):
         """
@@ -165,51 +330,35 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
                    if letter.lower() in strings.alphabet]
 
         if bonus_round:
-            # indices in order from top to bottom, left to right
-            indices = [
-                          i + (j * self.cols)
-                          for i in range(self.cols)
-                          for j in range(self.rows)
-                      ][::-1]
+            # top to bottom, left to right
+            ranks = self.board.rank_left_to_right
         else:
-            # indices in order from top to bottom, right to left
-            indices = [
-                          i + (j * self.cols)
-                          for i in range(self.cols - 1, -1, -1)
-                          for j in range(self.rows)
-                      ][::-1]
+            # top to bottom, right to left
+            ranks = self.board.rank_right_to_left
+
+        # every change caused by this check, so that they can be
+        # cancelled if another puzzle is loaded
+        reveal = timeline.Timeline(values.reveal_time_scale)
 
         # the number of matches found so far,
         # used to offset the scheduled time to change the panel
         matches = 0
-        remaining_letters = []
 
-        for i in indices:
-            try:
-                panel = self.children[i]
-                if panel.hidden():
-                    if any(panel.check_letter(letter) for letter in letters):
-                        # match found
-                        # schedule panel to turn blue
-                        Clock.schedule_once(
-                            panel.blue,
-                            values.interval_blue * matches)
-                        # schedule "ding" sound
-                        Clock.schedule_once(
-                            lambda i: self.queue_out.put(('ding', None)),
-                            values.interval_blue * matches)
-                        # schedule panel to be revealed
-                        Clock.schedule_once(
-                            panel.show_letter,
-                            values.interval_reveal * (matches + 1))
-                        matches += 1
-                    else:
-                        panel_text = panel.text_label.text
-                        if panel_text:
-                            remaining_letters.append(panel_text)
-            except AttributeError:
-                # empty widget
-                pass
+        for i in self.board.matches(letters, ranks):
+            panel = self.panels[i]
+            # schedule panel to turn blue
+            reveal.add(values.interval_blue * matches, panel.blue)
+            # schedule "ding" sound
+            reveal.add(
+                values.interval_blue * matches,
+                lambda: self.queue_out.put(('ding', None)))
+            # schedule panel to be revealed
+            reveal.add(
+                values.interval_reveal * (matches + 1), panel.show_letter)
+            matches += 1
+
+        # other letters which are still hidden
+        remaining_letters = self.board.remaining_letters(letters)
 
         no_more_vowels = matches and not any(
             letter.lower() in strings.vowels
@@ -219,19 +368,50 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
             for letter in remaining_letters)
         if self.queue_out and len(letters) == 1:
             self.queue_out.put(('matches', (letters[0], matches)))
-            Clock.schedule_once(
-                lambda i: self.queue_out.put(('reveal_finished', None)),
-                values.interval_reveal * matches)
+            reveal.add(
+                values.interval_reveal * matches,
+                lambda: self.queue_out.put(('reveal_finished', None)))
             if no_more_vowels:
                 # indicate no more vowels in the middle of letter reveals
-                Clock.schedule_once(
-                    lambda i: self.queue_out.put(('no_more_vowels', None)),
-                    values.interval_reveal * matches / 2)
+                reveal.add(
+                    values.interval_reveal * matches / 2,
+                    lambda: self.queue_out.put(('no_more_vowels', None)))
             if no_more_consonants:
                 # indicate no more consonants after all letters revealed
-                Clock.schedule_once(
-                    lambda i: self.queue_out.put(('no_more_consonants', None)),
-                    values.interval_reveal * matches)
+                reveal.add(
+                    values.interval_reveal * matches,
+                    lambda: self.queue_out.put(('no_more_consonants', None)))
+
+        self.timelines = [
+            running for running in self.timelines if running.running]
+        self.timelines.append(reveal)
+        reveal.start()
+
+    def cancel_reveals(self):
+        """
+        Stop all letter checks which are still being revealed, and all
+        letters which are fading in, without sending any more messages
+        about them.
+
+        :return: None
+        """
+
+        for running in self.timelines:
+            running.cancel()
+        self.timelines = []
+        self.animator.clear()
+
+    def fast_forward_reveals(self):
+        """
+        Finish all letter checks which are still being revealed
+        immediately, sending any messages about them.
+
+        :return: None
+        """
+
+        for running in self.timelines:
+            running.fast_forward()
+        self.timelines = []
 
     def check_all(self, letter):
         """
@@ -251,25 +431,15 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
         :return: None
         """
 
-        # indices in order from top to bottom, left to right
-        indices = [
-                      i + (j * self.cols)
-                      for i in range(self.cols)
-                      for j in range(self.rows)
-                  ][::-1]
-        matches = 0
-        for i in indices:
-            try:
-                panel = self.children[i]
-                if panel.hidden() and panel.text_label.text:
-                    # schedule panel reveal
-                    Clock.schedule_once(
-                        panel.show_letter,
-                        values.interval_solve_reveal * matches)
-                    matches += 1
-            except AttributeError:
-                # empty widget
-                pass
+        # finish any letter checks first
+        self.fast_forward_reveals()
+
+        # in order from top to bottom, left to right
+        hidden_letters = self.board.hidden_letters(
+            self.board.order_left_to_right)
+        for matches, i in enumerate(hidden_letters):
+            self.animator.reveal(
+                self.panels[i], values.interval_solve_reveal * matches)
 
     def save_puzzle(self):
         """
@@ -278,16 +448,11 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
         :return: None
         """
 
-        puzzle = ''
-        for widget in self.children[::-1]:
-            try:
-                letter = widget.text_label.text
-                puzzle += letter if letter else ' '
-            except AttributeError:
-                # empty widget
-                pass
+        import prompts
+
         prompt = prompts.SavePuzzlePrompt(
-            puzzle, on_dismiss=lambda instance: self.get_keyboard())
+            self.board.puzzle_string(),
+            on_dismiss=lambda instance: self.get_keyboard())
         prompt.open()
 
     def choose_puzzle(self):
@@ -298,6 +463,8 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
         :return: None
         """
 
+        import prompts
+
         prompts.LoadPuzzlePrompt(self.selected_puzzles).open()
 
     def selected_puzzles(self, puzzles):
@@ -315,6 +482,23 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
 
         self.load_puzzle(puzzles[0])
 
+    def load_game(self, compiled_puzzles):
+        """
+        Keep the compiled puzzles of a game, to be used by
+        :meth:`load_puzzle`. Puzzles compiled for a puzzleboard of a
+        different size are ignored.
+
+        :param compiled_puzzles: A dict of {puzzle string: compiled
+                                 puzzle}
+        :type compiled_puzzles: dict
+        :return: None
+        """
+
+        self.compiled_puzzles = {
+            puzzle_string: compiled
+            for puzzle_string, compiled in compiled_puzzles.items()
+            if len(compiled.letters) == len(self.board)}
+
     def load_puzzle(self, puzzle):
         """
         Load a puzzle into the puzzleboard.
@@ -327,8 +511,7 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
         :return: None
         """
 
-        self.tossup_running = False
-        puzzle_string = list(puzzle['puzzle'])
+        self.tossup.stop()
 
         if self.category_label:
             self.category_label.text = puzzle['category'].upper()
@@ -336,124 +519,102 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
         if self.queue_out:
             self.queue_out.put(('puzzle_loaded', puzzle))
 
+        # stop revealing the previous puzzle
+        self.cancel_reveals()
+
         # set letters
-        for widget in self.children[::-1]:
-            try:
-                widget.text_label.color = [0, 0, 0, 0]
-                widget.text_label.text = puzzle_string[0].strip()
-                widget.green()
-                puzzle_string.pop(0)
-            except AttributeError:
-                # empty widget
-                pass
+        compiled = self.compiled_puzzles.get(puzzle['puzzle'])
+        if compiled is not None:
+            self.board.load_compiled(compiled)
+            letter_panels = compiled.load_order
+        else:
+            self.board.load(puzzle['puzzle'])
+            # in order from top to bottom, left to right
+            letter_panels = [
+                i for i in self.board.order_left_to_right
+                if self.board.letters[i]]
+        for panel in self.panels:
+            panel.render()
 
         # turn letter panels white
-        # indices in order from top to bottom, left to right
-        indices = [
-                      i + (j * self.cols)
-                      for i in range(self.cols)
-                      for j in range(self.rows)
-                  ][::-1]
-        # the number of non-space characters encountered,
+        load = timeline.Timeline()
+        # the number of non-space characters encountered is
         # used to offset the scheduled time to change the panel
-        letters = 0
-        for i in indices:
-            try:
-                panel = self.children[i]
-                if panel.text_label.text:
-                    # schedule panel to turn white
-                    Clock.schedule_once(
-                        panel.hide,
-                        values.interval_load * letters)
-                    letters += 1
-            except AttributeError:
-                # empty widget
-                pass
+        for letters, i in enumerate(letter_panels):
+            # schedule panel to turn white
+            load.add(values.interval_load * letters, self.panels[i].hide)
+        self.timelines.append(load)
+        load.start()
         self.get_keyboard()
 
-    def start_tossup(self):
+    def start_tossup(self, seed=None):
         """
         Start a tossup by revealing the bottom-rightmost letter, then
-        revealing random letters.
+        revealing random letters. See :class:`tossup.TossupEngine` for
+        the timing of the reveals.
+
+        The order of the random letters is chosen now. If `seed` is
+        given, the same puzzle and seed always give the same order, so
+        that a toss-up can be replayed.
 
+        :param seed: A seed for the order of the letters, or None to use
+                     `random`, defaults to None
+        :type seed: int, optional
         :return: None
         """
 
-        self.tossup_running = True
+        self.tossup_random = (
+            self.random if seed is None else random.Random(seed))
+        self.tossup.start()
 
-        # indices in order from bottom to top, right to left
-        indices = [
-                      i + (j * self.cols)
-                      for i in range(self.cols - 1, -1, -1)
-                      for j in range(self.rows - 1, -1, -1)
-                  ][::-1]
+    def tossup_reveal(self, number):
+        """
+        Reveal a letter of the toss-up, and choose the next one.
+        The first letter is the bottom-rightmost; the rest are random.
 
-        # look for the bottom-rightmost letter
-        for i in indices:
-            try:
-                panel = self.children[i]
-                if panel.text_label.text:
-                    # letter found, reveal
-                    panel.show_letter()
-                    break
-            except AttributeError:
-                # empty widget
-                pass
-
-        next_letter = self.get_random_letter()
-        if next_letter:
-            # schedule to start revealing letters
-            Clock.schedule_once(
-                lambda i: self.tossup_random_letter(next_letter),
-                values.interval_tossup)
+        :param number: The number of the reveal, starting at 0
+        :type number: int
+        :return: True if there are more letters to reveal, otherwise
+                 False
+        :rtype: bool
+        """
+
+        if number == 0:
+            order = self.board.tossup_order(self.tossup_random)
+            if order:
+                self.panels[order[0]].show_letter()
+            # taken from the end by get_random_letter
+            self.tossup_order = order[:0:-1]
         else:
-            # no more letters on board, end tossup
-            self.queue_out.put(('tossup_timeout', None))
-            self.tossup_running = False
+            self.tossup_next.show_letter()
 
-    def get_random_letter(self):
+        self.tossup_next = self.get_random_letter()
+        return self.tossup_next is not None
+
+    def tossup_finished(self):
         """
-        Randomly select a Panel containing hidden text. If none are
-        found, return None.
+        Tell the manager that the toss-up has run out of letters.
 
-        :return: A randomly selected Panel
-        :rtype: Panel
+        :return: None
         """
 
-        shuffled_children = random.sample(
-            self.children, len(self.children))
-        for child in shuffled_children:
-            try:
-                if child.hidden() and child.text_label.text:
-                    return child
-            except AttributeError:
-                # empty widget
-                pass
-        return None
+        self.queue_out.put(('tossup_timeout', None))
 
-    def tossup_random_letter(self, letter):
+    def get_random_letter(self):
         """
-        Reveal a random letter, then schedule this method to run again.
-        Do nothing if the tossup has stopped.
+        Take the next Panel containing hidden text from the order chosen
+        when the toss-up started. Panels revealed since then are
+        skipped. If none are left, return None.
 
-        :param letter: A Panel containing a hidden letter
-        :type letter: Panel
-        :return: None
+        :return: A randomly selected Panel
+        :rtype: Panel
         """
 
-        if self.tossup_running:
-            # show the letter, choose another
-            letter.show_letter()
-            letter = self.get_random_letter()
-
-        if letter:
-            Clock.schedule_once(
-                lambda i: self.tossup_random_letter(letter),
-                values.interval_tossup)
-        else:
-            # no more letters, end tossup
-            self.queue_out.put(('tossup_timeout', None))
-            self.tossup_running = False
+        while self.tossup_order:
+            i = self.tossup_order.pop()
+            if self.board.is_hidden_letter(i):
+                return self.panels[i]
+        return None
 
     def _on_keyboard_down(self, _keyboard, keycode, _text, modifiers):
         """
@@ -489,11 +650,74 @@ class PuzzleLayout(GridLayout, KeyboardBindable):
 
 
 class Panel(Button, KeyboardBindable):
-    """A single panel that may contain a letter."""
+    """
+    A single panel that may contain a letter. The letter and state of
+    the panel are kept in a :class:`board_state.BoardState`, and this
+    widget draws them.
+    """
 
     blue_state = BooleanProperty(False)
     white_state = BooleanProperty(False)
 
+    def __init__(self, board, index, animator, **kwargs):
+        """
+        Create the panel.
+
+        :param board: The state of the puzzleboard
+        :type board: board_state.BoardState
+        :param index: The number of this panel on the board
+        :type index: int
+        :param animator: The animator which fades in revealed letters
+        :type animator: RevealAnimator
+        :param kwargs: Additional keyword arguments for the panel
+        """
+
+        super(Panel, self).__init__(**kwargs)
+        self.board = board
+        self.index = index
+        self.animator = animator
+
+    def render(self):
+        """
+        Draw this panel's letter and color from the board, and hide the
+        letter if it is hidden on the board.
+
+        :return: None
+        """
+
+        color = self.board.colors[self.index]
+        self.blue_state = color == board_state.BLUE
+        self.white_state = color == board_state.WHITE
+        self.text_label.text = self.board.letters[self.index]
+        if self.board.hidden[self.index]:
+            self.text_label.color = [0, 0, 0, 0]
+
+    def set_color(self, color):
+        """
+        Change this panel's color.
+
+        :param color: One of :data:`board_state.GREEN`,
+                      :data:`board_state.WHITE`, or
+                      :data:`board_state.BLUE`
+        :type color: int
+        :return: None
+        """
+
+        self.board.set_color(self.index, color)
+        self.render()
+
+    def set_letter(self, letter):
+        """
+        Change this panel's letter.
+
+        :param letter: A single-character string, or an empty string
+        :type letter: str
+        :return: None
+        """
+
+        self.board.set_letter(self.index, letter)
+        self.render()
+
     def blue(self, _dt=None):
         """
         Turn this panel blue.
@@ -504,8 +728,7 @@ class Panel(Button, KeyboardBindable):
         :return: None
         """
 
-        self.blue_state = True
-        self.white_state = False
+        self.set_color(board_state.BLUE)
 
     def white(self):
         """
@@ -514,8 +737,7 @@ class Panel(Button, KeyboardBindable):
         :return: None
         """
 
-        self.white_state = True
-        self.blue_state = False
+        self.set_color(board_state.WHITE)
 
     def green(self):
         """
@@ -524,8 +746,7 @@ class Panel(Button, KeyboardBindable):
         :return: None
         """
 
-        self.blue_state = False
-        self.white_state = False
+        self.set_color(board_state.GREEN)
 
     def show_letter(self, _dt=None):
         """
@@ -537,12 +758,18 @@ class Panel(Button, KeyboardBindable):
         :return: None
         """
 
-        self.white()
-        opacity = self.text_label.color[3] + values.opacity_adjustment
-        if opacity <= 1:
-            self.text_label.color = [0, 0, 0, opacity]
-        if opacity < 1:
-            Clock.schedule_once(self.show_letter, values.opacity_interval)
+        self.animator.reveal(self)
+
+    def mark_revealed(self):
+        """
+        Reveal the letter on the board and turn this panel white,
+        without changing the opacity of the letter.
+
+        :return: None
+        """
+
+        self.board.reveal(self.index)
+        self.render()
 
     def hide(self, _dt=None):
         """
@@ -554,17 +781,13 @@ class Panel(Button, KeyboardBindable):
         :return: None
         """
 
-        text = self.text_label.text.lower()
-        if text:
-            if text not in strings.alphabet:
-                # don't hide punctuation
-                self.show_letter()
-                return
-            self.white()
+        self.board.hide(self.index)
+        if self.board.hidden[self.index]:
+            self.animator.stop(self)
+            self.render()
         else:
-            # turn panel green if there's no letter
-            self.green()
-        self.text_label.color = [0, 0, 0, 0]
+            # punctuation is not hidden
+            self.show_letter()
 
     def hidden(self):
         """
@@ -574,7 +797,7 @@ class Panel(Button, KeyboardBindable):
         :rtype: bool
         """
 
-        return self.text_label.color == [0, 0, 0, 0]
+        return bool(self.board.hidden[self.index])
 
     def check_letter(self, letter):
         """
@@ -586,7 +809,7 @@ class Panel(Button, KeyboardBindable):
         :rtype: bool
         """
 
-        return self.text_label.text.lower() == letter.lower()
+        return self.board.letters[self.index].lower() == letter.lower()
 
     def click(self):
         """
@@ -597,14 +820,10 @@ class Panel(Button, KeyboardBindable):
         :return: None
         """
 
-        # turn widgets green if they don't have text
-        for widget in self.parent.children:
-            try:
-                if not widget.text_label.text:
-                    widget.hide()
-            except AttributeError:
-                # empty widget
-                pass
+        # turn panels green if they don't have text
+        for panel in self.parent.panels:
+            if not self.board.letters[panel.index]:
+                panel.hide()
         self.show_letter()
         self.get_keyboard()
 
@@ -622,7 +841,7 @@ class Panel(Button, KeyboardBindable):
 
         # don't set text if spacebar is pressed
         if text.strip():
-            self.text_label.text = text.upper()
+            self.set_letter(text.upper())
         self.select_next()
 
     def _on_keyboard_down(self, _keyboard, keycode, _text, modifiers):
@@ -657,7 +876,7 @@ class Panel(Button, KeyboardBindable):
                 return False
         elif keycode[0] == 8:  # backspace
             # remove this panel's text, select previous panel
-            self.text_label.text = ''
+            self.set_letter('')
             self.select_prev()
         elif keycode[0] == 13:  # enter
             # entry finished, hide all letters
@@ -705,7 +924,7 @@ class Panel(Button, KeyboardBindable):
         while i < len(children):
             try:
                 children[i].click()
-                children[i].text_label.text = ''
+                children[i].set_letter('')
                 break
             except AttributeError:
                 # empty panel
@@ -722,9 +941,5 @@ class Panel(Button, KeyboardBindable):
         :return: None
         """
 
-        for panel in self.parent.children:
-            try:
-                panel.hide()
-            except AttributeError:
-                # empty widget
-                pass
+        for panel in self.parent.panels:
+            panel.hide()
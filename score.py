@@ -1,5 +1,3 @@
-import queue
-
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.lang import Builder
@@ -7,6 +5,7 @@ from kivy.properties import (
     BooleanProperty, ListProperty, NumericProperty, StringProperty)
 from kivy.uix.relativelayout import RelativeLayout
 
+import messaging
 import values
 from my_widgets import Fullscreenable
 
@@ -21,16 +20,32 @@ class ScoreLayout(RelativeLayout, Fullscreenable):
     total = NumericProperty(0)
     flash_visible = BooleanProperty(False)
 
-    def __init__(self, bg_color=values.color_red, q=None, **kwargs):
+    def __init__(self, bg_color=values.color_red, q=None, game_state=None,
+                 color=None, queue_budget=None, **kwargs):
         """
         Create the layout.
 
+        If `game_state` is given, the name, score, total, and flashing of
+        the player `color` are displayed from it, and again whenever it
+        changes.
+
         :param bg_color: Background color as a tuple of rgba values
                          between 0 and 1, defaults to `values.color_red`
         :type bg_color: tuple, optional
         :param q: Queue to communicate with the manager app, defaults to
                   None
         :type q: multiprocessing.Queue, optional
+        :param game_state: The state of the game shared with the
+                           manager app, defaults to None
+        :type game_state: game_state.GameState, optional
+        :param color: The player's color, one of `game_state.colors`,
+                      defaults to None
+        :type color: str, optional
+        :param queue_budget: The limits on the commands handled from
+                             the queue in each frame, see
+                             :class:`messaging.QueueListener`, defaults
+                             to None
+        :type queue_budget: tuple, optional
         :param kwargs: Additional keyword arguments for the layout
         """
 
@@ -40,11 +55,37 @@ class ScoreLayout(RelativeLayout, Fullscreenable):
         self.bg_color = bg_color
         self.queue = q
         if self.queue:
-            Clock.schedule_once(self.check_queue, values.queue_start)
+            self.listener = messaging.QueueListener(
+                self.queue, self.handle_command, queue_budget)
+            Clock.schedule_once(self.listener.start, values.queue_start)
+
+        self.game_state = game_state
+        self.color = color
+        if self.game_state:
+            self.state_listener = messaging.StateListener(
+                self.game_state, self.show_game_state)
+            Clock.schedule_once(self.state_listener.start)
+
+    def show_game_state(self, _counter, players, _letters):
+        """
+        Display the player's values from `game_state`.
+        See :meth:`game_state.GameState.read`.
+
+        :param _counter: The sequence counter of the values
+        :type _counter: int
+        :param players: A dict of {color: (score, total, name, flashing)}
+        :type players: dict
+        :param _letters: The unavailable letters
+        :type _letters: list
+        :return: None
+        """
+
+        self.score, self.total, self.name, flashing = players[self.color]
+        self.set_flashing(flashing)
 
-    def check_queue(self, _dt):
+    def handle_command(self, command, args):
         """
-        Check the queue for incoming commands to execute.
+        Execute a command received from the queue.
 
         Each command in the queue should be a tuple of the form:
 
@@ -52,49 +93,35 @@ class ScoreLayout(RelativeLayout, Fullscreenable):
 
         Available commands are:
 
-        'name':
-            Set the player's name to *args*.
-            *args* is a string.
-        'score':
-            Set the player's score to *args*.
-            *args* is an integer.
-        'total':
-            Set the player's game total to *args*.
-            *args* is an integer.
-        'flash':
-            Make the layout start flashing to indicate that it is the
-            player's turn.
-            *args* is ignored.
-        'stop_flash':
-            Make the layout stop flashing.
-            *args* is ignored.
         'exit':
             Close the running app.
             *args* is ignored.
 
-        :param _dt: The time elapsed between scheduling and calling
-        :type _dt: float
+        :param command: The name of the command
+        :type command: str
+        :param args: The arguments of the command
+        :type args: object
         :return: None
         """
 
-        try:
-            command, args = self.queue.get(block=False)
-            if command == 'name':
-                self.name = args
-            elif command == 'score':
-                self.score = args
-            elif command == 'total':
-                self.total = args
-            elif command == 'flash':
-                self.flash()
-            elif command == 'stop_flash':
-                self.flash_visible = False
-                self.flashing = False
-            elif command == 'exit':
-                App.get_running_app().stop()
-        except queue.Empty:
-            pass
-        Clock.schedule_once(self.check_queue, values.queue_interval)
+        if command == 'exit':
+            App.get_running_app().stop()
+
+    def set_flashing(self, flashing):
+        """
+        Start or stop the flashing effect, if it is not already started
+        or stopped.
+
+        :param flashing: Whether the layout should be flashing
+        :type flashing: bool
+        :return: None
+        """
+
+        if flashing and not self.flashing:
+            self.flash()
+        elif not flashing:
+            self.flash_visible = False
+            self.flashing = False
 
     def flash(self):
         """
@@ -0,0 +1,861 @@
+import argparse
+import collections
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import board_state
+import game_engine
+import puzzle_import
+import strings
+import values
+
+# wedges of the wheel which are not cash values
+wedge_bankrupt = 'bankrupt'
+wedge_lose_turn = 'lose_turn'
+
+# the puzzles drawn from by the games of a worker process, set by
+# _init_worker so that they are only sent to each process once
+_worker_puzzles = None
+
+
+class Bot(object):
+    """
+    The strategy of a simulated player.
+
+    A bot tries to solve the puzzle once at least `solve_at` of its
+    letters are showing, and solves it correctly with a chance of the
+    fraction showing plus `skill`. When it can afford a vowel, it buys
+    one with a chance of `vowel_chance`. Letters are called in the order
+    of `values.simulator_letter_order`, or at random if `random_letters`
+    is True.
+    """
+
+    def __init__(self, solve_at, vowel_chance, skill, random_letters=False):
+        """
+        Create the strategy.
+
+        :param solve_at: The fraction of letters which must be showing
+                         before trying to solve
+        :type solve_at: float
+        :param vowel_chance: The chance of buying a vowel when it can be
+                             afforded
+        :type vowel_chance: float
+        :param skill: The chance of solving correctly when no letters
+                      are showing
+        :type skill: float
+        :param random_letters: True to call letters at random, defaults
+                               to False
+        :type random_letters: bool, optional
+        """
+
+        self.solve_at = solve_at
+        self.vowel_chance = vowel_chance
+        self.skill = skill
+        self.random_letters = random_letters
+
+    def choose_letter(self, letters, rng):
+        """
+        Choose a letter to call.
+
+        :param letters: The letters which can be called, in the order of
+                        `values.simulator_letter_order`
+        :type letters: list
+        :param rng: The random number generator of the game
+        :type rng: random.Random
+        :return: A single-character string
+        :rtype: str
+        """
+
+        return rng.choice(letters) if self.random_letters else letters[0]
+
+    def solves(self, showing, rng):
+        """
+        Decide whether an attempt to solve the puzzle is correct.
+
+        :param showing: The fraction of letters which are showing
+        :type showing: float
+        :param rng: The random number generator of the game
+        :type rng: random.Random
+        :return: True if the puzzle is solved, otherwise False
+        :rtype: bool
+        """
+
+        return rng.random() < showing + self.skill
+
+
+# {name: strategy} of the bots which can play simulated games
+bots = collections.OrderedDict([
+    ('cautious', Bot(solve_at=0.8, vowel_chance=0.2, skill=0.1)),
+    ('balanced', Bot(solve_at=0.6, vowel_chance=0.5, skill=0.2)),
+    ('aggressive', Bot(solve_at=0.4, vowel_chance=0.8, skill=0.3)),
+    ('random', Bot(
+        solve_at=0.6, vowel_chance=0.5, skill=0.2, random_letters=True)),
+])
+
+
+class Rules(object):
+    """
+    The settings of simulated games, which are the same as the settings
+    of the manager, and the wedges of the wheel.
+    """
+
+    def __init__(self, settings, wedges=None):
+        """
+        Read the rules from a settings dict, using the same defaults as
+        the manager for missing settings.
+
+        :param settings: A settings dict, see
+                         :func:`data_caching.get_variables`
+        :type settings: dict
+        :param wedges: The wedges of the wheel, each a cash value,
+                       `wedge_bankrupt`, or `wedge_lose_turn`, defaults to
+                       None to use the cash values in `settings`
+        :type wedges: list, optional
+        """
+
+        self.vowel_price = self._to_int(
+            settings.get('vowel_price'), values.default_vowel_price)
+        self.min_win = self._to_int(
+            settings.get('min_win'), values.default_min_win)
+        self.clue_solve_reward = self._to_int(
+            settings.get('clue_solve_reward'),
+            values.default_clue_solve_reward)
+        self.final_spin_bonus = self._to_int(
+            settings.get('final_spin_bonus'),
+            values.default_final_spin_bonus)
+        self.game_order = list(
+            settings.get('game_order', values.default_game_order))
+        self.game_rewards = [
+            self._to_int(reward, 0) for reward in
+            settings.get('game_rewards', values.default_game_rewards)]
+
+        if wedges is None:
+            wedges = (
+                list(settings.get('cash_values', []))
+                or values.simulator_cash_values
+            ) + values.simulator_special_wedges
+        self.wedges = wedges
+        self.cash_values = [
+            wedge for wedge in wedges if isinstance(wedge, int)]
+
+    @staticmethod
+    def _to_int(setting, default):
+        """
+        Convert a setting to an int.
+
+        :param setting: The value of the setting, or None if it is not
+                        set
+        :type setting: object
+        :param default: The value if the setting is missing or invalid
+        :type default: int
+        :return: The value of the setting
+        :rtype: int
+        """
+
+        try:
+            return int(setting)
+        except (ValueError, TypeError):
+            return default
+
+
+def parse_wedges(text):
+    """
+    Parse the wedges of the wheel given on the command line.
+
+    :param text: Comma-separated wedges, each a cash value,
+                 `wedge_bankrupt`, or `wedge_lose_turn`
+    :type text: str
+    :return: A list of ints and strings
+    :rtype: list
+    """
+
+    wedges = []
+    for wedge in text.split(','):
+        wedge = wedge.strip().lower()
+        if wedge in (wedge_bankrupt, wedge_lose_turn):
+            wedges.append(wedge)
+        else:
+            wedges.append(int(wedge))
+    if not any(isinstance(wedge, int) for wedge in wedges):
+        raise ValueError(text)
+    return wedges
+
+
+class GameSimulation(object):
+    """
+    Plays one game between three bots, using a
+    :class:`game_engine.GameEngine` for the rules and a
+    :class:`board_state.BoardState` in place of the puzzleboard.
+
+    The engine's commands to the puzzleboard are answered the way the
+    puzzleboard answers them, through a queue which is emptied after
+    each action, as if every reveal were instant. Replies which only
+    play a sound are left out.
+
+    Mystery and express rounds are played like standard rounds, and the
+    final spin starts with the first speed-up round, so the rest of the
+    speed-up rounds are skipped. Ties before the bonus round are broken
+    by choosing one of the tied players at random.
+    """
+
+    def __init__(self, rules, puzzles, players, rng):
+        """
+        Create the game.
+
+        :param rules: The rules of the game
+        :type rules: Rules
+        :param puzzles: The puzzle dicts to draw the puzzles from
+        :type puzzles: list
+        :param players: The strategy of each player
+        :type players: list
+        :param rng: The random number generator of the game
+        :type rng: random.Random
+        """
+
+        self.rules = rules
+        self.puzzles = puzzles
+        self.players = players
+        self.rng = rng
+
+        self.engine = game_engine.GameEngine(
+            rules.vowel_price, rules.min_win, rules.clue_solve_reward)
+        self.engine.subscribe(self.handle_event)
+        self.board = board_state.BoardState(*values.puzzleboard_size)
+        # the number of letters in the puzzle, and how many are hidden
+        self.letter_count = 0
+        self.hidden_count = 0
+        # commands from the puzzleboard, not handled yet
+        self.replies = collections.deque()
+        # players tied before the bonus round
+        self.tie = None
+
+    def handle_event(self, event, args):
+        """
+        Handle an event of the game engine.
+
+        :param event: The name of the event
+        :type event: str
+        :param args: The arguments of the event
+        :type args: object
+        :return: None
+        """
+
+        if event == 'puzzleboard':
+            self.puzzleboard_command(*args)
+        elif event == 'tie':
+            self.tie = args
+
+    def puzzleboard_command(self, command, args):
+        """
+        Carry out a command to the puzzleboard on `board`, and queue the
+        puzzleboard's replies.
+
+        :param command: The name of the command
+        :type command: str
+        :param args: The arguments of the command
+        :type args: object
+        :return: None
+        """
+
+        if command == 'load':
+            self.replies.append(('puzzle_loaded', args))
+            self.board.load(args['puzzle'])
+            for i in range(len(self.board)):
+                if self.board.letters[i]:
+                    self.board.hide(i)
+            self.letter_count = len(self.board.hidden_letters())
+            self.hidden_count = self.letter_count
+        elif command in ('letter', 'bonus_round_letters'):
+            letters = [
+                letter for letter in args
+                if letter.lower() in strings.alphabet]
+            matches = self.board.matches(
+                letters, self.board.rank_right_to_left)
+            for i in matches:
+                self.reveal(i)
+            if command == 'letter':
+                remaining_letters = self.board.remaining_letters(letters)
+                self.replies.append(('matches', (args, len(matches))))
+                if matches and not any(
+                        letter in strings.vowels
+                        for letter in remaining_letters):
+                    self.replies.append(('no_more_vowels', None))
+                if matches and not any(
+                        letter in strings.consonants
+                        for letter in remaining_letters):
+                    self.replies.append(('no_more_consonants', None))
+        elif command == 'reveal':
+            for i in self.board.hidden_letters():
+                self.reveal(i)
+
+    def reveal(self, index):
+        """
+        Reveal a hidden letter on `board`.
+
+        :param index: The number of the panel
+        :type index: int
+        :return: None
+        """
+
+        self.board.reveal(index)
+        self.hidden_count -= 1
+
+    def flush(self):
+        """
+        Pass every queued reply of the puzzleboard to the game engine,
+        as :meth:`manager.ManagerLayout.handle_command` does.
+
+        :return: None
+        """
+
+        engine = self.engine
+        while self.replies:
+            command, args = self.replies.popleft()
+            if command == 'puzzle_loaded':
+                engine.puzzle_loaded(args)
+            elif command == 'matches':
+                engine.correct_letter(args)
+            elif command == 'tossup_timeout':
+                engine.tossup_timeout()
+            elif command == 'no_more_consonants':
+                engine.consonants_exhausted()
+            elif command == 'no_more_vowels':
+                engine.no_more_vowels()
+
+    def showing(self):
+        """
+        Get the fraction of the puzzle's letters which are showing.
+
+        :return: A number from 0 to 1
+        :rtype: float
+        """
+
+        if not self.letter_count:
+            return 1
+        return 1 - self.hidden_count / self.letter_count
+
+    def callable_letters(self, letters):
+        """
+        Get the letters which have not been called or ruled out this
+        round.
+
+        :param letters: The letters to choose from
+        :type letters: str
+        :return: The letters in the order of
+                 `values.simulator_letter_order`
+        :rtype: list
+        """
+
+        unavailable = self.engine.unavailable_letters
+        return [
+            letter for letter in values.simulator_letter_order
+            if letter in letters and letter not in unavailable]
+
+    def make_game(self):
+        """
+        Build a game list of random puzzles, in the order of the rules.
+        See :func:`data_caching.export_game` for a description of game
+        lists.
+
+        :return: A game list
+        :rtype: list
+        """
+
+        return [
+            {'round_type': round_type, 'round_reward': reward,
+             'puzzle': self.rng.choice(self.puzzles)}
+            for round_type, reward in zip(
+                self.rules.game_order, self.rules.game_rewards)]
+
+    def play(self):
+        """
+        Play a whole game.
+
+        :return: A tuple of a list of (round number, round type, payout)
+                 tuples, one for each round played, and the number of
+                 the player who reached the bonus round, or 0 if there
+                 was no bonus round
+        :rtype: tuple
+        """
+
+        engine = self.engine
+        game = self.make_game()
+        engine.load_game(game)
+        self.flush()
+
+        payouts = []
+        bonus_player = 0
+        while engine.game:
+            number = len(game) - len(engine.game) + 1
+            round_type = engine.round_type
+            if round_type == strings.round_type_bonus:
+                bonus_player = engine.selected_player
+            before = sum(engine.totals)
+            self.play_round(round_type)
+            payouts.append((number, round_type, sum(engine.totals) - before))
+
+            if len(engine.game) <= 1:
+                break
+            engine.next_puzzle()
+            self.flush()
+            if self.tie:
+                engine.winner_chosen(self.rng.choice(self.tie))
+                self.tie = None
+                self.flush()
+        return payouts, bonus_player
+
+    def play_round(self, round_type):
+        """
+        Play the current round until the puzzle is revealed.
+
+        :param round_type: The type of the round
+        :type round_type: str
+        :return: None
+        """
+
+        if round_type in game_engine.tossup_round_types:
+            self.play_tossup()
+        elif round_type == strings.round_type_bonus:
+            self.play_bonus_round()
+        elif round_type == strings.round_type_speedup:
+            self.play_speedup()
+        else:
+            self.play_standard()
+
+    def play_tossup(self):
+        """
+        Reveal the letters of a toss-up one at a time. After each one,
+        a player who is ready to solve may ring in.
+
+        :return: None
+        """
+
+        engine = self.engine
+        rng = self.rng
+        engine.tossup()
+        order = self.board.hidden_letters()
+        rng.shuffle(order)
+        for i in order:
+            self.reveal(i)
+            showing = self.showing()
+            ready = [
+                player for player in range(1, game_engine.players + 1)
+                if player not in engine.tossup_players_done
+                and showing >= self.players[player - 1].solve_at]
+            if not ready:
+                continue
+            # ringing in selects the player, which pauses the toss-up
+            player = rng.choice(ready)
+            engine.select_player(player)
+            self.flush()
+            if self.players[player - 1].solves(showing, rng):
+                engine.reveal_puzzle()
+                self.flush()
+                return
+            engine.tossup()
+            self.flush()
+
+        self.replies.append(('tossup_timeout', None))
+        self.flush()
+        engine.reveal_puzzle(False)
+        self.flush()
+
+    def play_standard(self):
+        """
+        Play turns until a player solves the puzzle, then bank their
+        score.
+
+        :return: None
+        """
+
+        engine = self.engine
+        if not engine.selected_player:
+            engine.select_player(1)
+        while not engine.revealed:
+            if not self.play_turn(self.players[engine.selected_player - 1]):
+                engine.lose_turn()
+            self.flush()
+        engine.bank_score()
+
+    def play_turn(self, bot):
+        """
+        Take one action for the selected player: solve, buy a vowel, or
+        spin the wheel and call a consonant.
+
+        :param bot: The strategy of the selected player
+        :type bot: Bot
+        :return: True if the player keeps their turn, otherwise False
+        :rtype: bool
+        """
+
+        engine = self.engine
+        rng = self.rng
+        showing = self.showing()
+        consonants = self.callable_letters(strings.consonants)
+        vowels = self.callable_letters(strings.vowels)
+
+        if showing >= bot.solve_at or not (consonants or vowels):
+            return self.try_to_solve(bot, showing)
+
+        if (
+                vowels and engine.get_score() >= engine.vowel_price
+                and (not consonants or rng.random() < bot.vowel_chance)):
+            engine.buy_vowel()
+            engine.guessed_letter(bot.choose_letter(vowels, rng))
+            self.flush()
+            keep_turn = bool(engine.matches)
+            engine.reset_matches()
+            return keep_turn
+        if not consonants:
+            return self.try_to_solve(bot, showing)
+
+        wedge = rng.choice(self.rules.wedges)
+        if wedge == wedge_bankrupt:
+            engine.bankrupt()
+            return False
+        if wedge == wedge_lose_turn:
+            return False
+        engine.guessed_letter(bot.choose_letter(consonants, rng))
+        self.flush()
+        keep_turn = bool(engine.matches)
+        engine.increase_score(wedge)
+        engine.reset_matches()
+        return keep_turn
+
+    def try_to_solve(self, bot, showing):
+        """
+        Have the selected player try to solve the puzzle, and reveal it
+        if they do.
+
+        :param bot: The strategy of the selected player
+        :type bot: Bot
+        :param showing: The fraction of letters which are showing
+        :type showing: float
+        :return: True if the puzzle was solved, otherwise False
+        :rtype: bool
+        """
+
+        if bot.solves(showing, self.rng):
+            self.engine.reveal_puzzle()
+            self.flush()
+            return True
+        return False
+
+    def play_speedup(self):
+        """
+        Play the final spin: the wheel is spun once, and the players take
+        turns calling one letter and trying to solve. Consonants are
+        worth the value spun plus the final spin bonus.
+
+        :return: None
+        """
+
+        engine = self.engine
+        rng = self.rng
+        value = rng.choice(self.rules.cash_values) + self.rules.final_spin_bonus
+        engine.set_final_spin_started(True)
+        if not engine.selected_player:
+            engine.select_player(1)
+        while not engine.revealed:
+            bot = self.players[engine.selected_player - 1]
+            consonants = self.callable_letters(strings.consonants)
+            letters = consonants or self.callable_letters(strings.vowels)
+            if letters:
+                engine.guessed_letter(bot.choose_letter(letters, rng))
+                self.flush()
+                if consonants:
+                    engine.increase_score(value)
+                engine.reset_matches()
+            if not self.try_to_solve(bot, self.showing()):
+                engine.lose_turn()
+                self.flush()
+        engine.bank_score()
+
+    def play_bonus_round(self):
+        """
+        Give the selected player R, S, T, L, N, and E, then three more
+        consonants and a vowel of their choice, and one try to solve.
+
+        :return: None
+        """
+
+        engine = self.engine
+        rng = self.rng
+        bot = self.players[engine.selected_player - 1]
+        engine.bonus_round_letters(list(strings.bonus_round_letters.lower()))
+        self.flush()
+        chosen = []
+        for letters, count in ((strings.consonants, 3), (strings.vowels, 1)):
+            for _ in range(count):
+                choices = [
+                    letter for letter in self.callable_letters(letters)
+                    if letter not in chosen]
+                if choices:
+                    chosen.append(bot.choose_letter(choices, rng))
+        engine.bonus_round_letters(chosen)
+        self.flush()
+        engine.reveal_puzzle(bot.solves(self.showing(), rng))
+        self.flush()
+
+
+def _init_worker(puzzles):
+    """
+    Keep the puzzles for the games played by this worker process.
+
+    :param puzzles: A list of puzzle dicts
+    :type puzzles: list
+    :return: None
+    """
+
+    global _worker_puzzles
+
+    _worker_puzzles = puzzles
+
+
+def simulate_games(rules, bot_names, count, seed, puzzles=None):
+    """
+    Play a number of games, and count the payouts of each round.
+
+    :param rules: The rules of the games
+    :type rules: Rules
+    :param bot_names: The names in `bots` of the players' strategies
+    :type bot_names: list
+    :param count: The number of games
+    :type count: int
+    :param seed: The seed of the random number generator
+    :type seed: int
+    :param puzzles: The puzzle dicts to draw from, defaults to None to
+                    use the puzzles given to this worker process
+    :type puzzles: list, optional
+    :return: A dict of {(round number, round type): Counter of payouts},
+             a Counter of the payouts of whole games, and a Counter of
+             the players who reached the bonus round
+    :rtype: tuple
+    """
+
+    rng = random.Random(seed)
+    players = [bots[name] for name in bot_names]
+    puzzles = _worker_puzzles if puzzles is None else puzzles
+    round_payouts = collections.defaultdict(collections.Counter)
+    game_payouts = collections.Counter()
+    bonus_players = collections.Counter()
+    for _ in range(count):
+        payouts, bonus_player = GameSimulation(
+            rules, puzzles, players, rng).play()
+        for number, round_type, payout in payouts:
+            round_payouts[(number, round_type)][payout] += 1
+        game_payouts[sum(payout for _, _, payout in payouts)] += 1
+        bonus_players[bonus_player] += 1
+    return dict(round_payouts), game_payouts, bonus_players
+
+
+def run_simulation(rules, puzzles, bot_names, games, processes=None,
+                   seed=None):
+    """
+    Play `games` games, split between a pool of worker processes.
+
+    :param rules: The rules of the games
+    :type rules: Rules
+    :param puzzles: The puzzle dicts to draw from
+    :type puzzles: list
+    :param bot_names: The names in `bots` of the players' strategies
+    :type bot_names: list
+    :param games: The number of games
+    :type games: int
+    :param processes: The number of worker processes, defaults to None
+                      to use one per CPU
+    :type processes: int, optional
+    :param seed: The seed of the random number generator, defaults to
+                 None for a different simulation each time
+    :type seed: int, optional
+    :return: The results, as returned by :func:`simulate_games`
+    :rtype: tuple
+    """
+
+    processes = processes or os.cpu_count() or 1
+    rng = random.Random(seed)
+    # batches of a fixed size, so that the same seed plays the same games
+    # with any number of processes, and there are enough batches that a
+    # slow batch does not leave the other processes idle at the end
+    counts = [values.simulator_batch_size] * (
+        games // values.simulator_batch_size)
+    if games % values.simulator_batch_size or not counts:
+        counts.append(games % values.simulator_batch_size)
+    batches = len(counts)
+    seeds = [rng.getrandbits(64) for _ in counts]
+
+    round_payouts = collections.defaultdict(collections.Counter)
+    game_payouts = collections.Counter()
+    bonus_players = collections.Counter()
+    if processes == 1:
+        results = [
+            simulate_games(rules, bot_names, count, batch_seed, puzzles)
+            for count, batch_seed in zip(counts, seeds)]
+    else:
+        with ProcessPoolExecutor(
+                max_workers=processes, initializer=_init_worker,
+                initargs=(puzzles,)) as executor:
+            results = list(executor.map(
+                simulate_games, [rules] * batches, [bot_names] * batches,
+                counts, seeds))
+    for batch_rounds, batch_games, batch_bonus_players in results:
+        for key, payouts in batch_rounds.items():
+            round_payouts[key].update(payouts)
+        game_payouts.update(batch_games)
+        bonus_players.update(batch_bonus_players)
+    return dict(round_payouts), game_payouts, bonus_players
+
+
+def percentile(counts, fraction):
+    """
+    Get a percentile of values counted in a Counter.
+
+    :param counts: A Counter of {value: number of times counted}
+    :type counts: collections.Counter
+    :param fraction: The percentile, from 0 to 1
+    :type fraction: float
+    :return: The smallest value which at least `fraction` of the counted
+             values are less than or equal to
+    :rtype: int
+    """
+
+    target = fraction * sum(counts.values())
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if seen >= target:
+            return value
+    return 0
+
+
+def describe_payouts(counts):
+    """
+    Summarize a distribution of payouts.
+
+    :param counts: A Counter of {payout: number of times counted}
+    :type counts: collections.Counter
+    :return: A dict of 'played', 'mean', 'percentiles', and 'max', to
+             format `strings.simulator_round` or `strings.simulator_totals`
+    :rtype: dict
+    """
+
+    played = sum(counts.values())
+    return {
+        'played': played,
+        'mean': sum(
+            value * count for value, count in counts.items()) / played,
+        'percentiles': '  '.join(
+            strings.simulator_percentile.format(
+                percentile=p, value=percentile(counts, p / 100))
+            for p in values.simulator_percentiles),
+        'max': max(counts)}
+
+
+def report(results, bot_names, games, seconds, processes):
+    """
+    Describe the results of a simulation.
+
+    :param results: The results, as returned by :func:`run_simulation`
+    :type results: tuple
+    :param bot_names: The names of the players' strategies
+    :type bot_names: list
+    :param games: The number of games played
+    :type games: int
+    :param seconds: The time taken to play the games
+    :type seconds: float
+    :param processes: The number of worker processes
+    :type processes: int
+    :return: A multi-line string
+    :rtype: str
+    """
+
+    round_payouts, game_payouts, bonus_players = results
+    lines = [strings.simulator_summary.format(
+        games=games, seconds=seconds, processes=processes,
+        rate=games / seconds if seconds else 0)]
+    for (number, round_type), counts in sorted(round_payouts.items()):
+        lines.append(strings.simulator_round.format(
+            number=number, round_type=round_type, **describe_payouts(counts)))
+    lines.append(strings.simulator_totals.format(
+        **describe_payouts(game_payouts)))
+    for number, bot in enumerate(bot_names, 1):
+        lines.append(strings.simulator_wins.format(
+            number=number, bot=bot, share=bonus_players[number] / games))
+    return '\n'.join(lines)
+
+
+def main():
+    """
+    Run a simulation from the command line, and print the report.
+
+    :return: None
+    """
+
+    parser = argparse.ArgumentParser(description=strings.simulator_title)
+    parser.add_argument(
+        '--games', type=int, default=values.simulator_games,
+        help=strings.help_simulator_games)
+    parser.add_argument(
+        '--processes', type=int, default=values.simulator_processes,
+        help=strings.help_simulator_processes)
+    parser.add_argument(
+        '--seed', type=int, help=strings.help_simulator_seed)
+    parser.add_argument(
+        '--wedges', help=strings.help_simulator_wedges)
+    parser.add_argument(
+        '--bots', default=','.join(values.simulator_bots),
+        help=strings.help_simulator_bots.format(', '.join(bots)))
+    parser.add_argument(
+        '--puzzles', help=strings.help_simulator_puzzles)
+    arguments = parser.parse_args()
+
+    bot_names = [name.strip() for name in arguments.bots.split(',')]
+    if (
+            len(bot_names) != game_engine.players
+            or any(name not in bots for name in bot_names)):
+        parser.error(strings.simulator_error_bots.format(', '.join(bots)))
+
+    wedges = None
+    if arguments.wedges:
+        try:
+            wedges = parse_wedges(arguments.wedges)
+        except ValueError:
+            parser.error(
+                strings.simulator_error_wedges.format(arguments.wedges))
+
+    # data_caching imports Kivy, which would otherwise read these
+    # arguments as its own
+    os.environ['KIVY_NO_ARGS'] = '1'
+    import data_caching
+
+    if arguments.puzzles:
+        puzzles = [
+            puzzle for _name, puzzle in
+            puzzle_import.iter_puzzle_file(arguments.puzzles)]
+    elif (
+            data_caching.get_variables().get(
+                'puzzle_store', values.default_puzzle_store) != 'json'
+            and not os.path.exists(values.file_puzzles)):
+        # opening the store would create an empty database
+        puzzles = []
+    else:
+        puzzles = list(data_caching.read_puzzles().values())
+    puzzles = [puzzle for puzzle in puzzles if puzzle['puzzle'].strip()]
+    if not puzzles:
+        parser.error(strings.simulator_error_no_puzzles)
+
+    rules = Rules(data_caching.get_variables(), wedges)
+    processes = arguments.processes or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    results = run_simulation(
+        rules, puzzles, bot_names, arguments.games, processes,
+        arguments.seed)
+    seconds = time.perf_counter() - start
+    print(report(results, bot_names, arguments.games, seconds, processes))
+
+
+if __name__ == '__main__':
+    main()
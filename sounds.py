@@ -0,0 +1,132 @@
+from collections import OrderedDict
+
+from kivy.core.audio import SoundLoader
+from kivy.logger import Logger
+
+
+class SoundBank(object):
+    """
+    Loads sounds once and keeps them for reuse.
+
+    Each sound file has a small pool of voices, so that a sound can be
+    started again while an earlier instance is still playing, such as
+    the 'ding' of several panels turning blue. At most `max_files` files
+    are kept loaded; the least recently played file is unloaded when
+    another is needed.
+
+    Files which cannot be loaded are reported once, and are not tried
+    again.
+    """
+
+    def __init__(self, max_files, voices):
+        """
+        Create the sound bank.
+
+        :param max_files: The maximum number of files to keep loaded
+        :type max_files: int
+        :param voices: The maximum number of instances of a single file
+                       which may play at once
+        :type voices: int
+        """
+
+        self.max_files = max_files
+        self.voices = voices
+        # {filename: list of sounds}, least recently played first
+        self._sounds = OrderedDict()
+        self._failed = set()
+
+    def _load(self, filename):
+        """
+        Load a new voice for `filename`.
+
+        :param filename: The name of an audio file
+        :type filename: str
+        :return: The sound, or None if the file could not be loaded
+        :rtype: kivy.core.audio.Sound
+        """
+
+        if filename in self._failed:
+            return None
+        sound = SoundLoader.load(filename)
+        if sound is None:
+            self._failed.add(filename)
+            Logger.warning('SoundBank: Unable to load {}'.format(filename))
+        return sound
+
+    def _voices(self, filename):
+        """
+        Get the loaded voices of `filename`, marking it as the most
+        recently used file, and unloading the least recently used file
+        if there are too many.
+
+        :param filename: The name of an audio file
+        :type filename: str
+        :return: A list of sounds, which may be empty
+        :rtype: list
+        """
+
+        voices = self._sounds.pop(filename, None)
+        if voices is None:
+            voices = []
+            while len(self._sounds) >= self.max_files:
+                _filename, evicted = self._sounds.popitem(last=False)
+                for sound in evicted:
+                    sound.unload()
+        self._sounds[filename] = voices
+        return voices
+
+    def preload(self, filenames):
+        """
+        Load one voice of each file in `filenames`, so that they can be
+        played without delay.
+
+        :param filenames: A list of filenames
+        :type filenames: list
+        :return: None
+        """
+
+        for filename in filenames:
+            if filename in self._sounds or filename in self._failed:
+                continue
+            sound = self._load(filename)
+            if sound:
+                self._voices(filename).append(sound)
+
+    def play(self, filename):
+        """
+        Play the audio file `filename`, using a voice which is not
+        already playing. If every voice is playing and no more may be
+        loaded, the voice which was started first is restarted.
+
+        :param filename: The name of an audio file
+        :type filename: str
+        :return: The sound which is playing, or None if the file could
+                 not be loaded
+        :rtype: kivy.core.audio.Sound
+        """
+
+        if filename in self._failed:
+            return None
+
+        voices = self._voices(filename)
+        for i, sound in enumerate(voices):
+            if sound.state != 'play':
+                break
+        else:
+            sound = None
+            if len(voices) < self.voices:
+                sound = self._load(filename)
+            if sound is None:
+                if not voices:
+                    del self._sounds[filename]
+                    return None
+                i, sound = 0, voices[0]
+                sound.stop()
+            else:
+                i = len(voices)
+                voices.append(sound)
+
+        # keep the voices in the order in which they were started
+        voices.append(voices.pop(i))
+        sound.play()
+        return sound
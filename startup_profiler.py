@@ -0,0 +1,161 @@
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import strings
+
+# environment variable naming the directory where each process saves its
+# timings, so that it is inherited by the processes of the other windows
+_env_dir = 'WHEEL_OF_FORTUNE_PROFILE_DIR'
+
+# the process whose timings are being recorded
+_pid = os.getpid()
+# the time at which this module was first imported in this process
+_start = time.time()
+# a list of (phase, time) tuples, one for the end of each phase
+_marks = []
+# the process which will print the timeline
+_reporter_pid = None
+
+
+def enable():
+    """
+    Start recording timings in this process and every process it
+    launches. The timeline is printed by this process; see
+    :func:`report`. The timings are saved in a temporary directory,
+    which is removed by :func:`report`, or when this process exits.
+
+    :return: None
+    """
+
+    global _reporter_pid
+
+    directory = tempfile.mkdtemp(prefix='startup_profile_')
+    os.environ[_env_dir] = directory
+    _reporter_pid = os.getpid()
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+
+
+def enabled():
+    """
+    Check whether timings are being recorded.
+
+    :return: True if timings are being recorded, otherwise False
+    :rtype: bool
+    """
+
+    return _env_dir in os.environ
+
+
+def is_reporter():
+    """
+    Check whether this process should print the timeline.
+
+    :return: True if :func:`enable` was called in this process,
+             otherwise False
+    :rtype: bool
+    """
+
+    return _reporter_pid == os.getpid()
+
+
+def started(launch_time):
+    """
+    Note that this process was launched by another at `launch_time`, so
+    that its first phase begins then. This must be called by a launched
+    process before its first :func:`mark`.
+
+    :param launch_time: The time, from :func:`time.time`, at which the
+                        launching process started this one
+    :type launch_time: float
+    :return: None
+    """
+
+    global _pid, _start
+
+    if os.getpid() != _pid:
+        # a forked process inherits its parent's timings
+        _pid = os.getpid()
+        del _marks[:]
+    _start = launch_time
+
+
+def mark(phase):
+    """
+    Record that the phase `phase` of starting this process has just
+    finished. Each phase begins where the previous one ended, and the
+    first begins when this module was imported, or when the process
+    was launched; see :func:`started`.
+    Does nothing unless timings are being recorded.
+
+    :param phase: A description of the phase
+    :type phase: str
+    :return: None
+    """
+
+    if enabled():
+        _marks.append((phase, time.time()))
+
+
+def save(label):
+    """
+    Save the timings recorded in this process, so that they can be
+    included in the timeline.
+    Does nothing unless timings are being recorded, or if the timeline
+    has already been printed.
+
+    :param label: A name for this process, such as its window title
+    :type label: str
+    :return: None
+    """
+
+    if not enabled():
+        return
+    filename = os.path.join(
+        os.environ[_env_dir], '{}.json'.format(os.getpid()))
+    try:
+        with open(filename, 'w') as f:
+            json.dump(
+                {'label': label, 'pid': os.getpid(), 'start': _start,
+                 'marks': _marks},
+                f)
+    except FileNotFoundError:
+        # the directory was removed by report
+        pass
+
+
+def report():
+    """
+    Print the timings saved by every process as a single timeline,
+    ordered by the time at which each process started, and remove the
+    directory they were saved in. Times are in milliseconds since the
+    first process started.
+
+    :return: None
+    """
+
+    directory = os.environ[_env_dir]
+    profiles = []
+    for filename in os.listdir(directory):
+        with open(os.path.join(directory, filename)) as f:
+            profiles.append(json.load(f))
+    shutil.rmtree(directory, ignore_errors=True)
+    if not profiles:
+        return
+
+    profiles.sort(key=lambda profile: profile['start'])
+    origin = profiles[0]['start']
+    lines = [strings.profile_title]
+    for profile in profiles:
+        lines.append(strings.profile_process.format(**profile))
+        phase_start = profile['start']
+        for phase, phase_end in profile['marks']:
+            lines.append(strings.profile_phase.format(
+                phase=phase,
+                start=(phase_start - origin) * 1000,
+                duration=(phase_end - phase_start) * 1000))
+            phase_start = phase_end
+    print('\n'.join(lines))
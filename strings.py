@@ -49,6 +49,27 @@ button_yes = 'Yes'
 currency_format = '${:,}'
 dropdown_select_value = 'Select cash value'
 
+help_profile_hotkeys = (
+    'print a histogram of how long each keystroke in the manager takes to '
+    'handle, when the manager closes')
+help_profile_startup = (
+    'print how long each window takes to start, once they have all started')
+help_single_process = (
+    'run every window in a single process, combined into one window')
+help_simulator_bots = (
+    'comma-separated strategies of the three players, from: {}')
+help_simulator_games = 'number of games to simulate'
+help_simulator_processes = 'number of worker processes, one per CPU if unset'
+help_simulator_puzzles = (
+    'a puzzle file to draw puzzles from, instead of the puzzle library')
+help_simulator_seed = 'seed for the random choices, to repeat a simulation'
+help_simulator_wedges = (
+    'comma-separated wedges of the wheel, each a cash value, "bankrupt", '
+    'or "lose_turn"; defaults to the cash values in the settings')
+help_tossup_seed = (
+    'seed for the order in which toss-up letters are revealed, to replay '
+    'a toss-up')
+
 input_adjust_score = 'Adjust score'
 input_cash_values = 'Enter numbers separated by any whitespace'
 input_clue_solve_reward = 'Enter a number (default {})'.format(currency_format)
@@ -56,11 +77,20 @@ input_custom = 'Enter custom cash value'
 input_final_spin_bonus = 'Enter a number (default {})'.format(currency_format)
 input_min_win = 'Enter a number (default {})'.format(currency_format)
 input_name = 'Edit player name'
+input_search_puzzles = (
+    'Search (filters: cat:<category> words:<n> letters:<n> clue:yes/no '
+    'rstlne:>=<n> sort:<metric>)')
 input_vowel_price = 'Enter a number (default {})'.format(currency_format)
 
 label_category = 'Category'
 label_clue = 'Clue'
 label_clue_solve_reward = 'Clue Solve\nReward'
+label_compile_empty = 'The puzzle is empty.'
+label_compile_problem = 'Round {number}: {problem}'
+label_compile_too_long = 'The puzzle is longer than {} panels.'
+label_compile_unguessable = 'The letter "{}" cannot be guessed.'
+label_compile_unprintable = (
+    'The puzzle contains an unprintable character ({}).')
 label_delete_all_puzzles = 'Delete all puzzles?'
 label_delete_puzzle = 'Delete puzzle "{}"?'
 label_edit_hotkey_info = (
@@ -71,6 +101,7 @@ label_edit_hotkey_waiting = 'Waiting... {}'
 label_file_exists = 'File "{}" already exists. Overwrite?'
 label_filename = 'File name:'
 label_final_spin_bonus = 'Final Spin\nBonus'
+label_hints = '{count} answers fit\n{pattern}\n\n{hints}'
 label_hotkey_bank_score = 'Bank score:'
 label_hotkey_bankrupt = 'Bankrupt:'
 label_hotkey_buy_vowel = 'Buy a Vowel:'
@@ -83,6 +114,7 @@ label_hotkey_select_2 = 'Select player 2:'
 label_hotkey_select_3 = 'Select player 3:'
 label_hotkey_select_next = 'Select next player:'
 label_hotkey_select_puzzle = 'Select puzzle:'
+label_hotkey_show_hints = 'Show hints:'
 label_hotkey_solve = 'Solve/Next puzzle:'
 label_hotkey_start_tossup = 'Toss-Up/Final Spin:'
 label_hotkey_timer_reset = 'Reset timer:'
@@ -93,6 +125,7 @@ label_import_duplicates = (
     '(puzzles with the same text, but different spacing,\n'
     'are considered to be duplicates).\n\n'
     '{}')
+label_import_finished = 'Import finished.\n\n{count:,} puzzles imported'
 label_import_game_error = (
     'The following file could not be imported:\n'
     '{}\n\n'
@@ -103,6 +136,11 @@ label_import_puzzle_error = (
     '{}\n\n'
     'Files must consist of tab-separated values, with the form:\n'
     '{{puzzle}} {{category}} ({{clue}})')
+label_import_progress = (
+    'Importing file {number} of {total}:\n'
+    '{filename}\n\n'
+    '{count:,} puzzles imported')
+label_invalid_game = 'The game cannot be loaded:\n\n{}'
 label_manager_clue = 'Clue: '
 label_matches = '{matches} "{letter}"s'
 label_min_win = 'Round Prize\nMinimum'
@@ -110,6 +148,7 @@ label_name = 'Name'
 label_name_exists = 'A puzzle with the name "{}" already exists.\nOverwrite?'
 label_names_exist = 'The puzzles below already exist. Overwrite?\n\n{}'
 label_no_export_selected = 'No puzzles were selected. Export all?'
+label_no_hints = 'No answers fit\n{pattern}'
 label_puzzle = 'Puzzle'
 label_reward = 'Reward'
 label_round_type = 'Round Type'
@@ -122,13 +161,44 @@ label_timer_set = 'Final Spin\nTimer:'
 label_vowel_price = 'Vowel Price'
 label_wedges = 'Cash Values'
 
+latency_bucket = '  < {bound:9.3f} ms  {count}'
+latency_bucket_last = ' >= {bound:9.3f} ms  {count}'
+latency_keystrokes = 'Keystroke handling time'
+latency_title = (
+    '{title} ({count} timed, mean {mean:.3f} ms, max {max:.3f} ms):')
+
+profile_phase = '  {start:9.1f} {duration:9.1f}  {phase}'
+profile_process = '{label} (process {pid})'
+profile_title = 'Startup timeline (start and duration in ms):'
+
+simulator_error_bots = 'Expected 3 strategies from: {}'
+simulator_error_no_puzzles = 'There are no puzzles to simulate games with.'
+simulator_error_wedges = 'Invalid wedges: {}'
+simulator_percentile = 'p{percentile} {value:9,}'
+simulator_round = (
+    'Round {number:2} {round_type:20} played {played:7}  '
+    'mean {mean:10,.0f}  {percentiles}  max {max:9,}')
+simulator_summary = (
+    'Simulated {games:,} games in {seconds:.2f} s with {processes} '
+    'processes ({rate:,.0f} games/s)')
+simulator_title = 'Wheel of Fortune game simulator'
+simulator_totals = (
+    'Payout per game           mean {mean:10,.0f}  {percentiles}  '
+    'max {max:9,}')
+simulator_wins = (
+    'Player {number} ({bot}) reached the bonus round in {share:.1%} of '
+    'games')
+
 title_choose_letter = 'Choose a letter'
 title_delete_puzzle = 'Delete puzzle'
 title_delete_all_puzzles = 'Delete all puzzles'
 title_duplicates = 'Duplicate puzzles found'
 title_edit_hotkeys = 'Edit hotkeys'
 title_file_exists = 'File exists'
+title_hints = 'Hints'
 title_import_error = 'Unable to import'
+title_importing = 'Importing puzzles'
+title_invalid_game = 'Invalid game'
 title_name_exists = 'Name exists'
 title_names_exist = 'Puzzles already exist'
 title_no_export_selected = 'No puzzles selected'
@@ -0,0 +1,61 @@
+import random
+
+import board_state
+
+puzzle = 'WHEEL OF FORTUNE'
+
+
+def loaded_board(puzzle_string=puzzle):
+    board = board_state.BoardState(4, 14)
+    board.load(puzzle_string)
+    return board
+
+
+def test_tossup_order_starts_bottom_right():
+    board = loaded_board()
+    order = board.tossup_order(random.Random(1))
+    assert order[0] == next(
+        i for i in board.order_bottom_right if board.letters[i])
+    assert sorted(order) == board.hidden_letters()
+
+
+def test_tossup_order_is_replayed_by_seed():
+    orders = [
+        loaded_board().tossup_order(random.Random(seed))
+        for seed in (7, 7, 8)]
+    assert orders[0] == orders[1]
+    assert orders[0] != orders[2]
+
+
+def test_matches_finds_hidden_panels_in_reveal_order():
+    board = loaded_board()
+    # panels are revealed column by column, from the top, and row 0
+    # starts in column 1
+    assert board.matches(['e'], board.rank_left_to_right) == [2, 15, 3]
+    assert board.matches(['E'], board.rank_right_to_left) == [3, 2, 15]
+
+    board.reveal(3)
+    assert board.matches(['e', 'w'], board.rank_left_to_right) == [0, 2, 15]
+
+
+def test_remaining_letters_ignores_revealed_and_excluded_letters():
+    board = loaded_board()
+    assert board.remaining_letters() == set('wheloftrun')
+
+    for i in board.matches(['o'], board.rank_left_to_right):
+        board.reveal(i)
+    assert board.remaining_letters(excluded='RSTLNE') == set('whfu')
+
+
+def test_pattern_shows_revealed_letters_and_punctuation():
+    board = loaded_board("IT'S A WHEEL")
+    assert board.pattern() == "__'_ _ _____"
+
+    for i in board.matches(['e', 'i'], board.rank_left_to_right):
+        board.reveal(i)
+    assert board.pattern(hidden='*') == "I*'* * **EE*"
+
+
+def test_pattern_joins_rows_with_single_spaces():
+    board = loaded_board()
+    assert board.pattern() == '_____ __ ___ ____'
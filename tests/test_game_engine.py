@@ -0,0 +1,151 @@
+import game_engine
+import strings
+import values
+
+
+def make_engine():
+    engine = game_engine.GameEngine()
+    events = []
+    engine.subscribe(lambda event, args: events.append((event, args)))
+    return engine, events
+
+
+def puzzleboard_commands(events):
+    return [args for event, args in events if event == 'puzzleboard']
+
+
+def test_select_player_flashes_their_scoreboard():
+    engine, events = make_engine()
+    engine.select_player(2)
+    assert engine.selected_player == 2
+    assert events == [
+        ('selected_player', 2), ('stop_flashing', None), ('flash', 2)]
+
+
+def test_select_player_out_of_range_deselects():
+    engine, events = make_engine()
+    engine.select_player(1)
+    del events[:]
+    engine.select_player(4)
+    assert engine.selected_player == 0
+    assert events == [('selected_player', 0), ('stop_flashing', None)]
+
+
+def test_tossup_starts_pauses_and_resumes():
+    engine, events = make_engine()
+    engine.tossup()
+    assert engine.tossup_running
+    assert ('tossup', None) in puzzleboard_commands(events)
+
+    engine.select_player(3)
+    assert not engine.tossup_running
+    assert engine.selected_player == 3
+    assert engine.tossup_players_done == [3]
+    assert ('pause_tossup', None) in puzzleboard_commands(events)
+
+    engine.tossup()
+    assert engine.tossup_running
+    assert ('resume_tossup', None) in puzzleboard_commands(events)
+
+
+def test_tossup_player_cannot_ring_in_twice():
+    engine, _events = make_engine()
+    engine.tossup()
+    engine.select_player(1)
+    engine.select_player(2)
+    assert engine.selected_player == 1
+    engine.tossup()
+    engine.select_player(1)
+    assert engine.tossup_running
+    assert engine.selected_player == 0
+
+
+def test_tossup_sends_seed():
+    engine, events = make_engine()
+    engine.tossup_seed = 42
+    engine.tossup()
+    assert ('tossup', 42) in puzzleboard_commands(events)
+
+
+def test_tossup_without_seed_is_random():
+    engine, events = make_engine()
+    engine.tossup()
+    assert ('tossup', None) in puzzleboard_commands(events)
+
+
+def test_bank_score_adds_score_to_total_and_clears_scores():
+    engine, events = make_engine()
+    engine.select_player(1)
+    engine.set_score(1500)
+    engine.select_player(2)
+    engine.set_score(700)
+    engine.set_total(100)
+    del events[:]
+
+    engine.bank_score()
+    assert engine.totals == [0, 800, 0]
+    assert engine.scores == [0, 0, 0]
+    assert ('total', (2, 800)) in events
+    assert [args for event, args in events if event == 'score'] == [
+        (1, 0), (2, 0), (3, 0)]
+
+
+def test_buy_vowel_needs_vowel_price():
+    engine, _events = make_engine()
+    engine.select_player(1)
+    engine.set_score(engine.vowel_price - 1)
+    engine.buy_vowel()
+    assert engine.get_score() == engine.vowel_price - 1
+    engine.set_score(engine.vowel_price)
+    engine.buy_vowel()
+    assert engine.get_score() == 0
+
+
+def test_no_more_consonants_removes_them_once():
+    engine, events = make_engine()
+    engine.guessed_letter('t')
+    del events[:]
+
+    engine.no_more_consonants()
+    engine.no_more_consonants()
+    assert sorted(engine.unavailable_letters) == sorted(strings.consonants)
+    assert events.count(
+        ('sound', values.file_sound_no_more_consonants)) == 1
+    assert events[-1] == ('used_letters', engine.unavailable_letters)
+
+
+def test_no_more_vowels_keeps_called_letters():
+    engine, _events = make_engine()
+    engine.guessed_letter('e')
+    engine.guessed_letter('s')
+    engine.no_more_vowels()
+    assert engine.unavailable_letters == ['e', 's', 'a', 'i', 'o', 'u']
+    assert not engine.vowels_remaining
+
+
+def test_consonants_exhausted_waits_for_next_turn_in_speedup():
+    engine, _events = make_engine()
+    engine.set_final_spin_started(True)
+    engine.consonants_exhausted()
+    assert engine.consonants_remaining
+    assert not engine.speedup_consonants_remaining
+
+    engine.select_player(1)
+    assert not engine.consonants_remaining
+
+
+def test_consonants_exhausted_outside_speedup():
+    engine, _events = make_engine()
+    engine.consonants_exhausted()
+    assert not engine.consonants_remaining
+
+
+def test_load_puzzle_makes_letters_available_again():
+    engine, events = make_engine()
+    engine.guessed_letter('t')
+    engine.no_more_vowels()
+    del events[:]
+    engine.load_puzzle({'puzzle': 'HELLO', 'category': 'Thing', 'clue': ''})
+    assert engine.unavailable_letters == []
+    assert engine.vowels_remaining
+    assert ('used_letters', []) in events
@@ -0,0 +1,126 @@
+import heapq
+import itertools
+
+from kivy.clock import Clock
+
+
+class Timeline(object):
+    """
+    A sequence of callbacks, each called a given number of seconds after
+    the timeline starts.
+
+    All of the callbacks are driven by a single Clock event, which runs
+    each frame until the last callback has been called. The timeline
+    keeps every callback that has not been called yet, so they can be
+    cancelled together with :meth:`cancel`, or called at once with
+    :meth:`fast_forward`. Time passes `time_scale` times as fast as on
+    the Clock, and `time_scale` may be changed while the timeline runs.
+    """
+
+    def __init__(self, time_scale=1):
+        """
+        Create an empty timeline. Callbacks are not called until
+        :meth:`start` is called.
+
+        :param time_scale: The speed of the timeline relative to the
+                           Clock, defaults to 1
+        :type time_scale: float, optional
+        """
+
+        self.time_scale = time_scale
+        self.elapsed = 0
+        # heap of (time, order of addition, callback)
+        self._pending = []
+        self._order = itertools.count()
+        self._event = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    @property
+    def running(self):
+        """
+        Whether the timeline has started and still has callbacks to
+        call.
+
+        :return: True if the timeline is running, otherwise False
+        :rtype: bool
+        """
+
+        return self._event is not None
+
+    def add(self, delay, callback):
+        """
+        Call `callback` with no arguments `delay` seconds after the
+        timeline starts. Callbacks with the same time are called in the
+        order in which they were added.
+
+        :param delay: The time at which to call `callback`
+        :type delay: float
+        :param callback: A function accepting no arguments
+        :type callback: function
+        :return: None
+        """
+
+        heapq.heappush(self._pending, (delay, next(self._order), callback))
+
+    def start(self):
+        """
+        Start the timeline. The first callbacks are called in the next
+        frame.
+
+        :return: None
+        """
+
+        if self._pending and self._event is None:
+            self._event = Clock.schedule_interval(self._update, 0)
+
+    def cancel(self):
+        """
+        Stop the timeline without calling any more callbacks.
+
+        :return: None
+        """
+
+        del self._pending[:]
+        self._stop()
+
+    def fast_forward(self):
+        """
+        Call every remaining callback immediately, in order, and stop
+        the timeline.
+
+        :return: None
+        """
+
+        self._stop()
+        while self._pending:
+            self.elapsed, _order, callback = heapq.heappop(self._pending)
+            callback()
+
+    def _stop(self):
+        """
+        Stop the Clock event driving the timeline.
+
+        :return: None
+        """
+
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _update(self, dt):
+        """
+        Advance the timeline and call every callback which is due.
+
+        :param dt: The time elapsed since the last frame
+        :type dt: float
+        :return: None
+        """
+
+        self.elapsed += dt * self.time_scale
+        while self._pending and self._pending[0][0] <= self.elapsed:
+            _time, _order, callback = heapq.heappop(self._pending)
+            callback()
+        if not self._pending:
+            self._stop()
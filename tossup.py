@@ -0,0 +1,203 @@
+import time
+
+from kivy.clock import Clock
+from kivy.logger import Logger
+
+
+class TossupEngine(object):
+    """
+    Reveals the letters of a toss-up at a fixed interval of active play.
+
+    Reveal *n* (starting at 0) is due *n* times `interval` seconds after
+    the toss-up started, not counting any time spent paused. Each reveal
+    is scheduled from a monotonic clock rather than from the previous
+    reveal, so a late frame delays only the reveal it falls on, and the
+    reveals stay in time with music built around the same interval.
+
+    The drift of each reveal, the number of seconds of active play by
+    which it missed its due time, is kept in `drifts`, and summarized by
+    :meth:`drift_stats`. The summary is logged when the toss-up ends.
+    """
+
+    def __init__(self, interval, reveal, finish):
+        """
+        Create the engine. Nothing is revealed until :meth:`start` is
+        called.
+
+        `reveal` is called with the number of the reveal, and returns
+        True if there are more letters to reveal after it. Once there
+        are none, the toss-up stops and `finish` is called with no
+        arguments.
+
+        :param interval: The number of seconds between reveals
+        :type interval: float
+        :param reveal: A function accepting an int and returning a bool
+        :type reveal: function
+        :param finish: A function accepting no arguments
+        :type finish: function
+        """
+
+        self.interval = interval
+        self.reveal = reveal
+        self.finish = finish
+        self.drifts = []
+        self._start = None
+        self._paused_at = None
+        self._paused_total = 0
+        self._count = 0
+        self._event = None
+
+    @property
+    def running(self):
+        """
+        Whether a toss-up has started and not yet stopped. A paused
+        toss-up is still running.
+
+        :return: True if a toss-up is running, otherwise False
+        :rtype: bool
+        """
+
+        return self._start is not None
+
+    @property
+    def paused(self):
+        """
+        Whether the toss-up is paused.
+
+        :return: True if the toss-up is paused, otherwise False
+        :rtype: bool
+        """
+
+        return self._paused_at is not None
+
+    def active_time(self):
+        """
+        Get the time since the toss-up started, not counting any time
+        spent paused.
+
+        :return: The number of seconds of active play
+        :rtype: float
+        """
+
+        now = self._paused_at if self.paused else time.monotonic()
+        return now - self._start - self._paused_total
+
+    def start(self):
+        """
+        Start a toss-up, stopping any toss-up already running. The first
+        letter is revealed immediately.
+
+        :return: None
+        """
+
+        self.stop()
+        self._start = time.monotonic()
+        self._paused_total = 0
+        self._count = 0
+        self.drifts = []
+        self._reveal_next()
+
+    def pause(self):
+        """
+        Pause the toss-up. Does nothing unless a toss-up is running.
+
+        :return: None
+        """
+
+        if self.running and not self.paused:
+            self._paused_at = time.monotonic()
+            self._cancel()
+
+    def resume(self):
+        """
+        Resume a paused toss-up. The next letter is revealed after the
+        rest of the interval that had not passed when it was paused.
+
+        :return: None
+        """
+
+        if self.paused:
+            self._paused_total += time.monotonic() - self._paused_at
+            self._paused_at = None
+            self._schedule()
+
+    def stop(self):
+        """
+        Stop the toss-up without revealing any more letters or calling
+        `finish`.
+
+        :return: None
+        """
+
+        self._cancel()
+        self._start = None
+        self._paused_at = None
+
+    def drift_stats(self):
+        """
+        Summarize the drift of the reveals of the current or last
+        toss-up.
+
+        :return: A dict of 'reveals', and the 'mean', 'max', and 'last'
+                 drift in seconds
+        :rtype: dict
+        """
+
+        if not self.drifts:
+            return {'reveals': 0, 'mean': 0, 'max': 0, 'last': 0}
+        return {
+            'reveals': len(self.drifts),
+            'mean': sum(self.drifts) / len(self.drifts),
+            'max': max(self.drifts),
+            'last': self.drifts[-1]}
+
+    def _cancel(self):
+        """
+        Cancel the scheduled reveal, if there is one.
+
+        :return: None
+        """
+
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _schedule(self):
+        """
+        Schedule the next reveal for its due time.
+
+        :return: None
+        """
+
+        delay = self._count * self.interval - self.active_time()
+        self._event = Clock.schedule_once(self._reveal_next, max(0, delay))
+
+    def _reveal_next(self, _dt=None):
+        """
+        Reveal the next letter, then schedule the one after it, or end
+        the toss-up if there are no more letters.
+
+        :param _dt: The time elapsed between scheduling and calling,
+                    defaults to None
+        :type _dt: float, optional
+        :return: None
+        """
+
+        self._event = None
+        self.drifts.append(self.active_time() - self._count * self.interval)
+        more = self.reveal(self._count)
+        self._count += 1
+        if not self.running:
+            # stopped by reveal
+            return
+        if more:
+            self._schedule()
+        else:
+            stats = self.drift_stats()
+            Logger.info(
+                'TossupEngine: {reveals} reveals, drift mean {mean_ms:.1f} '
+                'ms, max {max_ms:.1f} ms, last {last_ms:.1f} ms'.format(
+                    reveals=stats['reveals'], mean_ms=stats['mean'] * 1000,
+                    max_ms=stats['max'] * 1000, last_ms=stats['last'] * 1000))
+            self.stop()
+            self.finish()
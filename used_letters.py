@@ -1,5 +1,3 @@
-import queue
-
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.lang import Builder
@@ -10,6 +8,7 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.widget import Widget
 
+import messaging
 import strings
 import values
 from my_widgets import Fullscreenable
@@ -23,13 +22,26 @@ class LettersWithScore(BoxLayout, Fullscreenable):
     :class:`LetterboardLayout`.
     """
 
-    def __init__(self, q=None, **kwargs):
+    def __init__(self, q=None, game_state=None, queue_budget=None,
+                 **kwargs):
         """
         Create the layout.
 
+        If `game_state` is given, the players' names, scores, totals,
+        and flashing, and the unavailable letters, are displayed from
+        it, and again whenever it changes.
+
         :param q: A Queue to communicate with the manager app,
                   defaults to None
         :type q: multiprocessing.Queue, optional
+        :param game_state: The state of the game shared with the
+                           manager app, defaults to None
+        :type game_state: game_state.GameState, optional
+        :param queue_budget: The limits on the commands handled from
+                             the queue in each frame, see
+                             :class:`messaging.QueueListener`, defaults
+                             to None
+        :type queue_budget: tuple, optional
         :param kwargs: Additional keyword arguments for the layout
         """
 
@@ -37,11 +49,40 @@ class LettersWithScore(BoxLayout, Fullscreenable):
 
         self.queue = q
         if self.queue:
-            Clock.schedule_once(self.check_queue, values.queue_start)
+            self.listener = messaging.QueueListener(
+                self.queue, self.handle_command, queue_budget)
+            Clock.schedule_once(self.listener.start, values.queue_start)
+
+        self.game_state = game_state
+        if self.game_state:
+            self.state_listener = messaging.StateListener(
+                self.game_state, self.show_game_state)
+            Clock.schedule_once(self.state_listener.start)
 
-    def check_queue(self, _dt):
+    def show_game_state(self, _counter, players, letters):
         """
-        Check the queue for incoming commands to execute.
+        Display the players' values and the unavailable letters from
+        `game_state`. See :meth:`game_state.GameState.read`.
+
+        :param _counter: The sequence counter of the values
+        :type _counter: int
+        :param players: A dict of {color: (score, total, name, flashing)}
+        :type players: dict
+        :param letters: The unavailable letters
+        :type letters: list
+        :return: None
+        """
+
+        for color, (score, total, name, flashing) in players.items():
+            layout = self.scores[color]
+            layout.score, layout.total, layout.name = score, total, name
+            layout.set_flashing(flashing)
+        if letters != self.letterboard.unavailable:
+            self.letterboard.unavailable = letters
+
+    def handle_command(self, command, color, args):
+        """
+        Execute a command received from the queue.
 
         Commands should be a tuple of the form:
 
@@ -49,84 +90,21 @@ class LettersWithScore(BoxLayout, Fullscreenable):
 
         Available commands are:
 
-        'remove_letter':
-            Remove the letter *args* from the layout.
-            *args* is a single-character string.
-            *color_string* is ignored.
-        'remove_letters':
-            Remove multiple letters from the layout.
-            *args* is a list of single-character strings.
-            *color_string* is ignored.
-        'reload':
-            Refill the layout with all letters.
-            *color_string* and *args* are ignored.
-        'name':
-            Change the name of the player specified by *color_string*
-            to *args*.
-            *args* is a string.
-        'score':
-            Change the score of the player specified by *color_string*
-            to *args*.
-            *args* is an integer.
-        'total':
-            Change the total of the player specified by *color_string*
-            to *args*.
-            *args is an integer.
-        'flash':
-            Start the flashing effect for the player specified by
-            *color_string*.
-            *args* is ignored.
-        'stop_flash':
-            Stop the flashing effect for the player specified by
-            *color_string*.
-            *args* is ignored.
-        'no_more_consonants':
-            Remove all consonants from the layout.
-            *color_string* and *args* are ignored.
-        'no_more_vowels':
-            Remove all vowels from the layout.
-            *color_string* and *args* are ignored.
         'exit':
             Close the running App.
             *color_string* and *args* are ignored.
 
-        :param _dt: The time elapsed between scheduling and calling
-        :type _dt: float
+        :param command: The name of the command
+        :type command: str
+        :param color: The color of the player the command applies to
+        :type color: str
+        :param args: The arguments of the command
+        :type args: object
         :return: None
         """
 
-        try:
-            command, color, args = self.queue.get(block=False)
-            if command == 'remove_letter':
-                self.letterboard.unavailable.append(args.lower())
-            elif command == 'remove_letters':
-                self.letterboard.unavailable.extend([c.lower() for c in args])
-            elif command == 'reload':
-                self.letterboard.unavailable = []
-            elif command == 'name':
-                self.scores[color].name = args
-            elif command == 'score':
-                self.scores[color].score = args
-            elif command == 'total':
-                self.scores[color].total = args
-            elif command == 'flash':
-                self.scores[color].flash()
-            elif command == 'stop_flash':
-                self.scores[color].flashing = False
-                self.scores[color].flash_visible = False
-            elif command == 'no_more_consonants':
-                self.letterboard.unavailable.extend([
-                    c for c in strings.consonants
-                    if c not in self.letterboard.unavailable])
-            elif command == 'no_more_vowels':
-                self.letterboard.unavailable.extend([
-                    c for c in strings.vowels
-                    if c not in self.letterboard.unavailable])
-            elif command == 'exit':
-                App.get_running_app().stop()
-        except queue.Empty:
-            pass
-        Clock.schedule_once(self.check_queue, values.queue_interval)
+        if command == 'exit':
+            App.get_running_app().stop()
 
 
 class LetterboardLayout(GridLayout):
@@ -39,6 +39,11 @@ default_game_rewards = [
     0,
     0]
 default_min_win = 1000
+default_puzzle_store = 'sqlite'
+# maximum number of queued commands handled by a window in one frame
+default_queue_max_commands = 50
+# maximum seconds spent handling queued commands in one frame
+default_queue_time_budget = 0.008
 default_vowel_price = 250
 
 dir_assets = os.path.join(
@@ -80,7 +85,10 @@ file_kv_used_letters = os.path.join(
 file_panel = os.path.join(
     dir_assets,
     r'panel.png')
+file_puzzle_analysis = r'puzzle_analysis.json'
+file_puzzles = r'puzzles.db'
 file_settings = r'settings.json'
+file_solver_corpus = r'solver_corpus.txt'
 file_settings_icon = os.path.join(
     dir_assets,
     r'settings.png')
@@ -188,6 +196,10 @@ hotkeys = [
         'name': 'buzzer',
         'default': '8',
         'description': strings.label_hotkey_buzzer},
+    {
+        'name': 'show_hints',
+        'default': 'ctrl+h',
+        'description': strings.label_hotkey_show_hints},
     {
         'name': 'lose_turn',
         'default': '9',
@@ -205,6 +217,15 @@ hotkeys = [
         'default': '=',
         'description': strings.label_hotkey_bank_score},
 ]
+# upper bounds in seconds of the buckets of the keystroke latency histogram
+hotkey_latency_buckets = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05]
+
+# number of puzzles written at once when importing puzzle files
+import_batch_size = 1000
+# bytes of a puzzle file parsed by a worker process at once
+import_chunk_size = 4 * 1024 * 1024
+# number of worker processes parsing puzzle files, or None for one per CPU
+import_processes = None
 
 # seconds between panels turning blue
 interval_blue = 0.5
@@ -219,14 +240,28 @@ interval_solve_reveal = 0.01
 # seconds between letters being revealed in a toss-up
 interval_tossup = 0.924
 
-opacity_adjustment = 0.25
-opacity_interval = 0.001
+# seconds after the manager's first frame before the startup timeline is
+# printed, allowing the other windows to finish starting
+profile_report_delay = 10
+
+# seconds to wait before writing changed puzzle metrics to disk
+puzzle_analysis_save_delay = 2
+# seconds to wait for another process to release the puzzle database
+puzzle_store_timeout = 10
 
-# seconds interval for queues to check for new items
-queue_interval = 0
-# queues won't start checking for new items until this many seconds
+# rows and columns of the puzzleboard
+puzzleboard_size = (4, 14)
+
+# commands received from queues won't be handled until this many seconds
+# after a layout is created
 queue_start = 0
 
+# seconds for a revealed letter to fade in
+reveal_fade_duration = 0.05
+# speed of the changes made when a letter is checked, where 2 is twice as
+# fast as normal
+reveal_time_scale = 1
+
 round_types = [
     strings.round_type_standard,
     strings.round_type_mystery,
@@ -237,13 +272,50 @@ round_types = [
     strings.round_type_speedup,
     strings.round_type_bonus]
 
+# seconds to wait before writing changed settings to disk
+settings_flush_delay = 0.5
+
+# number of games simulated by a worker process at once
+simulator_batch_size = 250
+# strategies of the simulated players, see simulator.bots
+simulator_bots = ['cautious', 'balanced', 'aggressive']
+# cash values of the wheel in simulated games, if none are set
+simulator_cash_values = [
+    500, 550, 600, 650, 700, 750, 800, 850, 900, 1000, 2500]
+# number of games simulated, unless given on the command line
+simulator_games = 10000
+# order in which simulated players call letters, most common first
+simulator_letter_order = 'etaoinshrdlcumwfgypbvkjxqz'
+# the percentiles of each round's payouts shown by the simulator
+simulator_percentiles = [10, 50, 90]
+# number of worker processes running simulated games, or None for one
+# per CPU
+simulator_processes = None
+# wedges of the wheel in simulated games which are not cash values
+simulator_special_wedges = ['bankrupt', 'bankrupt', 'lose_turn']
+
+# maximum number of answers shown as hints for the puzzleboard
+solver_hint_limit = 20
+
+# maximum number of sound files kept loaded
+sound_cache_size = 16
+# sounds loaded shortly after the manager starts
+sound_preload = [
+    file_sound_ding,
+    file_sound_buzz,
+    file_sound_bankrupt]
+# seconds after the manager starts before sounds are preloaded
+sound_preload_delay = 1
+# maximum number of instances of a single sound playing at once
+sound_voices = 4
+
 # seconds the player has to solve the puzzle in speedup
 speedup_timeout = 4
 splitter_size = '5pt'
 # seconds correct letter matches will display in manager
 time_show_matches = 5
-# seconds between final spin timer updates
-timer_accuracy = 0.1
+# seconds between updates of the final spin timer's display
+timer_refresh_interval = 0.1
 
 used_letters_layout = [
     'BCDFGHJ',